@@ -9,6 +9,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 import requests
 import time
+from sheet_loader import get_sheet_frame, invalidate_sheet, QuotaAwareClient
+from lead_data import lead_id_column, contact_table, contact_messages, count_values, count_by_date
+from lead_filters import facet_mask
 
 # ------------------ PAGE CONFIG ------------------ #
 st.set_page_config(
@@ -28,7 +31,7 @@ if 'activity_log' not in st.session_state:
 if 'sent_leads' not in st.session_state:
     st.session_state.sent_leads = set()
 if 'selected_leads' not in st.session_state:
-    st.session_state.selected_leads = []
+    st.session_state.selected_leads = set()
 if 'current_client' not in st.session_state:
     st.session_state.current_client = None
 if 'chat_df' not in st.session_state:
@@ -205,20 +208,15 @@ def init_google_sheets(credentials_json):
             scopes=scopes
         )
         client = gspread.authorize(credentials)
-        return client
+        return QuotaAwareClient(client, credentials_dict.get('client_email', 'default'))
     except Exception as e:
         st.error(f"Error initializing Google Sheets: {str(e)}")
         return None
 
-@st.cache_data(ttl=60)
 def load_sheet_data(_client, sheet_id, sheet_name):
     """Load data from a specific Google Sheet"""
     try:
-        spreadsheet = _client.open_by_key(sheet_id)
-        worksheet = spreadsheet.worksheet(sheet_name)
-        data = worksheet.get_all_records()
-        df = pd.DataFrame(data)
-        return df
+        return get_sheet_frame(_client, sheet_id, sheet_name)
     except Exception as e:
         st.error(f"Error loading data from {sheet_name}: {str(e)}")
         return pd.DataFrame()
@@ -328,50 +326,7 @@ def get_initials(name):
 # ------------------ CHAT ANALYTICS FUNCTIONS ------------------ #
 def get_contact_info(df, my_profile):
     """Extract unique contacts from chat data"""
-    contacts = {}
-    
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        lead_name = row.get('lead_name', '')
-        lead_url = row.get('lead_linkedin_url', '')
-        
-        if is_me(sender_name, sender_url, my_profile):
-            continue
-        
-        contact_url = sender_url if sender_url else lead_url
-        contact_name = sender_name if sender_name else lead_name
-        
-        if contact_url and contact_url not in contacts:
-            contacts[contact_url] = {
-                'name': contact_name,
-                'url': contact_url,
-                'messages': [],
-                'last_contact': None,
-                'received_count': 0,
-                'sent_count': 0
-            }
-    
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        lead_url = row.get('lead_linkedin_url', '')
-        
-        contact_url = None
-        if is_me(sender_name, sender_url, my_profile):
-            contact_url = lead_url
-            if contact_url in contacts:
-                contacts[contact_url]['sent_count'] += 1
-        else:
-            contact_url = sender_url if sender_url else lead_url
-            if contact_url in contacts:
-                contacts[contact_url]['received_count'] += 1
-        
-        if contact_url in contacts:
-            contacts[contact_url]['messages'].append(row)
-            contacts[contact_url]['last_contact'] = f"{row.get('date', '')} {row.get('time', '')}"
-    
-    return contacts
+    return contact_table(df, my_profile)
 
 # ------------------ MAIN APPLICATION ------------------ #
 def main():
@@ -452,8 +407,9 @@ def main():
         if st.button("🔄 Load/Refresh Data", use_container_width=True):
             with st.spinner("Loading data from Google Sheets..."):
                 try:
-                    # Load chat data
+                    # Load chat data, dropping the cached frame so a refresh inside the TTL still refetches
                     if chat_sheet_id:
+                        invalidate_sheet(chat_sheet_id, chat_sheet_name)
                         st.session_state.chat_df = load_sheet_data(
                             st.session_state.gsheets_client,
                             chat_sheet_id,
@@ -462,6 +418,7 @@ def main():
                     
                     # Load outreach data
                     if outreach_sheet_id:
+                        invalidate_sheet(outreach_sheet_id, outreach_sheet_name)
                         st.session_state.outreach_df = load_sheet_data(
                             st.session_state.gsheets_client,
                             outreach_sheet_id,
@@ -571,7 +528,7 @@ def show_overview():
     with col1:
         st.subheader("📈 Recent Chat Activity")
         if not chat_df.empty and 'date' in chat_df.columns:
-            daily_chats = chat_df.groupby('date').size().tail(7)
+            daily_chats = count_by_date(chat_df).tail(7)
             fig = px.bar(
                 x=daily_chats.index,
                 y=daily_chats.values,
@@ -585,7 +542,7 @@ def show_overview():
     with col2:
         st.subheader("🎯 Outreach Performance")
         if not outreach_df.empty and 'status' in outreach_df.columns:
-            status_counts = outreach_df['status'].value_counts()
+            status_counts = count_values(outreach_df, 'status')
             fig = px.pie(
                 values=status_counts.values,
                 names=status_counts.index,
@@ -628,20 +585,20 @@ def show_chat_analytics():
     if view_mode == "📇 All Contacts":
         st.subheader("📇 All Contacts")
         
-        if not contacts:
+        if contacts.empty:
             st.info("No contacts found in chat history")
             return
         
         cols = st.columns(2)
         
-        for idx, (url, info) in enumerate(contacts.items()):
+        for idx, (url, info) in enumerate(contacts.iterrows()):
             col = cols[idx % 2]
             
             with col:
                 st.markdown(f"""
                 <div class="contact-card">
                     <div class="contact-name">{info['name']}</div>
-                    <div>💬 {len(info['messages'])} messages</div>
+                    <div>💬 {info['message_count']} messages</div>
                     <div>📤 {info['sent_count']} sent | 📥 {info['received_count']} received</div>
                     <div style="margin-top: 15px;">
                         <a href="{url}" target="_blank" style="color: white; text-decoration: none;">
@@ -654,31 +611,28 @@ def show_chat_analytics():
     elif view_mode == "💬 Contact Conversation":
         st.subheader("💬 Contact Conversation")
         
-        if not contacts:
+        if contacts.empty:
             st.info("No contacts found")
             return
         
-        contact_names = {info['name']: url for url, info in contacts.items()}
+        contact_names = dict(zip(contacts['name'], contacts['url']))
         selected_name = st.selectbox("Select Contact", list(contact_names.keys()))
         
         if selected_name:
             selected_url = contact_names[selected_name]
-            contact_info = contacts[selected_url]
+            contact_info = contacts.loc[selected_url]
             
             st.markdown(f"""
             <div class='client-profile-banner'>
                 <h2>{contact_info['name']}</h2>
-                <p>💬 {len(contact_info['messages'])} messages</p>
+                <p>💬 {contact_info['message_count']} messages</p>
                 <p>📤 {contact_info['sent_count']} sent | 📥 {contact_info['received_count']} received</p>
             </div>
             """, unsafe_allow_html=True)
             
-            messages = sorted(
-                contact_info['messages'],
-                key=lambda x: (x.get('date', ''), x.get('time', ''))
-            )
+            messages = contact_messages(chat_df, my_profile, selected_url)
             
-            for msg in messages:
+            for _, msg in messages.iterrows():
                 sender_name = msg.get('sender_name', '')
                 sender_url = msg.get('sender_linkedin_url', '')
                 message_text = msg.get('message', '')
@@ -734,19 +688,25 @@ def show_lead_outreach():
         sort_by = st.selectbox("Sort By", ["timestamp", "status", "profile_name"])
     
     # Apply filters
-    filtered_df = outreach_df.copy()
+    mask = pd.Series(True, index=outreach_df.index)
+    
+    facets = {}
+    if status_filter != "All" and 'status' in outreach_df.columns:
+        facets['status'] = status_filter
     
-    if status_filter != "All" and 'status' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['status'] == status_filter]
+    if city_filter != "All" and 'search_city' in outreach_df.columns:
+        facets['search_city'] = city_filter
     
-    if city_filter != "All" and 'search_city' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['search_city'] == city_filter]
+    mask &= facet_mask(outreach_df, facets)
+    filtered_df = outreach_df[mask]
     
     st.markdown(f"**Showing {len(filtered_df)} leads**")
     st.markdown("---")
     
     # Display leads
+    lead_ids = lead_id_column(filtered_df)
     for idx, (i, row) in enumerate(filtered_df.iterrows()):
+        lead_id = lead_ids[i]
         col1, col2 = st.columns([3, 1])
         
         with col1:
@@ -769,7 +729,7 @@ def show_lead_outreach():
         with col2:
             st.markdown("**Actions**")
             if st.button("🚀 Send", key=f"send_{i}", disabled=status=='sent', use_container_width=True):
-                st.session_state.sent_leads.add(i)
+                st.session_state.sent_leads.add(lead_id)
                 st.success(f"✅ Message sent to {name}!")
                 st.rerun()
             
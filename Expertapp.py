@@ -11,6 +11,10 @@ from plotly.subplots import make_subplots
 import requests
 import time
 import re
+from sheet_loader import get_sheet_frame, invalidate_sheet, QuotaAwareClient
+from lead_data import normalize_outreach, normalize_chat, mine_column, contact_table, count_values
+from lead_search import search_mask
+from lead_filters import facet_mask
 
 # ------------------ PAGE CONFIG ------------------ #
 st.set_page_config(
@@ -156,44 +160,18 @@ def init_google_sheets(credentials_json):
         credentials_dict = json.loads(credentials_json)
         scopes = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
         credentials = Credentials.from_service_account_info(credentials_dict, scopes=scopes)
-        return gspread.authorize(credentials)
+        return QuotaAwareClient(gspread.authorize(credentials), credentials_dict.get('client_email', 'default'))
     except Exception as e:
         st.error(f"Error: {str(e)}")
         return None
 
-@st.cache_data(ttl=60)
 def load_sheet_data(_client, sheet_id, sheet_name):
     try:
-        spreadsheet = _client.open_by_key(sheet_id)
-        worksheet = spreadsheet.worksheet(sheet_name)
-        return pd.DataFrame(worksheet.get_all_records())
+        return get_sheet_frame(_client, sheet_id, sheet_name)
     except Exception as e:
         st.error(f"Error: {str(e)}")
         return pd.DataFrame()
 
-def parse_timestamp(timestamp_str):
-    try:
-        if pd.isna(timestamp_str) or timestamp_str == '':
-            return None
-        return pd.to_datetime(timestamp_str, format='%m/%d/%Y %H:%M:%S')
-    except:
-        try:
-            return pd.to_datetime(timestamp_str)
-        except:
-            return None
-
-def is_message_sent(row):
-    if row.get("email_subject") or row.get("email_message"):
-        return False
-    success = str(row.get('success', '')).lower()
-    return success == 'true' or success == 'yes' or success == '1'
-
-def is_me(sender_name, sender_url, my_profile):
-    if not sender_name or not isinstance(sender_name, str):
-        return False
-    return (my_profile["name"].lower() in sender_name.lower() or
-            (sender_url and my_profile["url"].lower() in str(sender_url).lower()))
-
 def get_initials(name):
     if not name:
         return "?"
@@ -226,16 +204,11 @@ def authenticate_user():
 def show_crm_dashboard():
     st.markdown("<div class='section-header'>📋 CRM Dashboard - Complete Lead Details</div>", unsafe_allow_html=True)
     
-    outreach_df = st.session_state.outreach_df.copy()
+    outreach_df = st.session_state.outreach_df
     if outreach_df.empty:
         st.warning("📭 No CRM data loaded.")
         return
     
-    if 'timestamp' in outreach_df.columns:
-        outreach_df['parsed_time'] = outreach_df['timestamp'].apply(parse_timestamp)
-        outreach_df['date'] = outreach_df['parsed_time'].dt.date
-        outreach_df['time'] = outreach_df['parsed_time'].dt.time
-    
     st.markdown("### 🔍 Filter Leads")
     col1, col2, col3, col4 = st.columns(4)
     
@@ -256,16 +229,19 @@ def show_crm_dashboard():
         else:
             city_filter = "All"
     
-    filtered_df = outreach_df.copy()
+    # One mask over the shared frame; the search box is answered from the lead index
+    mask = pd.Series(True, index=outreach_df.index)
     if search:
-        mask = filtered_df.astype(str).apply(lambda x: x.str.contains(search, case=False, na=False)).any(axis=1)
-        filtered_df = filtered_df[mask]
-    if date_filter != "All" and 'date' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['date'].astype(str) == date_filter]
-    if success_filter != "All" and 'success' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['success'].astype(str).str.lower() == success_filter.lower()]
-    if city_filter != "All" and 'search_city' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['search_city'] == city_filter]
+        mask &= search_mask(outreach_df, search, session_key='crm_search')
+    if date_filter != "All" and 'date' in outreach_df.columns:
+        mask &= outreach_df['date'].astype(str) == date_filter
+    facets = {}
+    if success_filter != "All" and 'success' in outreach_df.columns:
+        facets['is_success'] = success_filter == "True"
+    if city_filter != "All" and 'search_city' in outreach_df.columns:
+        facets['search_city'] = city_filter
+    mask &= facet_mask(outreach_df, facets)
+    filtered_df = outreach_df[mask]
     
     st.markdown(f"**Showing {len(filtered_df)} of {len(outreach_df)} leads**")
     st.markdown("---")
@@ -292,7 +268,7 @@ def show_crm_dashboard():
                 ''', unsafe_allow_html=True)
             
             with col2:
-                success_badge = "status-success" if is_message_sent(row) else "status-error"
+                success_badge = "status-success" if row['is_sent'] else "status-error"
                 st.markdown(f'''
                 <div class="crm-field"><strong>🕐 Timestamp:</strong> {row.get('timestamp', 'N/A')}</div>
                 <div class="crm-field"><strong>✅ Success:</strong> <span class="status-badge {success_badge}">{row.get('success', 'N/A')}</span></div>
@@ -337,7 +313,7 @@ def show_crm_dashboard():
 def show_email_outreach():
     st.markdown("<div class='section-header'>📧 Email Outreach Campaign Manager</div>", unsafe_allow_html=True)
     
-    outreach_df = st.session_state.outreach_df.copy()
+    outreach_df = st.session_state.outreach_df
     if outreach_df.empty:
         st.warning("📭 No email data.")
         return
@@ -345,7 +321,7 @@ def show_email_outreach():
     email_df = outreach_df[
         (outreach_df['email_subject'].notna() & (outreach_df['email_subject'] != '')) |
         (outreach_df['email_message'].notna() & (outreach_df['email_message'] != ''))
-    ].copy()
+    ]
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -364,7 +340,7 @@ def show_email_outreach():
         </div>
         ''', unsafe_allow_html=True)
     with col3:
-        sent = len(email_df[email_df['success'].astype(str).str.lower() == 'true']) if 'success' in email_df.columns else 0
+        sent = int(email_df['is_success'].sum())
         st.markdown(f'''
         <div class="stat-box">
             <div class="stat-number">{sent}</div>
@@ -390,20 +366,18 @@ def show_email_outreach():
     with col3:
         sort_by = st.selectbox("🔄 Sort", ["Newest", "Oldest", "Name"], key="email_sort")
     
-    filtered_df = email_df.copy()
-    if search:
-        mask = filtered_df.astype(str).apply(lambda x: x.str.contains(search, case=False, na=False)).any(axis=1)
-        filtered_df = filtered_df[mask]
+    filtered_df = email_df
+    if status_filter == "Ready" and 'status' in email_df.columns:
+        filtered_df = email_df[facet_mask(outreach_df, {'status': 'ready_to_send'}).loc[email_df.index]]
+    elif status_filter == "Sent" and 'success' in email_df.columns:
+        filtered_df = email_df[email_df['is_success']]
+    elif status_filter == "Pending" and 'success' in email_df.columns:
+        filtered_df = email_df[~email_df['is_success']]
     
-    if status_filter == "Ready" and 'status' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['status'] == 'ready_to_send']
-    elif status_filter == "Sent" and 'success' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['success'].astype(str).str.lower() == 'true']
-    elif status_filter == "Pending" and 'success' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['success'].astype(str).str.lower() != 'true']
+    if search:
+        filtered_df = filtered_df[search_mask(outreach_df, search, session_key='email_search').loc[filtered_df.index]]
     
     if 'timestamp' in filtered_df.columns:
-        filtered_df['parsed_time'] = filtered_df['timestamp'].apply(parse_timestamp)
         if sort_by == "Newest":
             filtered_df = filtered_df.sort_values('parsed_time', ascending=False)
         elif sort_by == "Oldest":
@@ -420,7 +394,7 @@ def show_email_outreach():
         email_subject = row.get('email_subject', 'No Subject')
         email_message = row.get('email_message', 'No Message')
         timestamp = row.get('timestamp', 'N/A')
-        success = is_message_sent(row)
+        success = row['is_sent']
         
         success_class = "status-success" if success else "status-pending"
         success_text = "✅ SENT" if success else "📤 READY"
@@ -458,19 +432,16 @@ def show_email_outreach():
 def show_lead_outreach():
     st.markdown("<div class='section-header'>🎯 Lead Outreach Management</div>", unsafe_allow_html=True)
     
-    outreach_df = st.session_state.outreach_df.copy()
+    outreach_df = st.session_state.outreach_df
     if outreach_df.empty:
         st.warning("📭 No outreach data.")
         return
     
-    if 'timestamp' in outreach_df.columns:
-        outreach_df['parsed_time'] = outreach_df['timestamp'].apply(parse_timestamp)
-
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.markdown(f'''<div class="stat-box"><div class="stat-number">{len(outreach_df)}</div><div class="stat-label">Total Leads</div></div>''', unsafe_allow_html=True)
     with col2:
-        sent = len(outreach_df[outreach_df['success'].astype(str).str.lower() == 'true']) if 'success' in outreach_df.columns else 0
+        sent = int(outreach_df['is_success'].sum())
         st.markdown(f'''<div class="stat-box"><div class="stat-number">{sent}</div><div class="stat-label">Sent</div></div>''', unsafe_allow_html=True)
     with col3:
         pending = len(outreach_df[outreach_df['status'] == 'pending']) if 'status' in outreach_df.columns else 0
@@ -634,38 +605,7 @@ def show_search_interface(webhook_url):
 
 # ------------------ CHAT ANALYTICS ------------------ #
 def get_contact_info(df, my_profile):
-    contacts = {}
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        if is_me(sender_name, sender_url, my_profile):
-            continue
-        contact_url = sender_url if sender_url else row.get('lead_linkedin_url', '')
-        contact_name = sender_name if sender_name else row.get('lead_name', '')
-        if contact_url and contact_url not in contacts:
-            contacts[contact_url] = {
-                'name': contact_name, 'url': contact_url, 'messages': [],
-                'last_contact': None, 'received_count': 0, 'sent_count': 0
-            }
-    
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        lead_url = row.get('lead_linkedin_url', '')
-        
-        if is_me(sender_name, sender_url, my_profile):
-            if lead_url in contacts:
-                contacts[lead_url]['sent_count'] += 1
-                contacts[lead_url]['messages'].append(row)
-                contacts[lead_url]['last_contact'] = f"{row.get('date', '')} {row.get('time', '')}"
-        else:
-            contact_url = sender_url if sender_url else lead_url
-            if contact_url in contacts:
-                contacts[contact_url]['received_count'] += 1
-                contacts[contact_url]['messages'].append(row)
-                contacts[contact_url]['last_contact'] = f"{row.get('date', '')} {row.get('time', '')}"
-    
-    return contacts
+    return contact_table(df, my_profile)
 
 def show_chat_analytics():
     st.markdown("<div class='section-header'>💬 Chat History Analytics</div>", unsafe_allow_html=True)
@@ -677,6 +617,7 @@ def show_chat_analytics():
     
     my_profile = {'name': MY_PROFILE['name'], 'url': MY_PROFILE['url']}
     contacts = get_contact_info(chat_df, my_profile)
+    mine = mine_column(chat_df, my_profile)
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -684,7 +625,7 @@ def show_chat_analytics():
     with col2:
         st.markdown(f'''<div class="stat-box"><div class="stat-number">{len(contacts)}</div><div class="stat-label">Contacts</div></div>''', unsafe_allow_html=True)
     with col3:
-        my_messages = sum(1 for _, row in chat_df.iterrows() if is_me(row.get('sender_name', ''), row.get('sender_linkedin_url', ''), my_profile))
+        my_messages = int(mine.sum())
         st.markdown(f'''<div class="stat-box"><div class="stat-number">{my_messages}</div><div class="stat-label">Sent by You</div></div>''', unsafe_allow_html=True)
     with col4:
         received = len(chat_df) - my_messages
@@ -696,14 +637,14 @@ def show_chat_analytics():
     st.markdown("---")
     
     if view_mode == "📇 Contacts":
-        if not contacts:
+        if contacts.empty:
             st.info("🔭 No contacts found")
             return
         
         cols = st.columns(2)
-        for idx, (url, info) in enumerate(contacts.items()):
+        for idx, (url, info) in enumerate(contacts.iterrows()):
             col = cols[idx % 2]
-            message_count = len(info['messages'])
+            message_count = info['message_count']
             initials = get_initials(info['name'])
             
             with col:
@@ -729,7 +670,7 @@ def show_chat_analytics():
             date = str(row.get('date', ''))
             time_str = str(row.get('time', ''))
             
-            is_my_message = is_me(sender_name, row.get('sender_linkedin_url', ''), my_profile)
+            is_my_message = bool(mine[i])
             badge_style = "background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);" if is_my_message else "background: #10b981;"
             badge_text = "You" if is_my_message else "Received"
             
@@ -751,7 +692,7 @@ def show_overview():
     st.markdown("<div class='section-header'>📊 Dashboard Overview</div>", unsafe_allow_html=True)
     
     chat_df = st.session_state.chat_df
-    outreach_df = st.session_state.outreach_df.copy()
+    outreach_df = st.session_state.outreach_df
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -759,7 +700,7 @@ def show_overview():
     with col2:
         st.markdown(f'''<div class="metric-card" style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%);"><div class="metric-value">{len(outreach_df)}</div><div class="metric-label">Total Leads</div></div>''', unsafe_allow_html=True)
     with col3:
-        sent = len(outreach_df[outreach_df['success'].astype(str).str.lower() == 'true']) if 'success' in outreach_df.columns and not outreach_df.empty else 0
+        sent = int(outreach_df['is_success'].sum()) if not outreach_df.empty else 0
         st.markdown(f'''<div class="metric-card" style="background: linear-gradient(135deg, #10b981 0%, #059669 100%);"><div class="metric-value">{sent}</div><div class="metric-label">Messages Sent</div></div>''', unsafe_allow_html=True)
     with col4:
         pending = len(outreach_df) - sent if not outreach_df.empty else 0
@@ -771,14 +712,14 @@ def show_overview():
     with col1:
         st.markdown("#### 📈 Lead Status")
         if not outreach_df.empty and 'status' in outreach_df.columns:
-            status_counts = outreach_df['status'].value_counts()
+            status_counts = count_values(outreach_df, 'status')
             fig = px.pie(values=status_counts.values, names=status_counts.index, hole=0.4)
             st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         st.markdown("#### 🌆 Top Cities")
         if not outreach_df.empty and 'search_city' in outreach_df.columns:
-            city_counts = outreach_df['search_city'].value_counts().head(10)
+            city_counts = count_values(outreach_df, 'search_city').head(10)
             fig = px.bar(x=city_counts.values, y=city_counts.index, orientation='h')
             st.plotly_chart(fig, use_container_width=True)
 
@@ -808,8 +749,12 @@ def main():
         if st.button("🔄 Load/Refresh Data", use_container_width=True):
             with st.spinner("Loading..."):
                 try:
-                    st.session_state.chat_df = load_sheet_data(st.session_state.gsheets_client, CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME)
-                    st.session_state.outreach_df = load_sheet_data(st.session_state.gsheets_client, OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+                    # Drop the cached frames first so a refresh inside the TTL still refetches
+                    invalidate_sheet(CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME)
+                    invalidate_sheet(OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+                    # Parse timestamps and flags once per data version, not on every render
+                    st.session_state.chat_df = normalize_chat(load_sheet_data(st.session_state.gsheets_client, CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME), MY_PROFILE)
+                    st.session_state.outreach_df = normalize_outreach(load_sheet_data(st.session_state.gsheets_client, OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME))
                     st.success("✅ Data loaded!")
                     st.rerun()
                 except Exception as e:
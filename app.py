@@ -11,6 +11,10 @@ from plotly.subplots import make_subplots
 import requests
 import time
 import re
+from sheet_loader import get_sheet_frame, load_sheets, invalidate_sheet, describe_snapshot, QuotaAwareClient, stream_sheet, has_sheet_state
+from lead_data import mine_column, mine_mask, lead_id_column, lead_widget_keys, contact_table, contact_messages, count_values, count_by_date, count_by_timestamp_date
+from lead_search import search_mask, message_search_mask
+from lead_filters import facet_mask
 
 # ------------------ PAGE CONFIG ------------------ #
 st.set_page_config(
@@ -49,13 +53,15 @@ if 'activity_log' not in st.session_state:
 if 'sent_leads' not in st.session_state:
     st.session_state.sent_leads = set()
 if 'selected_leads' not in st.session_state:
-    st.session_state.selected_leads = []
+    st.session_state.selected_leads = set()
 if 'current_client' not in st.session_state:
     st.session_state.current_client = None
 if 'chat_df' not in st.session_state:
     st.session_state.chat_df = pd.DataFrame()
 if 'outreach_df' not in st.session_state:
     st.session_state.outreach_df = pd.DataFrame()
+if 'pending_loads' not in st.session_state:
+    st.session_state.pending_loads = set()
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = datetime.utcnow()
 if 'webhook_history' not in st.session_state:
@@ -637,24 +643,68 @@ def init_google_sheets(credentials_json):
             scopes=scopes
         )
         client = gspread.authorize(credentials)
-        return client
+        return QuotaAwareClient(client, credentials_dict.get('client_email', 'default'))
     except Exception as e:
         st.error(f"Error initializing Google Sheets: {str(e)}")
         return None
 
-@st.cache_data(ttl=60)
 def load_sheet_data(_client, sheet_id, sheet_name):
     """Load data from a specific Google Sheet"""
     try:
-        spreadsheet = _client.open_by_key(sheet_id)
-        worksheet = spreadsheet.worksheet(sheet_name)
-        data = worksheet.get_all_records()
-        df = pd.DataFrame(data)
-        return df
+        return get_sheet_frame(_client, sheet_id, sheet_name, tenant=get_client_from_url())
     except Exception as e:
         st.error(f"Error loading data from {sheet_name}: {str(e)}")
         return pd.DataFrame()
 
+def load_all_sheet_data(_client, sheets):
+    """Load several Google Sheets concurrently as one bundle"""
+    frames, errors = load_sheets(_client, sheets, tenant=get_client_from_url())
+    for name, error in errors.items():
+        st.error(f"Error loading data from {sheets[name][1]}: {str(error)}")
+    return frames
+
+def stream_pending_sheet(name, sheet_id, sheet_name, counters):
+    """Stream a cold sheet into session state, showing its first page and running counts"""
+    if name not in st.session_state.pending_loads:
+        return
+    
+    progress = st.empty()
+    first_page = st.empty()
+    totals = dict.fromkeys(counters, 0)
+    try:
+        chunks = stream_sheet(st.session_state.gsheets_client, sheet_id, sheet_name, tenant=get_client_from_url())
+        for position, chunk in enumerate(chunks):
+            for label, count in counters.items():
+                totals[label] += count(chunk)
+            with progress.container():
+                cols = st.columns(len(totals))
+                for col, (label, total) in zip(cols, totals.items()):
+                    col.metric(label, f"{total:,}")
+                st.caption(f"⏳ Loading {sheet_name}...")
+            if position == 0:
+                first_page.dataframe(chunk.head(25), use_container_width=True)
+        df = load_sheet_data(st.session_state.gsheets_client, sheet_id, sheet_name)
+    except Exception as e:
+        st.error(f"Error loading data from {sheet_name}: {str(e)}")
+        df = pd.DataFrame()
+    progress.empty()
+    first_page.empty()
+    
+    st.session_state[f"{name}_df"] = df
+    st.session_state.pending_loads.discard(name)
+    st.session_state.last_refresh = datetime.utcnow()
+    if not st.session_state.pending_loads:
+        st.rerun()
+
+def refresh_outreach_data():
+    """Refetch this tenant's outreach sheet without clearing anyone else's cache"""
+    invalidate_sheet(OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME, tenant=get_client_from_url())
+    st.session_state.outreach_df = load_sheet_data(
+        st.session_state.gsheets_client,
+        OUTREACH_SPREADSHEET_ID,
+        OUTREACH_SHEET_NAME
+    )
+
 # ------------------ CLIENT PROFILE SYSTEM ------------------ #
 def get_client_from_url():
     """Extract client identifier from URL parameters"""
@@ -763,15 +813,6 @@ def authenticate_user():
         st.info("💡 **Pro Tip:** Your credentials are processed securely and never stored on our servers.")
 
 # ------------------ HELPER FUNCTIONS ------------------ #
-def is_me(sender_name, sender_url, my_profile):
-    """Check if the sender is the current user"""
-    if not sender_name or not isinstance(sender_name, str):
-        return False
-    return (
-        my_profile["name"].lower() in sender_name.lower() or
-        (sender_url and my_profile["url"].lower() in str(sender_url).lower())
-    )
-
 def get_initials(name):
     """Get initials from name"""
     if not name:
@@ -784,57 +825,14 @@ def get_initials(name):
 # ------------------ CHAT ANALYTICS FUNCTIONS ------------------ #
 def get_contact_info(df, my_profile):
     """Extract unique contacts from chat data"""
-    contacts = {}
-    
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        lead_name = row.get('lead_name', '')
-        lead_url = row.get('lead_linkedin_url', '')
-        
-        if is_me(sender_name, sender_url, my_profile):
-            continue
-        
-        contact_url = sender_url if sender_url else lead_url
-        contact_name = sender_name if sender_name else lead_name
-        
-        if contact_url and contact_url not in contacts:
-            contacts[contact_url] = {
-                'name': contact_name,
-                'url': contact_url,
-                'messages': [],
-                'last_contact': None,
-                'received_count': 0,
-                'sent_count': 0
-            }
-    
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        lead_url = row.get('lead_linkedin_url', '')
-        
-        contact_url = None
-        if is_me(sender_name, sender_url, my_profile):
-            contact_url = lead_url
-            if contact_url in contacts:
-                contacts[contact_url]['sent_count'] += 1
-        else:
-            contact_url = sender_url if sender_url else lead_url
-            if contact_url in contacts:
-                contacts[contact_url]['received_count'] += 1
-        
-        if contact_url in contacts:
-            contacts[contact_url]['messages'].append(row)
-            contacts[contact_url]['last_contact'] = f"{row.get('date', '')} {row.get('time', '')}"
-    
-    return contacts
+    return contact_table(df, my_profile)
 
 def create_message_chart(df):
     """Create a message activity chart"""
     if df.empty or 'date' not in df.columns:
         return None
     
-    message_counts = df['date'].value_counts().sort_index()
+    message_counts = count_values(df, 'date').sort_index()
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -862,6 +860,11 @@ def create_message_chart(df):
 def show_lead_outreach():
     st.markdown("<div class='section-header'>🎯 Lead Outreach Management</div>", unsafe_allow_html=True)
     
+    stream_pending_sheet('outreach', OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME, {
+        'Leads Loaded': len,
+        'Sent': lambda chunk: int((chunk['status'] == 'sent').sum()) if 'status' in chunk.columns else 0,
+        'Pending': lambda chunk: int((chunk['status'] == 'pending').sum()) if 'status' in chunk.columns else 0
+    })
     outreach_df = st.session_state.outreach_df
     
     if outreach_df.empty:
@@ -933,19 +936,21 @@ def show_lead_outreach():
         sort_by = st.selectbox("🔄 Sort By", sort_columns if sort_columns else ["Default"])
     
     # Apply filters
-    filtered_df = outreach_df.copy()
+    # One mask over the shared frame; the search box is answered from the lead index
+    mask = pd.Series(True, index=outreach_df.index)
     
     if search_query:
-        mask = filtered_df.astype(str).apply(
-            lambda x: x.str.contains(search_query, case=False, na=False)
-        ).any(axis=1)
-        filtered_df = filtered_df[mask]
+        mask &= search_mask(outreach_df, search_query, session_key='lead_search')
+    
+    facets = {}
+    if status_filter != "All" and 'status' in outreach_df.columns:
+        facets['status'] = status_filter
     
-    if status_filter != "All" and 'status' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['status'] == status_filter]
+    if city_filter != "All" and 'search_city' in outreach_df.columns:
+        facets['search_city'] = city_filter
     
-    if city_filter != "All" and 'search_city' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['search_city'] == city_filter]
+    mask &= facet_mask(outreach_df, facets)
+    filtered_df = outreach_df[mask]
     
     if sort_by != "Default" and sort_by in filtered_df.columns:
         filtered_df = filtered_df.sort_values(by=sort_by, ascending=False)
@@ -998,10 +1003,12 @@ def show_lead_outreach():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
+                lead_ids = lead_id_column(filtered_df)
                 for idx, (i, row) in enumerate(filtered_df.head(bulk_count).iterrows()):
+                    lead_id = lead_ids[i]
                     lead_name = row.get('profile_name', row.get('name', 'Lead'))
                     status_text.text(f"Sending to {lead_name}...")
-                    st.session_state.sent_leads.add(i)
+                    st.session_state.sent_leads.add(lead_id)
                     
                     # Log activity
                     st.session_state.activity_log.append({
@@ -1032,7 +1039,7 @@ def show_lead_outreach():
         
         with col4:
             if st.button("🔄 Refresh", use_container_width=True, key="refresh_leads"):
-                st.cache_data.clear()
+                refresh_outreach_data()
                 st.rerun()
 
 def display_leads_cards(df):
@@ -1041,7 +1048,12 @@ def display_leads_cards(df):
         st.info("No leads to display")
         return
     
+    lead_ids = lead_id_column(df)
+    # Widgets are keyed by lead, so their state follows the lead when rows shift
+    widget_keys = lead_widget_keys(lead_ids)
     for idx, (i, row) in enumerate(df.iterrows()):
+        lead_id = lead_ids[i]
+        widget_key = widget_keys[i]
         col1, col2 = st.columns([3, 1])
         
         with col1:
@@ -1069,7 +1081,7 @@ def display_leads_cards(df):
                 'pending': 'status-pending'
             }.get(status, 'status-pending')
             
-            is_sent = status == 'sent' or i in st.session_state.sent_leads
+            is_sent = status == 'sent' or lead_id in st.session_state.sent_leads
             sent_indicator = "✅ SENT" if is_sent else ""
             
             st.markdown(f"""
@@ -1092,8 +1104,8 @@ def display_leads_cards(df):
         with col2:
             st.markdown("**Actions**")
             
-            if st.button("🚀 Send", key=f"send_{i}_{idx}", disabled=is_sent, use_container_width=True):
-                st.session_state.sent_leads.add(i)
+            if st.button("🚀 Send", key=f"send_{widget_key}", disabled=is_sent, use_container_width=True):
+                st.session_state.sent_leads.add(lead_id)
                 st.session_state.activity_log.append({
                     "type": "Message Sent",
                     "details": f"To {name}",
@@ -1104,19 +1116,17 @@ def display_leads_cards(df):
                 time.sleep(1)
                 st.rerun()
             
-            if st.button("📋 Copy", key=f"copy_{i}_{idx}", use_container_width=True):
+            if st.button("📋 Copy", key=f"copy_{widget_key}", use_container_width=True):
                 st.info("📋 Lead data copied!")
             
-            if st.button("⭐ Save", key=f"save_{i}_{idx}", use_container_width=True):
+            if st.button("⭐ Save", key=f"save_{widget_key}", use_container_width=True):
                 st.info("⭐ Lead saved!")
             
-            is_selected = i in st.session_state.selected_leads
-            if st.checkbox("Select", key=f"select_{i}_{idx}", value=is_selected):
-                if i not in st.session_state.selected_leads:
-                    st.session_state.selected_leads.append(i)
+            is_selected = lead_id in st.session_state.selected_leads
+            if st.checkbox("Select", key=f"select_{widget_key}", value=is_selected):
+                st.session_state.selected_leads.add(lead_id)
             else:
-                if i in st.session_state.selected_leads:
-                    st.session_state.selected_leads.remove(i)
+                st.session_state.selected_leads.discard(lead_id)
 
 def display_leads_table(df):
     """Display leads in table format"""
@@ -1142,7 +1152,11 @@ def display_leads_compact(df):
         st.info("No leads to display")
         return
     
+    lead_ids = lead_id_column(df)
+    widget_keys = lead_widget_keys(lead_ids)
     for idx, (i, row) in enumerate(df.iterrows()):
+        lead_id = lead_ids[i]
+        widget_key = widget_keys[i]
         name = str(row.get('profile_name', row.get('name', 'Unnamed Lead')))
         location = str(row.get('profile_location', row.get('location', 'Unknown')))
         status = str(row.get('status', 'unknown'))
@@ -1156,9 +1170,9 @@ def display_leads_compact(df):
         with col3:
             st.write(f"📊 {status}")
         with col4:
-            is_sent = status == 'sent' or i in st.session_state.sent_leads
-            if st.button("🚀", key=f"send_compact_{i}_{idx}", help="Send message", disabled=is_sent):
-                st.session_state.sent_leads.add(i)
+            is_sent = status == 'sent' or lead_id in st.session_state.sent_leads
+            if st.button("🚀", key=f"send_compact_{widget_key}", help="Send message", disabled=is_sent):
+                st.session_state.sent_leads.add(lead_id)
                 st.success("Sent!")
                 st.rerun()
 
@@ -1305,8 +1319,8 @@ def show_search_interface(webhook_url):
         # Quick actions
         st.markdown("#### ⚡ Quick Actions")
         if st.button("🔄 Refresh Outreach Data", use_container_width=True):
-            st.cache_data.clear()
-            st.info("Refreshing... click Load/Refresh Data in sidebar")
+            refresh_outreach_data()
+            st.success(f"✅ Refreshed {len(st.session_state.outreach_df)} leads")
         
         if st.button("📊 View All Leads", use_container_width=True):
             st.info("Navigate to 'Lead Outreach' tab to view all leads")
@@ -1345,7 +1359,7 @@ def show_overview_analytics(chat_df, outreach_df):
         st.markdown("#### 💬 Chat Analytics")
         if not chat_df.empty:
             if 'date' in chat_df.columns:
-                daily_activity = chat_df.groupby('date').size().reset_index(name='messages')
+                daily_activity = count_by_date(chat_df).reset_index(name='messages')
                 
                 fig = px.line(
                     daily_activity,
@@ -1362,7 +1376,7 @@ def show_overview_analytics(chat_df, outreach_df):
     with col2:
         st.markdown("#### 🎯 Outreach Analytics")
         if not outreach_df.empty and 'status' in outreach_df.columns:
-            status_counts = outreach_df['status'].value_counts()
+            status_counts = count_values(outreach_df, 'status')
             
             fig = px.pie(
                 values=status_counts.values,
@@ -1381,7 +1395,7 @@ def show_geographic_analytics(outreach_df):
         return
     
     if 'search_city' in outreach_df.columns:
-        city_counts = outreach_df['search_city'].value_counts().head(15)
+        city_counts = count_values(outreach_df, 'search_city').head(15)
         
         fig = px.bar(
             x=city_counts.values,
@@ -1404,7 +1418,7 @@ def show_timeline_analytics(chat_df, outreach_df):
     with col1:
         if not chat_df.empty and 'date' in chat_df.columns:
             st.markdown("#### 💬 Chat Timeline")
-            daily_chats = chat_df.groupby('date').size().tail(30).reset_index(name='count')
+            daily_chats = count_by_date(chat_df).tail(30).reset_index(name='count')
             
             fig = px.area(
                 daily_chats,
@@ -1421,8 +1435,7 @@ def show_timeline_analytics(chat_df, outreach_df):
         if not outreach_df.empty and 'timestamp' in outreach_df.columns:
             st.markdown("#### 🎯 Outreach Timeline")
             try:
-                outreach_df['date'] = pd.to_datetime(outreach_df['timestamp']).dt.date
-                daily_outreach = outreach_df.groupby('date').size().tail(30).reset_index(name='count')
+                daily_outreach = count_by_timestamp_date(outreach_df).tail(30).reset_index(name='count')
                 
                 fig = px.area(
                     daily_outreach,
@@ -1470,8 +1483,7 @@ def show_performance_analytics(outreach_df):
     # Performance trends
     if 'timestamp' in outreach_df.columns and 'status' in outreach_df.columns:
         try:
-            outreach_df['date'] = pd.to_datetime(outreach_df['timestamp']).dt.date
-            daily_performance = outreach_df.groupby(['date', 'status']).size().unstack(fill_value=0)
+            daily_performance = count_by_timestamp_date(outreach_df, 'status')
             
             if not daily_performance.empty:
                 fig = px.area(
@@ -1529,7 +1541,7 @@ def show_overview():
         contacts = get_contact_info(chat_df, {
             'name': MY_PROFILE['name'],
             'url': MY_PROFILE['url']
-        }) if not chat_df.empty else {}
+        })
         contact_count = len(contacts)
         
         st.markdown(f"""
@@ -1551,7 +1563,7 @@ def show_overview():
         st.markdown("#### 💬 Chat Activity")
         if not chat_df.empty and 'date' in chat_df.columns:
             try:
-                daily_chats = chat_df.groupby('date').size().tail(7).reset_index()
+                daily_chats = count_by_date(chat_df).tail(7).reset_index()
                 daily_chats.columns = ['Date', 'Messages']
                 
                 fig = px.bar(
@@ -1575,7 +1587,7 @@ def show_overview():
     with col2:
         st.markdown("#### 🎯 Outreach Status")
         if not outreach_df.empty and 'status' in outreach_df.columns:
-            status_counts = outreach_df['status'].value_counts()
+            status_counts = count_values(outreach_df, 'status')
             
             fig = px.pie(
                 values=status_counts.values,
@@ -1616,6 +1628,10 @@ def show_overview():
 def show_chat_analytics():
     st.markdown("<div class='section-header'>💬 Chat History Analytics</div>", unsafe_allow_html=True)
     
+    stream_pending_sheet('chat', CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME, {
+        'Messages Loaded': len,
+        'Sent by You': lambda chunk: int(mine_mask(chunk, MY_PROFILE).sum())
+    })
     chat_df = st.session_state.chat_df
     
     if chat_df.empty:
@@ -1651,7 +1667,7 @@ def show_chat_analytics():
         """, unsafe_allow_html=True)
     
     with col3:
-        my_messages = sum(1 for _, row in chat_df.iterrows() if is_me(row.get('sender_name', ''), row.get('sender_linkedin_url', ''), my_profile))
+        my_messages = int(mine_column(chat_df, my_profile).sum())
         st.markdown(f"""
         <div class="stat-box">
             <div class="stat-number">{my_messages}</div>
@@ -1697,7 +1713,7 @@ def show_all_contacts(contacts):
     st.subheader("📇 All Contacts")
     st.markdown("*Click on LinkedIn profile to connect with contacts*")
     
-    if not contacts:
+    if contacts.empty:
         st.info("🔭 No contacts found in chat history")
         return
     
@@ -1709,23 +1725,15 @@ def show_all_contacts(contacts):
         sort_by = st.selectbox("Sort by", ["Name", "Messages", "Recent"])
     
     # Filter contacts
-    filtered_contacts = {
-        url: info for url, info in contacts.items()
-        if not search or search.lower() in info['name'].lower()
-    }
+    filtered_contacts = contacts
+    if search:
+        filtered_contacts = contacts[contacts['name'].str.lower().str.contains(search.lower(), regex=False)]
     
     # Sort contacts
     if sort_by == "Messages":
-        filtered_contacts = dict(sorted(
-            filtered_contacts.items(),
-            key=lambda x: len(x[1]['messages']),
-            reverse=True
-        ))
+        filtered_contacts = filtered_contacts.sort_values('message_count', ascending=False, kind='stable')
     elif sort_by == "Name":
-        filtered_contacts = dict(sorted(
-            filtered_contacts.items(),
-            key=lambda x: x[1]['name']
-        ))
+        filtered_contacts = filtered_contacts.sort_values('name', kind='stable')
     
     st.markdown(f"**Showing {len(filtered_contacts)} contacts**")
     st.markdown("")
@@ -1733,10 +1741,10 @@ def show_all_contacts(contacts):
     # Display in columns
     cols = st.columns(2)
     
-    for idx, (url, info) in enumerate(filtered_contacts.items()):
+    for idx, (url, info) in enumerate(filtered_contacts.iterrows()):
         col = cols[idx % 2]
         
-        message_count = len(info['messages'])
+        message_count = info['message_count']
         initials = get_initials(info['name'])
         
         with col:
@@ -1775,22 +1783,22 @@ def show_contact_conversation(contacts, chat_df, my_profile):
     st.subheader("💬 Contact Conversation")
     st.markdown("*View detailed conversation history*")
     
-    if not contacts:
+    if contacts.empty:
         st.info("🔭 No contacts found")
         return
     
     # Contact selection
-    contact_names = {info['name']: url for url, info in contacts.items()}
+    contact_names = dict(zip(contacts['name'], contacts['url']))
     selected_name = st.selectbox("Select a contact", list(contact_names.keys()))
     
     if not selected_name:
         return
     
     selected_url = contact_names[selected_name]
-    contact_info = contacts[selected_url]
+    contact_info = contacts.loc[selected_url]
     
     # Contact header
-    message_count = len(contact_info['messages'])
+    message_count = contact_info['message_count']
     initials = get_initials(contact_info['name'])
     
     st.markdown(f"""
@@ -1823,18 +1831,15 @@ def show_contact_conversation(contacts, chat_df, my_profile):
     
     st.markdown("### 💬 Conversation History")
     
-    # Sort messages
-    messages = sorted(
-        contact_info['messages'],
-        key=lambda x: (x.get('date', ''), x.get('time', ''))
-    )
+    # Already in time order: a slice of the contact index
+    messages = contact_messages(chat_df, my_profile, selected_url)
     
     current_date = None
     
     # Display messages
-    for msg in messages:
+    mine = mine_column(chat_df, my_profile)
+    for _, msg in messages.iterrows():
         sender_name = msg.get('sender_name', '')
-        sender_url = msg.get('sender_linkedin_url', '')
         message_text = msg.get('message', '')
         date = msg.get('date', '')
         time_str = msg.get('time', '')
@@ -1845,7 +1850,7 @@ def show_contact_conversation(contacts, chat_df, my_profile):
             st.markdown(f'<div class="conversation-date-divider">{date}</div>', unsafe_allow_html=True)
             current_date = date
         
-        is_my_message = is_me(sender_name, sender_url, my_profile)
+        is_my_message = bool(mine[msg.name])
         
         if is_my_message:
             st.markdown(f"""
@@ -1885,24 +1890,18 @@ def show_all_messages_view(chat_df, my_profile):
         sort_order = st.selectbox("Sort", ["Newest First", "Oldest First"])
     
     # Apply filters
-    filtered_df = chat_df.copy()
-    
-    if search:
-        mask = filtered_df.astype(str).apply(
-            lambda x: x.str.contains(search, case=False, na=False)
-        ).any(axis=1)
-        filtered_df = filtered_df[mask]
+    mine = mine_column(chat_df, my_profile)
+    mask = pd.Series(True, index=chat_df.index)
     
     if show_only == "Sent by Me":
-        filtered_df = filtered_df[filtered_df.apply(
-            lambda row: is_me(row.get('sender_name', ''), row.get('sender_linkedin_url', ''), my_profile),
-            axis=1
-        )]
+        mask &= mine
     elif show_only == "Received":
-        filtered_df = filtered_df[filtered_df.apply(
-            lambda row: not is_me(row.get('sender_name', ''), row.get('sender_linkedin_url', ''), my_profile),
-            axis=1
-        )]
+        mask &= ~mine
+    
+    if search:
+        mask &= message_search_mask(chat_df, search)
+    
+    filtered_df = chat_df[mask]
     
     # Sort
     if 'date' in filtered_df.columns and 'time' in filtered_df.columns:
@@ -1929,7 +1928,7 @@ def show_all_messages_view(chat_df, my_profile):
         time_str = str(row.get('time', ''))
         shared_content = str(row.get('shared_content', ''))
         
-        is_my_message = is_me(sender_name, sender_url, my_profile)
+        is_my_message = bool(mine[i])
         
         if is_my_message:
             contact_name = lead_name
@@ -2021,26 +2020,30 @@ def main():
         if st.button("🔄 Load/Refresh Data", use_container_width=True):
             with st.spinner("Loading data from Google Sheets..."):
                 try:
-                    # Load chat data
-                    st.session_state.chat_df = load_sheet_data(
-                        st.session_state.gsheets_client,
-                        CHAT_SPREADSHEET_ID,
-                        CHAT_SHEET_NAME
-                    )
-                    if not st.session_state.chat_df.empty:
-                        st.success(f"✅ Loaded {len(st.session_state.chat_df)} chat messages!")
+                    # Refetch only this tenant's sheets. Warm ones top up concurrently
+                    # here; cold ones stream into their tabs chunk by chunk
+                    tenant = get_client_from_url()
+                    sheets = {
+                        'chat': (CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME),
+                        'outreach': (OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+                    }
+                    for sheet_id, sheet_name in sheets.values():
+                        invalidate_sheet(sheet_id, sheet_name, tenant=tenant)
+                    warm = {name: sheet for name, sheet in sheets.items() if has_sheet_state(*sheet)}
+                    st.session_state.pending_loads = set(sheets) - set(warm)
+                    frames = load_all_sheet_data(st.session_state.gsheets_client, warm) if warm else {}
+                    
+                    if 'chat' in frames:
+                        st.session_state.chat_df = frames['chat']
+                        if not st.session_state.chat_df.empty:
+                            st.success(f"✅ Loaded {len(st.session_state.chat_df)} chat messages!")
                     
-                    # Load outreach data
-                    st.session_state.outreach_df = load_sheet_data(
-                        st.session_state.gsheets_client,
-                        OUTREACH_SPREADSHEET_ID,
-                        OUTREACH_SHEET_NAME
-                    )
-                    if not st.session_state.outreach_df.empty:
-                        st.success(f"✅ Loaded {len(st.session_state.outreach_df)} leads!")
+                    if 'outreach' in frames:
+                        st.session_state.outreach_df = frames['outreach']
+                        if not st.session_state.outreach_df.empty:
+                            st.success(f"✅ Loaded {len(st.session_state.outreach_df)} leads!")
                     
                     st.session_state.last_refresh = datetime.utcnow()
-                    st.cache_data.clear()
                     time.sleep(1)
                     st.rerun()
                     
@@ -2060,7 +2063,9 @@ def main():
         
         st.markdown(f"""
         <div style="background: #f8fafc; padding: 10px; border-radius: 10px; margin-top: 10px;">
-            <small>🕐 Last refresh: {st.session_state.last_refresh.strftime('%H:%M:%S UTC')}</small>
+            <small>🕐 Last refresh: {st.session_state.last_refresh.strftime('%H:%M:%S UTC')}</small><br>
+            <small>💬 Chat data: {describe_snapshot(CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME)}</small><br>
+            <small>🎯 Lead data: {describe_snapshot(OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)}</small>
         </div>
         """, unsafe_allow_html=True)
         
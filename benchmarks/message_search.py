@@ -0,0 +1,92 @@
+"""Build time and query latency of the chat message trigram index against a str.contains scan.
+
+Run from the repo root:
+
+    python benchmarks/message_search.py --rows 50000
+
+The chat frame is synthetic and seeded, so runs are comparable across machines
+and commits. Every query is checked against the scan before it is timed.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lead_search import MESSAGE_SEARCH_COLUMNS, _build_trigram_index, message_search_mask
+
+# Outside `streamlit run` every cached call warns about the missing script context
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+
+# ------------------ SYNTHETIC CHAT ------------------ #
+WORDS = ('hello thanks great connect meeting tomorrow pricing demo follow up interested '
+         'schedule call next week proposal müller café naïve İstanbul 😀').split()
+SENDERS = ['John Smith', 'Jane Doe', 'María García', 'Li Wei', 'Peter Müller', 'Sara Khan']
+SHARED = ['', None, 'https://example.com/deck.pdf', 'Q3 Pricing.xlsx']
+QUERIES = ['llo tha', 'MÜLLER', 'pricing', 'ee', '#1234 ', 'deck.pdf', 'zzzq', 'müller caf', 'Q3 pric']
+
+def make_chat(rows, seed):
+    """Seeded chat frame shaped like the Chat Messages sheet"""
+    rng = random.Random(seed)
+    df = pd.DataFrame({
+        'message': [' '.join(rng.choices(WORDS, k=rng.randint(5, 40))) + f' #{i}' for i in range(rows)],
+        'sender_name': [rng.choice(SENDERS) for _ in range(rows)],
+        'shared_content': [rng.choice(SHARED) for _ in range(rows)],
+        'date': ['2024-01-01'] * rows,
+        'time': ['10:00'] * rows
+    })
+    df.attrs['sheet_version'] = f'bench-{rows}-{seed}'
+    df.attrs['sheet_rows'] = rows
+    return df
+
+# ------------------ TIMING ------------------ #
+def best_of(fn, repeat):
+    """Fastest of repeat runs in milliseconds, plus the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def scan_mask(df, query):
+    """The str.contains scan the trigram index replaced"""
+    return df[MESSAGE_SEARCH_COLUMNS].fillna('').astype(str).apply(
+        lambda x: x.str.lower().str.contains(query.lower(), regex=False)
+    ).any(axis=1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_chat(args.rows, args.seed)
+    build_ms, _ = best_of(lambda: _build_trigram_index(df, tuple(MESSAGE_SEARCH_COLUMNS)), args.repeat)
+    message_search_mask(df, 'warm')  # builds the cached index the queries below reuse
+    print(f'rows={args.rows} seed={args.seed} repeat={args.repeat}')
+    print(f'trigram index build: {build_ms:.1f} ms')
+    print()
+    print(f'{"query":<14}{"matches":>9}{"index ms":>11}{"scan ms":>10}{"speedup":>9}')
+
+    failures = 0
+    for query in QUERIES:
+        index_ms, mask = best_of(lambda: message_search_mask(df, query), args.repeat)
+        scan_ms, expected = best_of(lambda: scan_mask(df, query), args.repeat)
+        if not np.array_equal(mask.to_numpy(), expected.to_numpy()):
+            failures += 1
+            print(f'{query!r:<14} MISMATCH: index {int(mask.sum())} rows, scan {int(expected.sum())} rows')
+            continue
+        print(f'{query!r:<14}{int(mask.sum()):>9}{index_ms:>11.2f}{scan_ms:>10.1f}{scan_ms / index_ms:>8.0f}x')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,409 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import hashlib
+import re
+import threading
+from sheet_loader import frame_version, parse_timestamps, TRUE_VALUES
+
+# ------------------ CONFIGURATION ------------------ #
+NORMALIZED_CACHE_SIZE = 8
+VIEW_CACHE_SIZE = 64
+SENDER_URL_COLUMNS = ['sender_linkedin_url', 'sender_url']
+
+# ------------------ NORMALIZED STORE ------------------ #
+@st.cache_resource
+def get_normalized_store():
+    """Process-wide canonical frames keyed by data version"""
+    return {
+        'lock': threading.Lock(),
+        'frames': {},
+        'mine': {},
+        'lead_ids': {},
+        'views': {},
+        'view_stats': {}
+    }
+
+def _recall(cache, key):
+    """Look up a cache entry and mark it most recently used; call with the store lock held"""
+    if key not in cache:
+        return None
+    cache[key] = cache.pop(key)
+    return cache[key]
+
+def _remember(cache, key, value, size):
+    """Add a cache entry, evicting the least recently used beyond size; call with the store lock held"""
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > size:
+        cache.pop(next(iter(cache)))
+
+def _cached_normalize(kind, df, build, profile=None):
+    """Run a normalization once per (data version, profile) and reuse the result"""
+    version = frame_version(df)
+    if version is None:
+        return build(df)
+
+    store = get_normalized_store()
+    key = (kind, version, tuple(df.columns), index_fingerprint(df), profile)
+    with store['lock']:
+        cached = _recall(store['frames'], key)
+    if cached is not None:
+        return cached
+
+    normalized = build(df)
+    with store['lock']:
+        _remember(store['frames'], key, normalized, NORMALIZED_CACHE_SIZE)
+    return normalized
+
+# ------------------ DERIVED VIEWS ------------------ #
+def index_fingerprint(df):
+    """Cheap token for a frame's row labels in order, so a re-sorted frame gets a new one"""
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        return ('range', index.start, index.stop, index.step)
+    hashed = pd.util.hash_pandas_object(index, index=False).to_numpy()
+    return ('hash', len(index), hashlib.md5(hashed.tobytes()).hexdigest())
+
+def _view_version(df):
+    """Cheap token for a frame's contents, or None when it is a filtered or ad-hoc frame"""
+    if df.empty:
+        return ('empty', tuple(df.columns))
+    version = frame_version(df)
+    if version is None or len(df) != df.attrs.get('sheet_rows'):
+        return None
+    # Views hold row positions, so the same rows in another order need their own entry
+    return (version, tuple(df.columns), index_fingerprint(df))
+
+def _hashable(value):
+    """Turn dict/list arguments into something usable in a cache key"""
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+def cached_view(name, frames, build, *args):
+    """build(*frames, *args), recomputed only when a frame's data version changes.
+
+    frames is one DataFrame or a tuple of them. Results are shared between
+    sessions and reruns, so callers must treat them as read-only.
+    """
+    frames = frames if isinstance(frames, tuple) else (frames,)
+    versions = tuple(_view_version(df) for df in frames)
+    store = get_normalized_store()
+
+    if None in versions:
+        with store['lock']:
+            store['view_stats'].setdefault(name, {'hits': 0, 'misses': 0, 'uncached': 0})['uncached'] += 1
+        return build(*frames, *args)
+
+    key = (name, versions, tuple(_hashable(arg) for arg in args))
+    with store['lock']:
+        stats = store['view_stats'].setdefault(name, {'hits': 0, 'misses': 0, 'uncached': 0})
+        if key in store['views']:
+            stats['hits'] += 1
+            return _recall(store['views'], key)
+        stats['misses'] += 1
+
+    result = build(*frames, *args)
+    with store['lock']:
+        _remember(store['views'], key, result, VIEW_CACHE_SIZE)
+    return result
+
+def get_view_stats():
+    """Hit/miss counters per derived view"""
+    store = get_normalized_store()
+    with store['lock']:
+        return {name: dict(stats) for name, stats in store['view_stats'].items()}
+
+def _value_counts(df, column):
+    """Rows per value of one column"""
+    return df[column].value_counts()
+
+def _date_counts(df, by):
+    """Rows per date, optionally split by a second column"""
+    if by is None:
+        return df.groupby('date').size()
+    return df.groupby(['date', by], observed=True).size().unstack(fill_value=0)
+
+def _timestamp_date_counts(df, by):
+    """Rows per calendar day of the timestamp column, leaving df untouched"""
+    dates = parse_timestamps(df['timestamp']).dt.date
+    return _date_counts(df.assign(date=dates), by)
+
+def count_values(df, column):
+    """Cached df[column].value_counts()"""
+    return cached_view('value_counts', df, _value_counts, column)
+
+def count_by_date(df, by=None):
+    """Cached rows per date, or a date x by table of counts"""
+    return cached_view('date_counts', df, _date_counts, by)
+
+def count_by_timestamp_date(df, by=None):
+    """Like count_by_date, with dates taken from the timestamp column"""
+    return cached_view('timestamp_date_counts', df, _timestamp_date_counts, by)
+
+# ------------------ COLUMN HELPERS ------------------ #
+def _text(df, name):
+    """A column as lowercase text, or blanks when the sheet lacks it"""
+    if name not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[name].fillna('').astype(str).str.lower()
+
+def _raw(df, name):
+    """A column with blanks for missing cells, or all blanks when the sheet lacks it"""
+    if name not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[name].fillna('')
+
+def success_flags(col):
+    """True where the success column says the send went through"""
+    if pd.api.types.is_bool_dtype(col):
+        return col
+    return col.fillna('').astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+
+def mine_mask(df, profile):
+    """True for messages the profile sent, matched on sender name or sender URL (case-insensitive)"""
+    if 'sender_name' not in df.columns or df['sender_name'].dtype.kind not in 'OUS':
+        return pd.Series(False, index=df.index)
+    names = df['sender_name'].fillna('').astype(str)
+    has_name = names != ''
+    mine = names.str.lower().str.contains(profile['name'].lower(), regex=False)
+    for url_column in SENDER_URL_COLUMNS:
+        mine |= _text(df, url_column).str.contains(profile['url'].lower(), regex=False)
+    return has_name & mine
+
+def _cached_column(bucket, df, build, *key):
+    """A per-row column computed once per data version and shared by every view of that load.
+
+    Filtered or re-sorted views of the same load reuse the full frame's values
+    by index; frames that did not come from the loader are computed directly.
+    """
+    version = frame_version(df)
+    if version is None:
+        return build(df)
+
+    store = get_normalized_store()
+    key = (version,) + key
+    with store['lock']:
+        cached = _recall(store[bucket], key)
+    if cached is not None and df.index.isin(cached.index).all():
+        return cached if cached.index.equals(df.index) else cached.reindex(df.index)
+
+    column = build(df)
+    # Only a complete load may seed the cache; subsets would leave rows missing
+    if len(df) == df.attrs.get('sheet_rows') and df.index.is_unique:
+        with store['lock']:
+            _remember(store[bucket], key, column, NORMALIZED_CACHE_SIZE)
+    return column
+
+def mine_column(df, profile):
+    """Cached is_mine flags for a loaded chat frame, computed once per (data version, profile)"""
+    sender_columns = tuple(name for name in ['sender_name'] + SENDER_URL_COLUMNS if name in df.columns)
+    return _cached_column('mine', df, lambda df: mine_mask(df, profile),
+                          sender_columns, profile['name'], profile['url'])
+
+# ------------------ LEAD IDENTITY ------------------ #
+def normalize_linkedin_url(url):
+    """Canonical form of a profile URL: no scheme, country subdomain, query or trailing slash"""
+    url = str(url or '').strip().lower()
+    url = re.sub(r'^https?://', '', url)
+    url = re.sub(r'^([a-z0-9-]+\.)*linkedin\.com', 'linkedin.com', url)
+    return re.split(r'[?#]', url, maxsplit=1)[0].rstrip('/')
+
+def lead_identity(linkedin_url, profile_name):
+    """Stable lead ID from the normalized LinkedIn URL, or from the name when there is no URL"""
+    url = normalize_linkedin_url(linkedin_url)
+    if url:
+        key = f"url:{url}"
+    else:
+        key = f"name:{' '.join(str(profile_name or '').lower().split())}"
+    return hashlib.md5(key.encode()).hexdigest()[:12]
+
+def _lead_ids(df):
+    """lead_identity() for every row, hashing each distinct (url, name) pair once"""
+    pairs = _raw(df, 'linkedin_url').astype(str) + '\x00' + _raw(df, 'profile_name').astype(str)
+    codes, uniques = pd.factorize(pairs)
+    ids = np.array([lead_identity(*pair.split('\x00', 1)) for pair in uniques] + [''], dtype=object)
+    return pd.Series(ids[codes], index=df.index, dtype=object)
+
+def lead_id_column(df):
+    """Cached lead IDs for an outreach frame, computed once per data version"""
+    id_columns = tuple(name for name in ['linkedin_url', 'profile_name'] if name in df.columns)
+    return _cached_column('lead_ids', df, _lead_ids, id_columns)
+
+def lead_widget_keys(lead_ids):
+    """Widget key per row: the lead ID, plus a repeat number when the same lead is listed twice"""
+    repeat = lead_ids.groupby(lead_ids, sort=False).cumcount()
+    return lead_ids.where(repeat == 0, lead_ids + '_' + repeat.astype(str))
+
+# ------------------ CONTACTS ------------------ #
+CONTACT_COLUMNS = ['name', 'url', 'message_count', 'sent_count', 'received_count', 'last_contact']
+
+def contact_keys(df, profile):
+    """The contact URL each chat message belongs to, or '' for messages outside any contact.
+
+    A received message belongs to its sender (falling back to the lead), a sent
+    message to its lead; only URLs that have received a message become contacts.
+    """
+    mine = mine_column(df, profile)
+    lead_url = _raw(df, 'lead_linkedin_url')
+    sender_url = _raw(df, 'sender_linkedin_url')
+    own_key = sender_url.where(sender_url != '', lead_url)
+    known = own_key[~mine & (own_key != '')].unique()
+    keys = own_key.where(~mine, lead_url)
+    return keys.where(keys.isin(known) & (keys != ''), '')
+
+def _contact_table(df, mine, keys):
+    """One row per contact with message counts and last contact, in first-seen order"""
+    sender_name = _raw(df, 'sender_name')
+    frame = pd.DataFrame({
+        'contact': keys.to_numpy(),
+        'mine': mine.to_numpy(dtype=bool),
+        'name': sender_name.where(sender_name != '', _raw(df, 'lead_name')).to_numpy()
+    })
+    frame = frame[frame['contact'] != '']
+    if frame.empty:
+        return pd.DataFrame(columns=CONTACT_COLUMNS)
+
+    # Contacts are named after, and ordered by, their first received message
+    table = frame[~frame['mine']].drop_duplicates('contact').set_index('contact')[['name']]
+    table['url'] = table.index
+    counts = frame.groupby('contact', sort=False)['mine'].agg(['size', 'sum'])
+    table['message_count'] = counts['size'].reindex(table.index)
+    table['sent_count'] = counts['sum'].reindex(table.index).astype(int)
+    table['received_count'] = table['message_count'] - table['sent_count']
+
+    last = frame.drop_duplicates('contact', keep='last')
+    dates = df['date'].iloc[last.index] if 'date' in df.columns else pd.Series('', index=last.index)
+    times = df['time'].iloc[last.index] if 'time' in df.columns else pd.Series('', index=last.index)
+    stamps = {
+        contact: f"{date} {time}"
+        for contact, date, time in zip(last['contact'], dates, times)
+    }
+    table['last_contact'] = table.index.map(stamps)
+    table.index.name = None
+    return table
+
+def _build_contact_index(df, profile):
+    """Contacts table plus all contact messages sorted by (contact, time) with per-contact offsets"""
+    if df.empty:
+        return {'table': pd.DataFrame(columns=CONTACT_COLUMNS), 'messages': df, 'offsets': {}}
+
+    mine = mine_column(df, profile)
+    keys = contact_keys(df, profile)
+    rows = (keys != '').to_numpy()
+    order_by = ['parsed_time'] if 'parsed_time' in df.columns else [name for name in ['date', 'time'] if name in df.columns]
+    sort_frame = pd.DataFrame({'contact': keys.to_numpy()[rows]})
+    for name in order_by:
+        sort_frame[name] = df[name].to_numpy()[rows]
+    order = sort_frame.sort_values(['contact'] + order_by, kind='stable').index.to_numpy()
+
+    messages = df[rows].iloc[order]
+    contacts, starts, counts = np.unique(sort_frame['contact'].to_numpy()[order], return_index=True, return_counts=True)
+    return {
+        'table': _contact_table(df, mine, keys),
+        'messages': messages,
+        'offsets': dict(zip(contacts, zip(starts, starts + counts)))
+    }
+
+def contact_index(df, profile):
+    """Contacts table and sorted message offsets for a chat frame, built once per (data version, profile)"""
+    return cached_view('contacts', df, _build_contact_index, profile)
+
+def contact_table(df, profile):
+    """One row per contact with message counts and last contact, in first-seen order"""
+    return contact_index(df, profile)['table']
+
+def contact_messages(df, profile, url):
+    """All chat rows belonging to one contact, oldest first; a slice of the contact index"""
+    index = contact_index(df, profile)
+    start, end = index['offsets'].get(url, (0, 0))
+    return index['messages'].iloc[start:end]
+
+# ------------------ CONVERSATION THREADS ------------------ #
+THREAD_COLUMNS = ['thread', 'participant', 'message_count', 'first_time', 'last_time', 'start', 'end']
+
+def _build_thread_index(df):
+    """Messages sorted by (thread, time) plus one summary row per thread, newest thread first"""
+    if df.empty:
+        return {'summary': pd.DataFrame(columns=THREAD_COLUMNS), 'messages': df}
+
+    threads = df['conversation_id'].fillna('unknown') if 'conversation_id' in df.columns else pd.Series('unknown', index=df.index)
+    times = df['parsed_time'] if 'parsed_time' in df.columns else pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    frame = pd.DataFrame({
+        'thread': threads.astype(str).to_numpy(),
+        'time': times.to_numpy(),
+        'participant': df['recipient_name'].fillna('Unknown').to_numpy() if 'recipient_name' in df.columns else 'Unknown'
+    })
+
+    # Oldest first inside a thread; each thread's rows are one contiguous run
+    order = frame.sort_values(['thread', 'time'], kind='stable').index.to_numpy()
+    names, starts, counts = np.unique(frame['thread'].to_numpy()[order], return_index=True, return_counts=True)
+
+    # Threads are listed by their latest message, and named after its recipient
+    latest = frame.sort_values('time', ascending=False, kind='stable').drop_duplicates('thread')
+    spans = frame.groupby('thread', sort=False)['time'].agg(['min', 'max'])
+    offsets = pd.DataFrame({'start': starts, 'end': starts + counts, 'message_count': counts}, index=names)
+    summary = pd.DataFrame({
+        'thread': latest['thread'].to_numpy(),
+        'participant': latest['participant'].to_numpy()
+    })
+    summary['message_count'] = offsets['message_count'].reindex(summary['thread']).to_numpy()
+    summary['first_time'] = spans['min'].reindex(summary['thread']).to_numpy()
+    summary['last_time'] = spans['max'].reindex(summary['thread']).to_numpy()
+    summary['start'] = offsets['start'].reindex(summary['thread']).to_numpy()
+    summary['end'] = offsets['end'].reindex(summary['thread']).to_numpy()
+    return {'summary': summary, 'messages': df.iloc[order]}
+
+def thread_index(df):
+    """Per-thread summaries and sorted message offsets for a chat frame, built once per data version"""
+    return cached_view('threads', df, _build_thread_index)
+
+def thread_messages(index, row):
+    """The messages of one summary row, oldest first; a slice of the thread index"""
+    return index['messages'].iloc[row['start']:row['end']]
+
+def _add_time_columns(df, kind):
+    """Add parsed_time plus date/time parts, keeping any date/time the sheet already has"""
+    if 'timestamp' not in df.columns:
+        df['parsed_time'] = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+        return
+    # Normally already parsed at ingest; text only when the loader kept it as text
+    df['parsed_time'] = parse_timestamps(df['timestamp'], key=(kind, 'timestamp'))
+    if 'date' not in df.columns:
+        df['date'] = df['parsed_time'].dt.date
+    if 'time' not in df.columns:
+        df['time'] = df['parsed_time'].dt.time
+
+# ------------------ CANONICAL FRAMES ------------------ #
+def _build_outreach(df):
+    """Derive the canonical lead columns from a raw outreach frame"""
+    df = df.copy(deep=False)
+    _add_time_columns(df, 'outreach')
+    df['is_success'] = success_flags(df['success']) if 'success' in df.columns else False
+    has_email = (_text(df, 'email_subject') != '') | (_text(df, 'email_message') != '')
+    df['has_email'] = has_email
+    # Same rule as is_message_sent(): an email draft means the LinkedIn message is not out yet
+    df['is_sent'] = df['is_success'] & ~has_email
+    df['lead_id'] = lead_id_column(df)
+    return df
+
+def normalize_outreach(df):
+    """Canonical outreach frame with parsed_time, date, is_success, has_email, is_sent and lead_id"""
+    if df.empty:
+        return df
+    return _cached_normalize('outreach', df, _build_outreach)
+
+def normalize_chat(df, profile):
+    """Canonical chat frame with parsed_time, date and is_mine for the given profile"""
+    if df.empty:
+        return df
+
+    def build(df):
+        df = df.copy(deep=False)
+        _add_time_columns(df, 'chat')
+        df['is_mine'] = mine_column(df, profile)
+        return df
+    return _cached_normalize('chat', df, build, profile=(profile['name'], profile['url']))
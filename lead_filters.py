@@ -0,0 +1,142 @@
+import pandas as pd
+import numpy as np
+from lead_data import cached_view
+from lead_search import lead_search_rows
+
+# ------------------ CONFIGURATION ------------------ #
+# Low-cardinality lead columns that get one bitmap per distinct value
+FACET_COLUMNS = ['status', 'search_city', 'search_term', 'is_success', 'success', 'has_email', 'is_sent']
+# Columns with more distinct values than this keep value codes instead of bitmaps
+FACET_MAX_VALUES = 256
+
+# ------------------ FACET INDEX ------------------ #
+def _build_facet(col):
+    """Value lookup plus either packed bitmaps per value or the raw value codes"""
+    codes, uniques = pd.factorize(col, use_na_sentinel=False)
+    lookup, na_code = {}, None
+    for code, value in enumerate(uniques):
+        if pd.isna(value):
+            na_code = code
+        else:
+            lookup[value] = code
+    facet = {'lookup': lookup, 'na_code': na_code, 'bitmaps': None, 'codes': None}
+    if len(uniques) <= FACET_MAX_VALUES:
+        facet['bitmaps'] = np.stack([np.packbits(codes == code) for code in range(len(uniques))]) \
+            if len(uniques) else np.zeros((0, (len(col) + 7) // 8), dtype=np.uint8)
+    else:
+        facet['codes'] = codes
+    return facet
+
+def _build_facet_index(df, columns):
+    """Facets for each indexed column of a frame"""
+    return {'size': len(df), 'facets': {name: _build_facet(df[name]) for name in columns}}
+
+def facet_index(df):
+    """Bitmap facets over the low-cardinality lead columns, built once per data version"""
+    columns = tuple(name for name in FACET_COLUMNS if name in df.columns)
+    return cached_view('facets', df, _build_facet_index, columns)
+
+# ------------------ BITMAP OPS ------------------ #
+def all_bits(index):
+    """Packed bitmap with every row set"""
+    return np.packbits(np.ones(index['size'], dtype=bool))
+
+def no_bits(index):
+    """Packed bitmap with no row set"""
+    return np.zeros((index['size'] + 7) // 8, dtype=np.uint8)
+
+def not_bits(index, bits):
+    """Complement of a packed bitmap, keeping the padding bits clear"""
+    return ~bits & all_bits(index)
+
+def bits_count(bits):
+    """Number of rows set in a packed bitmap"""
+    return int(np.unpackbits(bits).sum())
+
+def facet_bits(index, column, values):
+    """Rows whose column equals any of values (one value or a list), ORed from the facet bitmaps"""
+    facet = index['facets'][column]
+    values = values if isinstance(values, (list, tuple, set)) else [values]
+    codes = []
+    for value in values:
+        code = facet['na_code'] if pd.isna(value) else facet['lookup'].get(value)
+        if code is not None:
+            codes.append(code)
+    if facet['bitmaps'] is None:
+        return np.packbits(np.isin(facet['codes'], codes))
+    if not codes:
+        return no_bits(index)
+    return np.bitwise_or.reduce(facet['bitmaps'][codes], axis=0)
+
+def match_bits(index, filters):
+    """AND across columns of the OR within each column's values; filters maps column -> value(s)"""
+    bits = all_bits(index)
+    for column, values in filters.items():
+        bits &= facet_bits(index, column, values)
+    return bits
+
+def bits_mask(df, bits):
+    """Boolean Series over df from a packed bitmap"""
+    return pd.Series(np.unpackbits(bits, count=len(df)).astype(bool), index=df.index)
+
+def facet_mask(df, filters):
+    """Boolean mask over df for column -> value(s) filters, answered from the facet bitmaps"""
+    return bits_mask(df, match_bits(facet_index(df), filters))
+
+# ------------------ TIME ORDER ------------------ #
+def _build_time_order(df, column):
+    """Row positions with a timestamp, sorted by it, plus the sorted timestamps"""
+    times = df[column].to_numpy(dtype='datetime64[ns]')
+    rows = np.flatnonzero(~np.isnat(times))
+    order = rows[np.argsort(times[rows], kind='stable')]
+    return {'rows': order, 'times': times[order], 'values': times}
+
+def time_order(df, column='parsed_time'):
+    """Rows of df sorted by a timestamp column, built once per data version"""
+    return cached_view('time_order', df, _build_time_order, column)
+
+def since_rows(order, cutoff):
+    """Sorted row positions at or after cutoff, found by binary search"""
+    start = np.searchsorted(order['times'], np.datetime64(cutoff, 'ns'), side='left')
+    return np.sort(order['rows'][start:])
+
+# ------------------ QUERY PLANNER ------------------ #
+def plan_rows(df, status=None, since=None, query=None, search_key=None):
+    """Row positions passing every given filter, or None when nothing filters.
+
+    The status bitmap and the time range both know their row counts up front,
+    so the smaller one runs first and the other only checks the rows it kept.
+    The text search runs last and is intersected with what is left; search_key
+    lets it narrow from the same search box's previous result.
+    """
+    steps = []
+    if status is not None:
+        bits = facet_bits(facet_index(df), 'status', status)
+        steps.append((bits_count(bits), 'status', bits))
+    if since is not None:
+        order = time_order(df)
+        start = np.searchsorted(order['times'], np.datetime64(since, 'ns'), side='left')
+        steps.append((len(order['rows']) - start, 'since', order))
+
+    selection = None
+    for estimate, kind, source in sorted(steps, key=lambda step: step[0]):
+        if kind == 'status':
+            keep = np.unpackbits(source, count=len(df)).astype(bool)
+            selection = np.flatnonzero(keep) if selection is None else selection[keep[selection]]
+        elif selection is None:
+            selection = since_rows(source, since)
+        else:
+            selection = selection[source['values'][selection] >= np.datetime64(since, 'ns')]
+        if not len(selection):
+            return selection
+
+    if query:
+        rows = lead_search_rows(df, query, search_key)
+        if rows is not None:
+            selection = rows if selection is None else np.intersect1d(selection, rows, assume_unique=True)
+    return selection
+
+def select_rows(df, status=None, since=None, query=None, search_key=None):
+    """df narrowed by plan_rows; the frame itself when nothing filters"""
+    selection = plan_rows(df, status=status, since=since, query=query, search_key=search_key)
+    return df if selection is None else df.iloc[selection]
@@ -0,0 +1,288 @@
+import pandas as pd
+import numpy as np
+import re
+import time
+import threading
+import streamlit as st
+from bisect import bisect_left
+from lead_data import cached_view, index_fingerprint
+from sheet_loader import frame_version
+
+# ------------------ CONFIGURATION ------------------ #
+# Lead fields the search box looks at; whichever of them a sheet has are indexed
+LEAD_SEARCH_COLUMNS = [
+    'profile_name', 'name',
+    'profile_tagline', 'tagline',
+    'profile_location', 'location',
+    'company_name',
+    'linkedin_message', 'message',
+    'email_subject', 'email_message',
+    'search_term'
+]
+# Chat fields the message search box matches substrings in
+MESSAGE_SEARCH_COLUMNS = ['message', 'sender_name', 'shared_content']
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def tokenize(text):
+    """Lowercase word tokens of a piece of text"""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+# ------------------ SEARCH STATS ------------------ #
+@st.cache_resource
+def get_search_store():
+    """Process-wide build and query timings per search index"""
+    return {'lock': threading.Lock(), 'stats': {}}
+
+def _record_search(name, field, seconds, **counts):
+    """Add one build or query timing to an index's stats"""
+    store = get_search_store()
+    with store['lock']:
+        stats = store['stats'].setdefault(name, {
+            'builds': 0, 'build_seconds': 0.0,
+            'queries': 0, 'query_seconds': 0.0, 'slowest_query_ms': 0.0,
+            'candidates': 0, 'matches': 0, 'narrowed': 0
+        })
+        if field == 'build':
+            stats['builds'] += 1
+            stats['build_seconds'] += seconds
+        else:
+            stats['queries'] += 1
+            stats['query_seconds'] += seconds
+            stats['slowest_query_ms'] = max(stats['slowest_query_ms'], seconds * 1000)
+        for key, value in counts.items():
+            stats[key] += value
+
+def get_search_stats():
+    """Build time and query latency per search index"""
+    store = get_search_store()
+    with store['lock']:
+        stats = {name: dict(entry) for name, entry in store['stats'].items()}
+    for entry in stats.values():
+        entry['avg_build_seconds'] = round(entry['build_seconds'] / entry['builds'], 3) if entry['builds'] else None
+        entry['avg_query_ms'] = round(entry['query_seconds'] * 1000 / entry['queries'], 2) if entry['queries'] else None
+    return stats
+
+def _timed_build(name, build):
+    """Wrap an index builder so each (uncached) build is timed"""
+    def timed(df, *args):
+        started = time.perf_counter()
+        index = build(df, *args)
+        _record_search(name, 'build', time.perf_counter() - started)
+        return index
+    timed.__name__ = build.__name__
+    return timed
+
+# ------------------ INVERTED INDEX ------------------ #
+def _column_postings(col, vocab):
+    """(token id, row position) pairs for one column, tokenizing each distinct value once"""
+    codes, uniques = pd.factorize(col.fillna('').astype(str))
+    value_tokens = []
+    for value in uniques:
+        value_tokens.append([vocab.setdefault(token, len(vocab)) for token in set(tokenize(value))])
+
+    lengths = np.array([len(tokens) for tokens in value_tokens] + [0], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    flat = np.array([token for tokens in value_tokens for token in tokens], dtype=np.int64)
+
+    # Expand each row into the tokens of its value
+    row_lengths = lengths[codes]
+    rows = np.repeat(np.arange(len(codes), dtype=np.int64), row_lengths)
+    within = np.arange(row_lengths.sum()) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+    tokens = flat[np.repeat(starts[codes], row_lengths) + within]
+    return tokens, rows
+
+def _build_search_index(df, columns):
+    """Sorted vocabulary plus, per token, the sorted row positions containing it"""
+    vocab = {}
+    token_parts, row_parts = [], []
+    for name in columns:
+        tokens, rows = _column_postings(df[name], vocab)
+        token_parts.append(tokens)
+        row_parts.append(rows)
+
+    terms = sorted(vocab)
+    # Renumber tokens by their sorted rank so every prefix covers one contiguous id range
+    rank = np.empty(len(vocab), dtype=np.int64)
+    rank[[vocab[term] for term in terms]] = np.arange(len(terms))
+    tokens = rank[np.concatenate(token_parts)] if token_parts else np.array([], dtype=np.int64)
+    rows = np.concatenate(row_parts) if row_parts else np.array([], dtype=np.int64)
+
+    order = np.lexsort((rows, tokens))
+    tokens, rows = tokens[order], rows[order]
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (tokens[1:] != tokens[:-1]) | (rows[1:] != rows[:-1])
+    tokens, rows = tokens[keep], rows[keep]
+    # The same postings grouped by row, for checking a handful of rows without the posting lists
+    by_row = np.argsort(rows, kind='stable')
+
+    return {
+        'terms': terms,
+        'offsets': np.searchsorted(tokens, np.arange(len(terms) + 1)),
+        'rows': rows,
+        'row_tokens': tokens[by_row],
+        'row_offsets': np.searchsorted(rows[by_row], np.arange(len(df) + 1)),
+        'size': len(df)
+    }
+
+_timed_lead_index = _timed_build('lead_search', _build_search_index)
+
+def lead_search_index(df):
+    """Inverted token index over the searchable lead fields, built once per data version"""
+    columns = tuple(name for name in LEAD_SEARCH_COLUMNS if name in df.columns)
+    return cached_view('lead_search', df, _timed_lead_index, columns)
+
+def _prefix_range(index, prefix):
+    """Token id range [low, high) of the terms starting with prefix"""
+    terms = index['terms']
+    return bisect_left(terms, prefix), bisect_left(terms, prefix + '\uffff')
+
+def prefix_rows(index, prefix):
+    """Row positions with any token starting with prefix"""
+    low, high = _prefix_range(index, prefix)
+    if low == high:
+        return np.array([], dtype=np.int64)
+    rows = index['rows'][index['offsets'][low]:index['offsets'][high]]
+    return rows if high - low == 1 else np.unique(rows)
+
+def search_rows(index, query):
+    """Row positions matching every query token as a prefix, or None for a query with no tokens"""
+    result = None
+    for token in sorted(set(tokenize(query)), key=len, reverse=True):
+        rows = prefix_rows(index, token)
+        result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        if not len(result):
+            break
+    return result
+
+def narrow_rows(index, rows, query):
+    """The subset of rows matching every query token as a prefix, reading only those rows' tokens"""
+    starts = index['row_offsets'][rows]
+    lengths = index['row_offsets'][rows + 1] - starts
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    tokens = index['row_tokens'][np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())]
+
+    keep = np.ones(len(rows), dtype=bool)
+    for token in set(tokenize(query)):
+        low, high = _prefix_range(index, token)
+        found = np.zeros(len(rows), dtype=bool)
+        found[owner[(tokens >= low) & (tokens < high)]] = True
+        keep &= found
+    return rows[keep]
+
+def lead_search_rows(df, query, session_key=None):
+    """Row positions of df matching a search box query, or None when the query has no tokens.
+
+    With a session_key, the last result for that search box is kept in the
+    session. A query that only extends the previous one (more letters or more
+    words) can only lose rows, so it is checked against the previous hits
+    instead of the whole index.
+    """
+    index = lead_search_index(df)
+    started = time.perf_counter()
+    text = str(query).lower()
+    # Filtered subsets of one load share its version, so the key also pins down which rows df holds
+    version = (frame_version(df), index_fingerprint(df), tuple(df.columns))
+    previous = None
+    if session_key is not None and version[0] is not None:
+        previous = st.session_state.setdefault('search_narrowing', {}).get(session_key)
+    narrowed = bool(previous and previous['version'] == version and previous['rows'] is not None
+                    and text.startswith(previous['text']))
+    rows = narrow_rows(index, previous['rows'], text) if narrowed else search_rows(index, text)
+    if session_key is not None and version[0] is not None:
+        st.session_state['search_narrowing'][session_key] = {'version': version, 'text': text, 'rows': rows}
+    _record_search('lead_search', 'query', time.perf_counter() - started,
+                   matches=len(df) if rows is None else len(rows), narrowed=int(narrowed))
+    return rows
+
+def search_mask(df, query, session_key=None):
+    """Boolean mask over df for a search box query, answered from the inverted index"""
+    rows = lead_search_rows(df, query, session_key)
+    mask = np.ones(len(df), dtype=bool)
+    if rows is not None:
+        mask[:] = False
+        mask[rows] = True
+    return pd.Series(mask, index=df.index)
+
+# ------------------ TRIGRAM INDEX ------------------ #
+def _trigram_keys(chars):
+    """One int64 key per 3-character window of an array of code points"""
+    chars = chars.astype(np.int64)
+    return (chars[:-2] << 42) | (chars[1:-1] << 21) | chars[2:]
+
+def _code_points(text):
+    """Code points of a string as a numpy array"""
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+def _build_trigram_index(df, columns):
+    """Distinct lowercased values of the columns plus, per trigram, the sorted values containing it"""
+    stacked = pd.concat([df[name].fillna('').astype(str).str.lower() for name in columns], ignore_index=True) \
+        if columns else pd.Series([], dtype=object)
+    codes, uniques = pd.factorize(stacked)
+    values = np.asarray(uniques, dtype=object)
+
+    # Slide a 3-character window over all values at once, dropping windows that cross a value boundary
+    lengths = np.array([len(value) for value in values], dtype=np.int64)
+    chars = _code_points(''.join(values))
+    owner = np.repeat(np.arange(len(values), dtype=np.int64), lengths)
+    if len(chars) >= 3:
+        keys = _trigram_keys(chars)
+        inside = owner[:-2] == owner[2:]
+        keys, owner = keys[inside], owner[:-2][inside]
+    else:
+        keys, owner = np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    # Windows come in value order, so a stable sort by trigram leaves each posting list sorted
+    order = np.argsort(keys, kind='stable')
+    keys, owner = keys[order], owner[order]
+    keep = np.ones(len(keys), dtype=bool)
+    keep[1:] = (keys[1:] != keys[:-1]) | (owner[1:] != owner[:-1])
+    keys, owner = keys[keep], owner[keep]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+
+    return {
+        'values': values,
+        'codes': codes.reshape(len(columns), len(df)),
+        'trigrams': keys[starts],
+        'offsets': np.append(starts, len(keys)),
+        'postings': owner,
+        'size': len(df)
+    }
+
+_timed_message_index = _timed_build('message_search', _build_trigram_index)
+
+def message_search_index(df):
+    """Trigram index over the searchable chat fields, built once per data version"""
+    columns = tuple(name for name in MESSAGE_SEARCH_COLUMNS if name in df.columns)
+    return cached_view('message_search', df, _timed_message_index, columns)
+
+def substring_candidates(index, text):
+    """Value ids holding every trigram of text; all values when text is shorter than a trigram"""
+    if len(text) < 3:
+        return np.arange(len(index['values']))
+    candidates = None
+    postings = []
+    for key in np.unique(_trigram_keys(_code_points(text))):
+        slot = np.searchsorted(index['trigrams'], key)
+        if slot == len(index['trigrams']) or index['trigrams'][slot] != key:
+            return np.array([], dtype=np.int64)
+        postings.append(index['postings'][index['offsets'][slot]:index['offsets'][slot + 1]])
+    for values in sorted(postings, key=len):
+        candidates = values if candidates is None else np.intersect1d(candidates, values, assume_unique=True)
+        if not len(candidates):
+            break
+    return candidates
+
+def message_search_mask(df, query):
+    """Case-insensitive substring match of query against the indexed chat fields"""
+    index = message_search_index(df)
+    started = time.perf_counter()
+    text = str(query).lower()
+    candidates = substring_candidates(index, text)
+    # Trigrams only narrow the field; confirm the substring on the surviving values
+    hit = np.zeros(len(index['values']), dtype=bool)
+    values = index['values'][candidates]
+    hit[candidates[[text in value for value in values]]] = True
+    mask = hit[index['codes']].any(axis=0) if len(index['codes']) else np.zeros(len(df), dtype=bool)
+    _record_search('message_search', 'query', time.perf_counter() - started,
+                   candidates=len(candidates), matches=int(mask.sum()))
+    return pd.Series(mask, index=df.index)
@@ -11,6 +11,10 @@ from plotly.subplots import make_subplots
 import requests
 import time
 import re
+from sheet_loader import get_sheet_frame, load_sheets, invalidate_sheet, QuotaAwareClient, stream_sheet, has_sheet_state
+from lead_data import mine_column, mine_mask, lead_id_column, lead_widget_keys, contact_table, contact_messages, count_values, count_by_date, count_by_timestamp_date
+from lead_search import search_mask, message_search_mask
+from lead_filters import facet_mask
 
 # ------------------ PAGE CONFIG ------------------ #
 st.set_page_config(
@@ -45,13 +49,15 @@ if 'activity_log' not in st.session_state:
 if 'sent_leads' not in st.session_state:
     st.session_state.sent_leads = set()
 if 'selected_leads' not in st.session_state:
-    st.session_state.selected_leads = []
+    st.session_state.selected_leads = set()
 if 'current_client' not in st.session_state:
     st.session_state.current_client = None
 if 'chat_df' not in st.session_state:
     st.session_state.chat_df = pd.DataFrame()
 if 'outreach_df' not in st.session_state:
     st.session_state.outreach_df = pd.DataFrame()
+if 'pending_loads' not in st.session_state:
+    st.session_state.pending_loads = set()
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = datetime.utcnow()
 if 'webhook_history' not in st.session_state:
@@ -924,24 +930,68 @@ def init_google_sheets(credentials_json):
             scopes=scopes
         )
         client = gspread.authorize(credentials)
-        return client
+        return QuotaAwareClient(client, credentials_dict.get('client_email', 'default'))
     except Exception as e:
         st.error(f"[ERROR] Failed to initialize Google Sheets: {str(e)}")
         return None
 
-@st.cache_data(ttl=60)
 def load_sheet_data(_client, sheet_id, sheet_name):
     """Load data from a specific Google Sheet"""
     try:
-        spreadsheet = _client.open_by_key(sheet_id)
-        worksheet = spreadsheet.worksheet(sheet_name)
-        data = worksheet.get_all_records()
-        df = pd.DataFrame(data)
-        return df
+        return get_sheet_frame(_client, sheet_id, sheet_name, tenant=get_client_from_url())
     except Exception as e:
         st.error(f"[ERROR] Failed to load {sheet_name}: {str(e)}")
         return pd.DataFrame()
 
+def load_all_sheet_data(_client, sheets):
+    """Load several Google Sheets concurrently as one bundle"""
+    frames, errors = load_sheets(_client, sheets, tenant=get_client_from_url())
+    for name, error in errors.items():
+        st.error(f"Error loading data from {sheets[name][1]}: {str(error)}")
+    return frames
+
+def stream_pending_sheet(name, sheet_id, sheet_name, counters):
+    """Stream a cold sheet into session state, showing its first page and running counts"""
+    if name not in st.session_state.pending_loads:
+        return
+    
+    progress = st.empty()
+    first_page = st.empty()
+    totals = dict.fromkeys(counters, 0)
+    try:
+        chunks = stream_sheet(st.session_state.gsheets_client, sheet_id, sheet_name, tenant=get_client_from_url())
+        for position, chunk in enumerate(chunks):
+            for label, count in counters.items():
+                totals[label] += count(chunk)
+            with progress.container():
+                cols = st.columns(len(totals))
+                for col, (label, total) in zip(cols, totals.items()):
+                    col.metric(label, f"{total:,}")
+                st.caption(f"[ STREAMING {sheet_name}... ]")
+            if position == 0:
+                first_page.dataframe(chunk.head(25), use_container_width=True)
+        df = load_sheet_data(st.session_state.gsheets_client, sheet_id, sheet_name)
+    except Exception as e:
+        st.error(f"[ERROR] Failed to load {sheet_name}: {str(e)}")
+        df = pd.DataFrame()
+    progress.empty()
+    first_page.empty()
+    
+    st.session_state[f"{name}_df"] = df
+    st.session_state.pending_loads.discard(name)
+    st.session_state.last_refresh = datetime.utcnow()
+    if not st.session_state.pending_loads:
+        st.rerun()
+
+def refresh_outreach_data():
+    """Refetch this tenant's outreach sheet without clearing anyone else's cache"""
+    invalidate_sheet(OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME, tenant=get_client_from_url())
+    st.session_state.outreach_df = load_sheet_data(
+        st.session_state.gsheets_client,
+        OUTREACH_SPREADSHEET_ID,
+        OUTREACH_SHEET_NAME
+    )
+
 # ------------------ CLIENT PROFILE SYSTEM ------------------ #
 def get_client_from_url():
     """Extract client identifier from URL parameters"""
@@ -1037,15 +1087,6 @@ def authenticate_user():
         st.info("⚡ ENCRYPTED CONNECTION | NO DATA STORED")
 
 # ------------------ HELPER FUNCTIONS ------------------ #
-def is_me(sender_name, sender_url, my_profile):
-    """Check if the sender is the current user"""
-    if not sender_name or not isinstance(sender_name, str):
-        return False
-    return (
-        my_profile["name"].lower() in sender_name.lower() or
-        (sender_url and my_profile["url"].lower() in str(sender_url).lower())
-    )
-
 def get_initials(name):
     """Get initials from name"""
     if not name:
@@ -1058,57 +1099,14 @@ def get_initials(name):
 # ------------------ CHAT ANALYTICS FUNCTIONS ------------------ #
 def get_contact_info(df, my_profile):
     """Extract unique contacts from chat data"""
-    contacts = {}
-    
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        lead_name = row.get('lead_name', '')
-        lead_url = row.get('lead_linkedin_url', '')
-        
-        if is_me(sender_name, sender_url, my_profile):
-            continue
-        
-        contact_url = sender_url if sender_url else lead_url
-        contact_name = sender_name if sender_name else lead_name
-        
-        if contact_url and contact_url not in contacts:
-            contacts[contact_url] = {
-                'name': contact_name,
-                'url': contact_url,
-                'messages': [],
-                'last_contact': None,
-                'received_count': 0,
-                'sent_count': 0
-            }
-    
-    for idx, row in df.iterrows():
-        sender_name = row.get('sender_name', '')
-        sender_url = row.get('sender_linkedin_url', '')
-        lead_url = row.get('lead_linkedin_url', '')
-        
-        contact_url = None
-        if is_me(sender_name, sender_url, my_profile):
-            contact_url = lead_url
-            if contact_url in contacts:
-                contacts[contact_url]['sent_count'] += 1
-        else:
-            contact_url = sender_url if sender_url else lead_url
-            if contact_url in contacts:
-                contacts[contact_url]['received_count'] += 1
-        
-        if contact_url in contacts:
-            contacts[contact_url]['messages'].append(row)
-            contacts[contact_url]['last_contact'] = f"{row.get('date', '')} {row.get('time', '')}"
-    
-    return contacts
+    return contact_table(df, my_profile)
 
 def create_message_chart(df):
     """Create a message activity chart with Matrix theme"""
     if df.empty or 'date' not in df.columns:
         return None
     
-    message_counts = df['date'].value_counts().sort_index()
+    message_counts = count_values(df, 'date').sort_index()
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -1139,6 +1137,11 @@ def create_message_chart(df):
 def show_lead_outreach():
     st.markdown("<div class='section-header'>TARGET ACQUISITION SYSTEM</div>", unsafe_allow_html=True)
     
+    stream_pending_sheet('outreach', OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME, {
+        'TARGETS LOADED': len,
+        'SENT': lambda chunk: int((chunk['status'] == 'sent').sum()) if 'status' in chunk.columns else 0,
+        'PENDING': lambda chunk: int((chunk['status'] == 'pending').sum()) if 'status' in chunk.columns else 0
+    })
     outreach_df = st.session_state.outreach_df
     
     if outreach_df.empty:
@@ -1210,19 +1213,21 @@ def show_lead_outreach():
         sort_by = st.selectbox("[ SORT ]", sort_columns if sort_columns else ["Default"])
     
     # Apply filters
-    filtered_df = outreach_df.copy()
+    # One mask over the shared frame; the search box is answered from the lead index
+    mask = pd.Series(True, index=outreach_df.index)
     
     if search_query:
-        mask = filtered_df.astype(str).apply(
-            lambda x: x.str.contains(search_query, case=False, na=False)
-        ).any(axis=1)
-        filtered_df = filtered_df[mask]
+        mask &= search_mask(outreach_df, search_query, session_key='lead_search')
+    
+    facets = {}
+    if status_filter != "All" and 'status' in outreach_df.columns:
+        facets['status'] = status_filter
     
-    if status_filter != "All" and 'status' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['status'] == status_filter]
+    if city_filter != "All" and 'search_city' in outreach_df.columns:
+        facets['search_city'] = city_filter
     
-    if city_filter != "All" and 'search_city' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['search_city'] == city_filter]
+    mask &= facet_mask(outreach_df, facets)
+    filtered_df = outreach_df[mask]
     
     if sort_by != "Default" and sort_by in filtered_df.columns:
         filtered_df = filtered_df.sort_values(by=sort_by, ascending=False)
@@ -1274,10 +1279,12 @@ def show_lead_outreach():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
+                lead_ids = lead_id_column(filtered_df)
                 for idx, (i, row) in enumerate(filtered_df.head(bulk_count).iterrows()):
+                    lead_id = lead_ids[i]
                     lead_name = row.get('profile_name', row.get('name', 'TARGET'))
                     status_text.text(f"[ SENDING TO {lead_name}... ]")
-                    st.session_state.sent_leads.add(i)
+                    st.session_state.sent_leads.add(lead_id)
                     
                     st.session_state.activity_log.append({
                         "type": "BULK_SEND",
@@ -1307,7 +1314,7 @@ def show_lead_outreach():
         
         with col4:
             if st.button("🔄 REFRESH DATA", use_container_width=True, key="refresh_leads"):
-                st.cache_data.clear()
+                refresh_outreach_data()
                 st.rerun()
 
 def display_leads_cards(df):
@@ -1316,7 +1323,12 @@ def display_leads_cards(df):
         st.info("[ NO DATA ]")
         return
     
+    lead_ids = lead_id_column(df)
+    # Widgets are keyed by lead, so their state follows the lead when rows shift
+    widget_keys = lead_widget_keys(lead_ids)
     for idx, (i, row) in enumerate(df.iterrows()):
+        lead_id = lead_ids[i]
+        widget_key = widget_keys[i]
         col1, col2 = st.columns([3, 1])
         
         with col1:
@@ -1344,7 +1356,7 @@ def display_leads_cards(df):
                 'pending': 'status-pending'
             }.get(status, 'status-pending')
             
-            is_sent = status == 'sent' or i in st.session_state.sent_leads
+            is_sent = status == 'sent' or lead_id in st.session_state.sent_leads
             sent_indicator = "✓ TRANSMITTED" if is_sent else ""
             
             st.markdown(f"""
@@ -1367,8 +1379,8 @@ def display_leads_cards(df):
         with col2:
             st.markdown("**[ ACTIONS ]**")
             
-            if st.button("⚡ SEND", key=f"send_{i}_{idx}", disabled=is_sent, use_container_width=True):
-                st.session_state.sent_leads.add(i)
+            if st.button("⚡ SEND", key=f"send_{widget_key}", disabled=is_sent, use_container_width=True):
+                st.session_state.sent_leads.add(lead_id)
                 st.session_state.activity_log.append({
                     "type": "MESSAGE_SENT",
                     "details": f"To {name}",
@@ -1379,19 +1391,17 @@ def display_leads_cards(df):
                 time.sleep(1)
                 st.rerun()
             
-            if st.button("📋 COPY", key=f"copy_{i}_{idx}", use_container_width=True):
+            if st.button("📋 COPY", key=f"copy_{widget_key}", use_container_width=True):
                 st.info("✓ DATA COPIED")
             
-            if st.button("⭐ SAVE", key=f"save_{i}_{idx}", use_container_width=True):
+            if st.button("⭐ SAVE", key=f"save_{widget_key}", use_container_width=True):
                 st.info("✓ TARGET SAVED")
             
-            is_selected = i in st.session_state.selected_leads
-            if st.checkbox("[ SELECT ]", key=f"select_{i}_{idx}", value=is_selected):
-                if i not in st.session_state.selected_leads:
-                    st.session_state.selected_leads.append(i)
+            is_selected = lead_id in st.session_state.selected_leads
+            if st.checkbox("[ SELECT ]", key=f"select_{widget_key}", value=is_selected):
+                st.session_state.selected_leads.add(lead_id)
             else:
-                if i in st.session_state.selected_leads:
-                    st.session_state.selected_leads.remove(i)
+                st.session_state.selected_leads.discard(lead_id)
 
 def display_leads_table(df):
     """Display leads in table format"""
@@ -1417,7 +1427,11 @@ def display_leads_compact(df):
         st.info("[ NO DATA ]")
         return
     
+    lead_ids = lead_id_column(df)
+    widget_keys = lead_widget_keys(lead_ids)
     for idx, (i, row) in enumerate(df.iterrows()):
+        lead_id = lead_ids[i]
+        widget_key = widget_keys[i]
         name = str(row.get('profile_name', row.get('name', 'UNKNOWN_TARGET')))
         location = str(row.get('profile_location', row.get('location', 'UNKNOWN')))
         status = str(row.get('status', 'unknown'))
@@ -1431,9 +1445,9 @@ def display_leads_compact(df):
         with col3:
             st.write(f"[{status.upper()}]")
         with col4:
-            is_sent = status == 'sent' or i in st.session_state.sent_leads
-            if st.button("⚡", key=f"send_compact_{i}_{idx}", help="Send message", disabled=is_sent):
-                st.session_state.sent_leads.add(i)
+            is_sent = status == 'sent' or lead_id in st.session_state.sent_leads
+            if st.button("⚡", key=f"send_compact_{widget_key}", help="Send message", disabled=is_sent):
+                st.session_state.sent_leads.add(lead_id)
                 st.success("✓ SENT")
                 st.rerun()
 
@@ -1574,8 +1588,8 @@ def show_search_interface(webhook_url):
         
         st.markdown("#### [ QUICK ACTIONS ]")
         if st.button("🔄 REFRESH DATA", use_container_width=True):
-            st.cache_data.clear()
-            st.info("⚡ REFRESH OUTREACH DATA VIA SIDEBAR")
+            refresh_outreach_data()
+            st.success(f"✓ REFRESHED {len(st.session_state.outreach_df)} TARGETS")
         
         if st.button("📊 VIEW TARGETS", use_container_width=True):
             st.info("⚡ NAVIGATE TO 'TARGET ACQUISITION' TAB")
@@ -1613,7 +1627,7 @@ def show_overview_analytics(chat_df, outreach_df):
         st.markdown("#### [ CHAT ANALYTICS ]")
         if not chat_df.empty:
             if 'date' in chat_df.columns:
-                daily_activity = chat_df.groupby('date').size().reset_index(name='messages')
+                daily_activity = count_by_date(chat_df).reset_index(name='messages')
                 
                 fig = px.line(
                     daily_activity,
@@ -1636,7 +1650,7 @@ def show_overview_analytics(chat_df, outreach_df):
     with col2:
         st.markdown("#### [ OUTREACH ANALYTICS ]")
         if not outreach_df.empty and 'status' in outreach_df.columns:
-            status_counts = outreach_df['status'].value_counts()
+            status_counts = count_values(outreach_df, 'status')
             
             fig = px.pie(
                 values=status_counts.values,
@@ -1661,7 +1675,7 @@ def show_geographic_analytics(outreach_df):
         return
     
     if 'search_city' in outreach_df.columns:
-        city_counts = outreach_df['search_city'].value_counts().head(15)
+        city_counts = count_values(outreach_df, 'search_city').head(15)
         
         fig = px.bar(
             x=city_counts.values,
@@ -1691,7 +1705,7 @@ def show_timeline_analytics(chat_df, outreach_df):
     with col1:
         if not chat_df.empty and 'date' in chat_df.columns:
             st.markdown("#### [ CHAT TIMELINE ]")
-            daily_chats = chat_df.groupby('date').size().tail(30).reset_index(name='count')
+            daily_chats = count_by_date(chat_df).tail(30).reset_index(name='count')
             
             fig = px.area(
                 daily_chats,
@@ -1714,8 +1728,7 @@ def show_timeline_analytics(chat_df, outreach_df):
         if not outreach_df.empty and 'timestamp' in outreach_df.columns:
             st.markdown("#### [ OUTREACH TIMELINE ]")
             try:
-                outreach_df['date'] = pd.to_datetime(outreach_df['timestamp']).dt.date
-                daily_outreach = outreach_df.groupby('date').size().tail(30).reset_index(name='count')
+                daily_outreach = count_by_timestamp_date(outreach_df).tail(30).reset_index(name='count')
                 
                 fig = px.area(
                     daily_outreach,
@@ -1768,8 +1781,7 @@ def show_performance_analytics(outreach_df):
     
     if 'timestamp' in outreach_df.columns and 'status' in outreach_df.columns:
         try:
-            outreach_df['date'] = pd.to_datetime(outreach_df['timestamp']).dt.date
-            daily_performance = outreach_df.groupby(['date', 'status']).size().unstack(fill_value=0)
+            daily_performance = count_by_timestamp_date(outreach_df, 'status')
             
             if not daily_performance.empty:
                 fig = px.area(
@@ -1831,7 +1843,7 @@ def show_overview():
         contacts = get_contact_info(chat_df, {
             'name': MY_PROFILE['name'],
             'url': MY_PROFILE['url']
-        }) if not chat_df.empty else {}
+        })
         contact_count = len(contacts)
         
         st.markdown(f"""
@@ -1852,7 +1864,7 @@ def show_overview():
         st.markdown("#### [ CHAT ACTIVITY ]")
         if not chat_df.empty and 'date' in chat_df.columns:
             try:
-                daily_chats = chat_df.groupby('date').size().tail(7).reset_index()
+                daily_chats = count_by_date(chat_df).tail(7).reset_index()
                 daily_chats.columns = ['Date', 'Messages']
                 
                 fig = px.bar(
@@ -1880,7 +1892,7 @@ def show_overview():
     with col2:
         st.markdown("#### [ OUTREACH STATUS ]")
         if not outreach_df.empty and 'status' in outreach_df.columns:
-            status_counts = outreach_df['status'].value_counts()
+            status_counts = count_values(outreach_df, 'status')
             
             fig = px.pie(
                 values=status_counts.values,
@@ -1925,6 +1937,10 @@ def show_overview():
 def show_chat_analytics():
     st.markdown("<div class='section-header'>CHAT INTELLIGENCE SYSTEM</div>", unsafe_allow_html=True)
     
+    stream_pending_sheet('chat', CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME, {
+        'MESSAGES LOADED': len,
+        'SENT BY YOU': lambda chunk: int(mine_mask(chunk, MY_PROFILE).sum())
+    })
     chat_df = st.session_state.chat_df
     
     if chat_df.empty:
@@ -1958,7 +1974,7 @@ def show_chat_analytics():
         """, unsafe_allow_html=True)
     
     with col3:
-        my_messages = sum(1 for _, row in chat_df.iterrows() if is_me(row.get('sender_name', ''), row.get('sender_linkedin_url', ''), my_profile))
+        my_messages = int(mine_column(chat_df, my_profile).sum())
         st.markdown(f"""
         <div class="stat-box">
             <div class="stat-number">{my_messages}</div>
@@ -2001,7 +2017,7 @@ def show_all_contacts(contacts):
     """Display all contacts"""
     st.subheader("[ ALL CONTACTS ]")
     
-    if not contacts:
+    if contacts.empty:
         st.info("[ NO CONTACTS FOUND ]")
         return
     
@@ -2011,32 +2027,24 @@ def show_all_contacts(contacts):
     with col2:
         sort_by = st.selectbox("[ SORT ]", ["Name", "Messages", "Recent"])
     
-    filtered_contacts = {
-        url: info for url, info in contacts.items()
-        if not search or search.lower() in info['name'].lower()
-    }
+    filtered_contacts = contacts
+    if search:
+        filtered_contacts = contacts[contacts['name'].str.lower().str.contains(search.lower(), regex=False)]
     
     if sort_by == "Messages":
-        filtered_contacts = dict(sorted(
-            filtered_contacts.items(),
-            key=lambda x: len(x[1]['messages']),
-            reverse=True
-        ))
+        filtered_contacts = filtered_contacts.sort_values('message_count', ascending=False, kind='stable')
     elif sort_by == "Name":
-        filtered_contacts = dict(sorted(
-            filtered_contacts.items(),
-            key=lambda x: x[1]['name']
-        ))
+        filtered_contacts = filtered_contacts.sort_values('name', kind='stable')
     
     st.markdown(f"**[ DISPLAYING {len(filtered_contacts)} CONTACTS ]**")
     st.markdown("")
     
     cols = st.columns(2)
     
-    for idx, (url, info) in enumerate(filtered_contacts.items()):
+    for idx, (url, info) in enumerate(filtered_contacts.iterrows()):
         col = cols[idx % 2]
         
-        message_count = len(info['messages'])
+        message_count = info['message_count']
         initials = get_initials(info['name'])
         
         with col:
@@ -2074,20 +2082,20 @@ def show_contact_conversation(contacts, chat_df, my_profile):
     """Display conversation with specific contact"""
     st.subheader("[ CONTACT CONVERSATION ]")
     
-    if not contacts:
+    if contacts.empty:
         st.info("[ NO CONTACTS ]")
         return
     
-    contact_names = {info['name']: url for url, info in contacts.items()}
+    contact_names = dict(zip(contacts['name'], contacts['url']))
     selected_name = st.selectbox("[ SELECT CONTACT ]", list(contact_names.keys()))
     
     if not selected_name:
         return
     
     selected_url = contact_names[selected_name]
-    contact_info = contacts[selected_url]
+    contact_info = contacts.loc[selected_url]
     
-    message_count = len(contact_info['messages'])
+    message_count = contact_info['message_count']
     initials = get_initials(contact_info['name'])
     
     st.markdown(f"""
@@ -2120,16 +2128,13 @@ def show_contact_conversation(contacts, chat_df, my_profile):
     
     st.markdown("### > CONVERSATION HISTORY")
     
-    messages = sorted(
-        contact_info['messages'],
-        key=lambda x: (x.get('date', ''), x.get('time', ''))
-    )
+    messages = contact_messages(chat_df, my_profile, selected_url)
     
     current_date = None
     
-    for msg in messages:
+    mine = mine_column(chat_df, my_profile)
+    for _, msg in messages.iterrows():
         sender_name = msg.get('sender_name', '')
-        sender_url = msg.get('sender_linkedin_url', '')
         message_text = msg.get('message', '')
         date = msg.get('date', '')
         time_str = msg.get('time', '')
@@ -2139,7 +2144,7 @@ def show_contact_conversation(contacts, chat_df, my_profile):
             st.markdown(f'<div class="conversation-date-divider">[ {date} ]</div>', unsafe_allow_html=True)
             current_date = date
         
-        is_my_message = is_me(sender_name, sender_url, my_profile)
+        is_my_message = bool(mine[msg.name])
         
         if is_my_message:
             st.markdown(f"""
@@ -2176,24 +2181,18 @@ def show_all_messages_view(chat_df, my_profile):
     with col3:
         sort_order = st.selectbox("[ SORT ]", ["Newest First", "Oldest First"])
     
-    filtered_df = chat_df.copy()
-    
-    if search:
-        mask = filtered_df.astype(str).apply(
-            lambda x: x.str.contains(search, case=False, na=False)
-        ).any(axis=1)
-        filtered_df = filtered_df[mask]
+    mine = mine_column(chat_df, my_profile)
+    mask = pd.Series(True, index=chat_df.index)
     
     if show_only == "Sent by Me":
-        filtered_df = filtered_df[filtered_df.apply(
-            lambda row: is_me(row.get('sender_name', ''), row.get('sender_linkedin_url', ''), my_profile),
-            axis=1
-        )]
+        mask &= mine
     elif show_only == "Received":
-        filtered_df = filtered_df[filtered_df.apply(
-            lambda row: not is_me(row.get('sender_name', ''), row.get('sender_linkedin_url', ''), my_profile),
-            axis=1
-        )]
+        mask &= ~mine
+    
+    if search:
+        mask &= message_search_mask(chat_df, search)
+    
+    filtered_df = chat_df[mask]
     
     if 'date' in filtered_df.columns and 'time' in filtered_df.columns:
         filtered_df = filtered_df.sort_values(
@@ -2218,7 +2217,7 @@ def show_all_messages_view(chat_df, my_profile):
         time_str = str(row.get('time', ''))
         shared_content = str(row.get('shared_content', ''))
         
-        is_my_message = is_me(sender_name, sender_url, my_profile)
+        is_my_message = bool(mine[i])
         
         if is_my_message:
             contact_name = lead_name
@@ -2303,24 +2302,29 @@ def main():
         if st.button("⚡ LOAD/REFRESH DATA", use_container_width=True):
             with st.spinner("[ LOADING DATA... ]"):
                 try:
-                    st.session_state.chat_df = load_sheet_data(
-                        st.session_state.gsheets_client,
-                        CHAT_SPREADSHEET_ID,
-                        CHAT_SHEET_NAME
-                    )
-                    if not st.session_state.chat_df.empty:
-                        st.success(f"✓ LOADED {len(st.session_state.chat_df)} CHAT MESSAGES")
+                    # Warm sheets top up concurrently here; cold ones stream into their tabs
+                    tenant = get_client_from_url()
+                    sheets = {
+                        'chat': (CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME),
+                        'outreach': (OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+                    }
+                    for sheet_id, sheet_name in sheets.values():
+                        invalidate_sheet(sheet_id, sheet_name, tenant=tenant)
+                    warm = {name: sheet for name, sheet in sheets.items() if has_sheet_state(*sheet)}
+                    st.session_state.pending_loads = set(sheets) - set(warm)
+                    frames = load_all_sheet_data(st.session_state.gsheets_client, warm) if warm else {}
+                    
+                    if 'chat' in frames:
+                        st.session_state.chat_df = frames['chat']
+                        if not st.session_state.chat_df.empty:
+                            st.success(f"✓ LOADED {len(st.session_state.chat_df)} CHAT MESSAGES")
                     
-                    st.session_state.outreach_df = load_sheet_data(
-                        st.session_state.gsheets_client,
-                        OUTREACH_SPREADSHEET_ID,
-                        OUTREACH_SHEET_NAME
-                    )
-                    if not st.session_state.outreach_df.empty:
-                        st.success(f"✓ LOADED {len(st.session_state.outreach_df)} TARGETS")
+                    if 'outreach' in frames:
+                        st.session_state.outreach_df = frames['outreach']
+                        if not st.session_state.outreach_df.empty:
+                            st.success(f"✓ LOADED {len(st.session_state.outreach_df)} TARGETS")
                     
                     st.session_state.last_refresh = datetime.utcnow()
-                    st.cache_data.clear()
                     time.sleep(1)
                     st.rerun()
                     
@@ -4,16 +4,18 @@ import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime, timedelta
 import json
-from collections import defaultdict
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import requests
 import time
 import re
-import hashlib
 from io import BytesIO
 import base64
+from sheet_loader import load_sheets, invalidate_sheet, describe_snapshot, get_snapshot_info, get_flight_stats, get_change_stats, get_quota_stats, get_timestamp_stats, QuotaAwareClient, track_session_frames, get_session_memory, frame_memory
+from lead_data import normalize_outreach, normalize_chat, lead_widget_keys, thread_index, thread_messages, count_values, count_by_date, cached_view, get_view_stats
+from lead_search import get_search_stats
+from lead_filters import select_rows
 
 # ------------------ PAGE CONFIG ------------------ #
 st.set_page_config(
@@ -30,6 +32,7 @@ OUTREACH_SPREADSHEET_ID = "1eLEFvyV1_f74UC1g5uQ-xA7A62sK8Pog27KIjw_Sk3Y"
 OUTREACH_SHEET_NAME = "linkedin-tracking-csv.csv"
 MY_PROFILE = {"name": "Donmenico Hudson", "url": "https://www.linkedin.com/in/donmenicohudson/"}
 WEBHOOK_URL = "https://agentonline-u29564.vm.elestio.app/webhook/Leadlinked"
+THREADS_PER_PAGE = 25
 
 # ------------------ SESSION STATE ------------------ #
 for key, default in [
@@ -40,7 +43,8 @@ for key, default in [
     ('show_notifications', True), ('dark_mode', False), ('selected_contact', None),
     ('filter_status', 'all'), ('filter_date_range', 7), ('sort_by', 'timestamp'),
     ('search_query', ''), ('favorites', set()), ('notes', {}), ('tags', {}),
-    ('export_format', 'csv'), ('auto_refresh', False), ('refresh_interval', 60)
+    ('export_format', 'csv'), ('auto_refresh', False), ('refresh_interval', 60),
+    ('open_threads', set())
 ]:
     if key not in st.session_state:
         st.session_state[key] = default
@@ -627,48 +631,22 @@ def init_google_sheets(credentials_json):
         credentials_dict = json.loads(credentials_json)
         scopes = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
         credentials = Credentials.from_service_account_info(credentials_dict, scopes=scopes)
-        return gspread.authorize(credentials)
+        return QuotaAwareClient(gspread.authorize(credentials), credentials_dict.get('client_email', 'default'))
     except Exception as e:
         st.error(f"🔴 Authentication Error: {str(e)}")
         return None
 
-@st.cache_data(ttl=60)
-def load_sheet_data(_client, sheet_id, sheet_name):
-    """Load data from Google Sheets with caching"""
-    try:
-        spreadsheet = _client.open_by_key(sheet_id)
-        worksheet = spreadsheet.worksheet(sheet_name)
-        data = worksheet.get_all_records()
-        return pd.DataFrame(data)
-    except Exception as e:
-        st.error(f"🔴 Data Loading Error: {str(e)}")
-        return pd.DataFrame()
-
-def parse_timestamp(timestamp_str):
-    """Parse various timestamp formats"""
-    try:
-        if pd.isna(timestamp_str) or timestamp_str == '':
-            return None
-        return pd.to_datetime(timestamp_str, format='%m/%d/%Y %H:%M:%S')
-    except:
-        try:
-            return pd.to_datetime(timestamp_str)
-        except:
-            return None
-
-def is_message_sent(row):
-    """Check if a message has been sent"""
-    if row.get("email_subject") or row.get("email_message"):
-        return False
-    success = str(row.get('success', '')).lower()
-    return success == 'true' or success == 'yes' or success == '1'
+def load_all_sheet_data(_client, sheets):
+    """Load several Google Sheets concurrently as one bundle"""
+    frames, errors = load_sheets(_client, sheets)
+    for name, error in errors.items():
+        st.error(f"🔴 Data Loading Error in {sheets[name][1]}: {str(error)}")
+    return frames
 
-def is_me(sender_name, sender_url, my_profile):
-    """Check if the sender is the current user"""
-    if not sender_name or not isinstance(sender_name, str):
-        return False
-    return (my_profile["name"].lower() in sender_name.lower() or
-            (sender_url and my_profile["url"].lower() in str(sender_url).lower()))
+def invalidate_dashboard_sheets(full=False):
+    """Drop cached chat and outreach frames so the next run refetches just those sheets"""
+    invalidate_sheet(CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME, full=full)
+    invalidate_sheet(OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME, full=full)
 
 def get_initials(name):
     """Get initials from a name"""
@@ -685,11 +663,6 @@ def send_webhook_request(webhook_url, payload):
     except Exception as e:
         return False, str(e)
 
-def generate_lead_id(profile_name, linkedin_url):
-    """Generate unique lead ID"""
-    unique_string = f"{profile_name}_{linkedin_url}_{datetime.now().isoformat()}"
-    return hashlib.md5(unique_string.encode()).hexdigest()[:12]
-
 def export_to_csv(df, filename="export.csv"):
     """Export dataframe to CSV"""
     return df.to_csv(index=False).encode('utf-8')
@@ -699,27 +672,18 @@ def create_pdf_report(data_dict):
     # This is a placeholder - implement with reportlab or similar
     return b"PDF Report Content"
 
-def filter_dataframe(df, filters):
+def filter_dataframe(df, filters, search_key=None):
     """Apply filters to dataframe"""
-    filtered_df = df.copy()
-    
-    if filters.get('status') and filters['status'] != 'all':
-        filtered_df = filtered_df[filtered_df['status'] == filters['status']]
+    # The planner runs the cheapest, most selective filter first and passes row ids along
+    status = filters.get('status')
+    if not status or status == 'all' or 'status' not in df.columns:
+        status = None
     
-    if filters.get('date_range'):
-        days = filters['date_range']
-        cutoff_date = datetime.now() - timedelta(days=days)
-        if 'parsed_time' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['parsed_time'] >= cutoff_date]
+    since = None
+    if filters.get('date_range') and 'parsed_time' in df.columns:
+        since = datetime.now() - timedelta(days=filters['date_range'])
     
-    if filters.get('search_query'):
-        query = filters['search_query'].lower()
-        mask = filtered_df.apply(lambda row: any(
-            query in str(val).lower() for val in row.values
-        ), axis=1)
-        filtered_df = filtered_df[mask]
-    
-    return filtered_df
+    return select_rows(df, status=status, since=since, query=filters.get('search_query'), search_key=search_key)
 
 def calculate_metrics(chat_df, outreach_df):
     """Calculate comprehensive metrics"""
@@ -736,10 +700,7 @@ def calculate_metrics(chat_df, outreach_df):
     }
     
     if not chat_df.empty:
-        is_my_message = chat_df.apply(
-            lambda row: is_me(row.get('sender_name'), row.get('sender_url'), MY_PROFILE), axis=1
-        ).astype(bool)
-        metrics['messages_sent'] = len(chat_df[is_my_message])
+        metrics['messages_sent'] = int(chat_df['is_mine'].sum())
         metrics['messages_received'] = len(chat_df) - metrics['messages_sent']
         
         if metrics['messages_sent'] > 0:
@@ -751,7 +712,7 @@ def calculate_metrics(chat_df, outreach_df):
             metrics['ready_to_send'] = len(outreach_df[outreach_df['status'] == 'ready_to_send'])
         
         if 'success' in outreach_df.columns:
-            sent_count = len(outreach_df[outreach_df['success'].astype(str).str.lower() == 'true'])
+            sent_count = int(outreach_df['is_success'].sum())
             if metrics['total_leads'] > 0:
                 metrics['conversion_rate'] = round((sent_count / metrics['total_leads']) * 100, 2)
     
@@ -896,25 +857,42 @@ def show_conversation_history(chat_df):
         """, unsafe_allow_html=True)
         return
     
-    # Parse timestamps
-    if 'timestamp' in chat_df.columns:
-        chat_df['parsed_time'] = chat_df['timestamp'].apply(parse_timestamp)
-        chat_df = chat_df.sort_values('parsed_time', ascending=False)
-    
-    # Group by conversation
-    conversations = defaultdict(list)
-    for _, row in chat_df.iterrows():
-        conv_id = row.get('conversation_id', 'unknown')
-        conversations[conv_id].append(row)
-    
-    # Display conversations
-    for conv_id, messages in conversations.items():
-        with st.expander(f"🗨️ Conversation with {messages[0].get('recipient_name', 'Unknown')} ({len(messages)} messages)", expanded=False):
-            for msg in sorted(messages, key=lambda x: x.get('parsed_time', datetime.min)):
+    # Threads are grouped and sorted once per data version
+    index = thread_index(chat_df)
+    summary = index['summary']
+    open_threads = st.session_state.open_threads
+    
+    total_pages = max(1, (len(summary) - 1) // THREADS_PER_PAGE + 1)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.markdown(f"**{len(summary)} conversations**")
+    with col2:
+        page_num = st.number_input("Page", min_value=1, max_value=total_pages, value=1, key="thread_page")
+    page_rows = summary.iloc[(page_num - 1) * THREADS_PER_PAGE:page_num * THREADS_PER_PAGE]
+    
+    # Only opened threads render their messages; the rest stay one-line summaries
+    for _, thread in page_rows.iterrows():
+        is_open = thread['thread'] in open_threads
+        first_time = thread['first_time'].strftime('%Y-%m-%d %H:%M') if pd.notna(thread['first_time']) else 'N/A'
+        last_time = thread['last_time'].strftime('%Y-%m-%d %H:%M') if pd.notna(thread['last_time']) else 'N/A'
+        
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"🗨️ **Conversation with {thread['participant']}** ({thread['message_count']} messages) · {first_time} → {last_time}")
+        with col2:
+            if st.button("▲ Hide" if is_open else "▼ Show", key=f"thread_toggle_{thread['thread']}", use_container_width=True):
+                if is_open:
+                    open_threads.discard(thread['thread'])
+                else:
+                    open_threads.add(thread['thread'])
+                st.rerun()
+        
+        if is_open:
+            for _, msg in thread_messages(index, thread).iterrows():
                 sender_name = msg.get('sender_name', 'Unknown')
                 message_text = msg.get('message', 'No message content')
                 timestamp = msg.get('timestamp', 'N/A')
-                is_from_me = is_me(sender_name, msg.get('sender_url'), MY_PROFILE)
+                is_from_me = msg['is_mine']
                 
                 alignment = "right" if is_from_me else "left"
                 bg_color = "#667eea" if is_from_me else "#f8f9fa"
@@ -977,7 +955,7 @@ def show_crm_dashboard(outreach_df):
         'status': filter_status,
         'date_range': filter_days,
         'search_query': search_query
-    })
+    }, search_key='crm_search')
     
     # Sort
     if sort_by in filtered_df.columns:
@@ -997,7 +975,7 @@ def show_crm_dashboard(outreach_df):
         """, unsafe_allow_html=True)
     
     with col2:
-        sent = len(filtered_df[filtered_df['success'].astype(str).str.lower() == 'true']) if 'success' in filtered_df.columns else 0
+        sent = int(filtered_df['is_success'].sum()) if 'success' in filtered_df.columns else 0
         st.markdown(f"""
         <div class="stat-box" style="border-top-color: #10b981;">
             <div class="metric-icon">✅</div>
@@ -1046,6 +1024,8 @@ def show_crm_dashboard(outreach_df):
     
     # Lead Cards
     st.markdown("<br>", unsafe_allow_html=True)
+    # Widget keys are per card, so a lead listed on two rows still gets distinct widgets
+    card_keys = lead_widget_keys(filtered_df['lead_id'])
     for idx, (i, row) in enumerate(filtered_df.iterrows()):
         with st.container():
             linkedin_url = row.get('linkedin_url', '#')
@@ -1065,8 +1045,9 @@ def show_crm_dashboard(outreach_df):
                 'responded': 'status-success'
             }.get(status, 'status-pending')
             
-            # Check if favorited
-            lead_id = generate_lead_id(profile_name, linkedin_url)
+            # Favorites, notes and tags are keyed by the lead's stable ID
+            lead_id = row['lead_id']
+            card_key = card_keys[i]
             is_favorited = lead_id in st.session_state.favorites
             has_notes = lead_id in st.session_state.notes
             lead_tags = st.session_state.tags.get(lead_id, [])
@@ -1118,7 +1099,7 @@ def show_crm_dashboard(outreach_df):
             col_btn1, col_btn2, col_btn3, col_btn4, col_btn5 = st.columns(5)
             
             with col_btn1:
-                if st.button("✉️ Send Message", key=f"lead_send_{i}_{idx}", use_container_width=True):
+                if st.button("✉️ Send Message", key=f"lead_send_{card_key}", use_container_width=True):
                     success, response = send_webhook_request(WEBHOOK_URL, {
                         'action': 'send_message',
                         'profile_url': linkedin_url,
@@ -1130,7 +1111,7 @@ def show_crm_dashboard(outreach_df):
                         st.error(f"❌ Failed to send: {response}")
             
             with col_btn2:
-                if st.button("📧 Send Email", key=f"lead_email_{i}_{idx}", use_container_width=True):
+                if st.button("📧 Send Email", key=f"lead_email_{card_key}", use_container_width=True):
                     st.session_state.email_queue.append({
                         'to': profile_name,
                         'subject': f"Following up on LinkedIn",
@@ -1140,7 +1121,7 @@ def show_crm_dashboard(outreach_df):
             
             with col_btn3:
                 fav_icon = "⭐" if is_favorited else "☆"
-                if st.button(f"{fav_icon} Favorite", key=f"lead_fav_{i}_{idx}", use_container_width=True):
+                if st.button(f"{fav_icon} Favorite", key=f"lead_fav_{card_key}", use_container_width=True):
                     if is_favorited:
                         st.session_state.favorites.remove(lead_id)
                         st.info("Removed from favorites")
@@ -1150,34 +1131,34 @@ def show_crm_dashboard(outreach_df):
                     st.rerun()
             
             with col_btn4:
-                if st.button("📝 Add Note", key=f"lead_note_{i}_{idx}", use_container_width=True):
-                    st.session_state.selected_contact = lead_id
+                if st.button("📝 Add Note", key=f"lead_note_{card_key}", use_container_width=True):
+                    st.session_state.selected_contact = f"note_{card_key}"
             
             with col_btn5:
-                if st.button("🏷️ Add Tag", key=f"lead_tag_{i}_{idx}", use_container_width=True):
-                    st.session_state.selected_contact = f"tag_{lead_id}"
+                if st.button("🏷️ Add Tag", key=f"lead_tag_{card_key}", use_container_width=True):
+                    st.session_state.selected_contact = f"tag_{card_key}"
             
             # Note input
-            if st.session_state.selected_contact == lead_id:
-                note_text = st.text_area("Enter your note:", key=f"note_input_{lead_id}")
+            if st.session_state.selected_contact == f"note_{card_key}":
+                note_text = st.text_area("Enter your note:", key=f"note_input_{card_key}")
                 col_save, col_cancel = st.columns(2)
                 with col_save:
-                    if st.button("💾 Save Note", key=f"save_note_{lead_id}"):
+                    if st.button("💾 Save Note", key=f"save_note_{card_key}"):
                         st.session_state.notes[lead_id] = note_text
                         st.session_state.selected_contact = None
                         st.success("📝 Note saved!")
                         st.rerun()
                 with col_cancel:
-                    if st.button("❌ Cancel", key=f"cancel_note_{lead_id}"):
+                    if st.button("❌ Cancel", key=f"cancel_note_{card_key}"):
                         st.session_state.selected_contact = None
                         st.rerun()
             
             # Tag input
-            if st.session_state.selected_contact == f"tag_{lead_id}":
-                tag_text = st.text_input("Enter tag:", key=f"tag_input_{lead_id}")
+            if st.session_state.selected_contact == f"tag_{card_key}":
+                tag_text = st.text_input("Enter tag:", key=f"tag_input_{card_key}")
                 col_save, col_cancel = st.columns(2)
                 with col_save:
-                    if st.button("💾 Add Tag", key=f"save_tag_{lead_id}"):
+                    if st.button("💾 Add Tag", key=f"save_tag_{card_key}"):
                         if lead_id not in st.session_state.tags:
                             st.session_state.tags[lead_id] = []
                         st.session_state.tags[lead_id].append(tag_text)
@@ -1185,7 +1166,7 @@ def show_crm_dashboard(outreach_df):
                         st.success("🏷️ Tag added!")
                         st.rerun()
                 with col_cancel:
-                    if st.button("❌ Cancel", key=f"cancel_tag_{lead_id}"):
+                    if st.button("❌ Cancel", key=f"cancel_tag_{card_key}"):
                         st.session_state.selected_contact = None
                         st.rerun()
             
@@ -1444,10 +1425,7 @@ def show_analytics(chat_df, outreach_df):
     st.markdown("### 📈 Activity Over Time")
     
     if not chat_df.empty and 'timestamp' in chat_df.columns:
-        chat_df['parsed_time'] = chat_df['timestamp'].apply(parse_timestamp)
-        chat_df['date'] = chat_df['parsed_time'].dt.date
-        
-        daily_messages = chat_df.groupby('date').size().reset_index(name='count')
+        daily_messages = count_by_date(chat_df).reset_index(name='count')
         
         fig = px.line(daily_messages, x='date', y='count',
                      title='Daily Message Activity',
@@ -1466,7 +1444,7 @@ def show_analytics(chat_df, outreach_df):
     if not outreach_df.empty and 'status' in outreach_df.columns:
         st.markdown("### 🎯 Lead Status Distribution")
         
-        status_counts = outreach_df['status'].value_counts()
+        status_counts = count_values(outreach_df, 'status')
         
         fig = px.pie(values=status_counts.values, names=status_counts.index,
                     title='Lead Status Breakdown',
@@ -1484,7 +1462,7 @@ def show_analytics(chat_df, outreach_df):
     if not outreach_df.empty and 'profile_location' in outreach_df.columns:
         st.markdown("### 🌍 Geographic Distribution")
         
-        location_counts = outreach_df['profile_location'].value_counts().head(10)
+        location_counts = count_values(outreach_df, 'profile_location').head(10)
         
         fig = px.bar(x=location_counts.values, y=location_counts.index,
                     orientation='h',
@@ -1504,7 +1482,7 @@ def show_analytics(chat_df, outreach_df):
     if not outreach_df.empty and 'company_name' in outreach_df.columns:
         st.markdown("### 🏢 Top Companies")
         
-        company_counts = outreach_df['company_name'].value_counts().head(10)
+        company_counts = count_values(outreach_df, 'company_name').head(10)
         
         fig = px.bar(x=company_counts.index, y=company_counts.values,
                     title='Top 10 Companies',
@@ -1523,9 +1501,7 @@ def show_analytics(chat_df, outreach_df):
     if not chat_df.empty:
         st.markdown("### 💬 Response Analysis")
         
-        sent_messages = len(chat_df[chat_df.apply(
-            lambda row: is_me(row.get('sender_name'), row.get('sender_url'), MY_PROFILE), axis=1
-        )])
+        sent_messages = int(chat_df['is_mine'].sum())
         received_messages = len(chat_df) - sent_messages
         
         col1, col2, col3 = st.columns(3)
@@ -1666,6 +1642,96 @@ def show_webhook_monitor():
     else:
         st.info("No webhook history yet. Send a test request to get started!")
 
+# ------------------ DIAGNOSTICS ------------------ #
+def show_diagnostics():
+    """Sheets API quota, retry and sync statistics"""
+    st.markdown("<div class='section-header'>🩺 Diagnostics</div>", unsafe_allow_html=True)
+    
+    # Quota & Retries
+    st.markdown("### 🚦 Sheets API Quota")
+    quota = get_quota_stats()
+    if not quota:
+        st.info("No Sheets API requests made yet.")
+    for account, stats in quota.items():
+        st.markdown(f"**{account}**" + (" · ⏳ backing off" if stats['backing_off'] else ""))
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Requests", stats['requests'])
+        col2.metric("Throttled", stats['throttled'], f"{stats['throttle_seconds']}s waited", delta_color="off")
+        col3.metric("Retries", stats['retries'], f"{stats['rate_limited']} × 429, {stats['server_errors']} × 5xx", delta_color="off")
+        col4.metric("Served Stale", stats['served_stale'], f"{stats['failures']} failed", delta_color="off")
+    
+    # Sync Activity
+    st.markdown("### 🔁 Sync Activity")
+    flights = get_flight_stats()
+    changes = get_change_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Fetches Issued", flights['issued'])
+    col2.metric("Fetches Coalesced", flights['coalesced'])
+    col3.metric("Unchanged Probes", changes['unchanged'])
+    col4.metric("Changed Probes", changes['changed'])
+    
+    # Per-sheet ingest
+    st.markdown("### 📈 Sheet Ingestion")
+    for label, sheet_id, sheet_name in [
+        ("💬 Chat", CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME),
+        ("🎯 Outreach", OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+    ]:
+        info = get_snapshot_info(sheet_id, sheet_name)
+        stats = info['ingest_stats'] if info else None
+        if not stats:
+            st.text(f"{label}: {describe_snapshot(sheet_id, sheet_name)}, no ingest recorded yet")
+            continue
+        peak = "not traced"
+        if stats['peak_bytes']:
+            peak = f"{'~' if stats.get('peak_sampled') else ''}{stats['peak_bytes'] / 1e6:.1f} MB"
+        st.text(
+            f"{label}: {describe_snapshot(sheet_id, sheet_name)}, {stats['rows']} rows in {stats['seconds']}s "
+            f"({stats['rows_per_sec']} rows/sec), frame {stats['frame_bytes'] / 1e6:.1f} MB, peak {peak}"
+        )
+    
+    # Timestamp parsing
+    st.markdown("### 🕐 Timestamp Parsing")
+    sheet_labels = {
+        (CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME): "💬 Chat",
+        (OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME): "🎯 Outreach"
+    }
+    timestamp_stats = get_timestamp_stats()
+    if not timestamp_stats:
+        st.info("No timestamp columns parsed yet.")
+    for key, stats in timestamp_stats.items():
+        label = sheet_labels.get(key[:2], " / ".join(str(part) for part in key[:-1]))
+        formats = ", ".join(stats['formats']) or "none detected"
+        st.text(
+            f"{label} · {key[-1]}: {stats['rows'] - stats['blank'] - stats['unparseable']} parsed, "
+            f"{stats['unparseable']} unparseable, {stats['blank']} blank · formats: {formats}"
+        )
+    
+    # Derived view cache
+    st.markdown("### 🧮 Derived Views")
+    view_stats = get_view_stats()
+    if not view_stats:
+        st.info("No derived views computed yet.")
+    for name, stats in view_stats.items():
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = f"{stats['hits'] / lookups * 100:.0f}%" if lookups else "n/a"
+        st.text(
+            f"{name}: {stats['hits']} hits, {stats['misses']} misses ({hit_rate} hit rate), "
+            f"{stats['uncached']} uncached"
+        )
+    
+    # Search indexes
+    st.markdown("### 🔎 Search Indexes")
+    search_stats = get_search_stats()
+    if not search_stats:
+        st.info("No search indexes built yet.")
+    for name, stats in search_stats.items():
+        build = f"{stats['builds']} builds, {stats['avg_build_seconds']}s avg" if stats['builds'] else "no builds"
+        queries = (
+            f"{stats['queries']} queries, {stats['avg_query_ms']}ms avg, {stats['slowest_query_ms']:.1f}ms slowest"
+            if stats['queries'] else "no queries"
+        )
+        st.text(f"{name}: {build} · {queries} ({stats['narrowed']} narrowed) · {stats['matches']} rows matched")
+
 # ------------------ SETTINGS ------------------ #
 def show_settings():
     """Application settings and configuration"""
@@ -1710,20 +1776,42 @@ def show_settings():
     
     with col1:
         if st.button("🔄 Refresh All Data", use_container_width=True):
-            st.cache_data.clear()
+            invalidate_dashboard_sheets()
             st.success("✅ Data refreshed!")
             st.rerun()
     
     with col2:
         if st.button("🗑️ Clear Cache", use_container_width=True):
-            st.cache_data.clear()
-            st.cache_resource.clear()
+            invalidate_dashboard_sheets(full=True)
             st.success("✅ Cache cleared!")
     
     with col3:
         if st.button("📥 Export All Data", use_container_width=True):
             st.info("📥 Export feature coming soon!")
     
+    # Memory
+    st.markdown("### 🧠 Memory")
+    
+    memory = get_session_memory()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Active Sessions", len(memory['sessions']))
+    with col2:
+        st.metric("Referenced by Sessions", f"{memory['referenced_bytes'] / 1e6:.1f} MB")
+    with col3:
+        st.metric("Held by Process", f"{memory['unique_bytes'] / 1e6:.1f} MB")
+    
+    if not memory['sessions'].empty:
+        st.dataframe(memory['sessions'], use_container_width=True, hide_index=True)
+    
+    for label, df in [("💬 Chat", st.session_state.chat_df), ("🎯 Outreach", st.session_state.outreach_df)]:
+        if df.empty:
+            continue
+        with st.expander(f"{label} columns"):
+            usage = frame_memory(df)
+            st.caption(f"{usage['bytes'].sum() / 1e6:.1f} MB held, {usage['deep_bytes'].sum() / 1e6:.1f} MB if every string were stored separately")
+            st.dataframe(usage, use_container_width=True, hide_index=True)
+    
     # Account Information
     st.markdown("### 👤 Account Information")
     
@@ -1763,15 +1851,21 @@ def main():
     client = st.session_state.gsheets_client
     
     with st.spinner("📊 Loading data..."):
-        chat_df = load_sheet_data(client, CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME)
-        outreach_df = load_sheet_data(client, OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+        frames = load_all_sheet_data(client, {
+            'chat': (CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME),
+            'outreach': (OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+        })
+        # Parse timestamps and flags once per data version, not on every render
+        chat_df = normalize_chat(frames['chat'], MY_PROFILE)
+        outreach_df = normalize_outreach(frames['outreach'])
         
         st.session_state.chat_df = chat_df
         st.session_state.outreach_df = outreach_df
         st.session_state.last_refresh = datetime.utcnow()
+        track_session_frames({'chat': chat_df, 'outreach': outreach_df})
     
     # Calculate metrics
-    metrics = calculate_metrics(chat_df, outreach_df)
+    metrics = cached_view('metrics', (chat_df, outreach_df), calculate_metrics)
     
     # Sidebar Navigation
     with st.sidebar:
@@ -1794,6 +1888,7 @@ def main():
                 "📊 Analytics",
                 "📧 Email Queue",
                 "🔗 Webhook Monitor",
+                "🩺 Diagnostics",
                 "⚙️ Settings"
             ],
             label_visibility="collapsed"
@@ -1812,7 +1907,7 @@ def main():
         # Quick Actions
         st.markdown("### ⚡ Quick Actions")
         if st.button("🔄 Refresh Data", use_container_width=True):
-            st.cache_data.clear()
+            invalidate_dashboard_sheets()
             st.rerun()
         
         if st.button("🚪 Logout", use_container_width=True):
@@ -1825,9 +1920,14 @@ def main():
         st.markdown("""
         <div style='text-align: center; padding: 1rem; color: #999; font-size: 0.8rem;'>
             <p>Last updated:<br>{}</p>
+            <p>💬 Chats: {}<br>🎯 Leads: {}</p>
             <p style='margin-top: 1rem;'>Made with ❤️ by Donmenico</p>
         </div>
-        """.format(st.session_state.last_refresh.strftime('%Y-%m-%d %H:%M:%S')), unsafe_allow_html=True)
+        """.format(
+            st.session_state.last_refresh.strftime('%Y-%m-%d %H:%M:%S'),
+            describe_snapshot(CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME),
+            describe_snapshot(OUTREACH_SPREADSHEET_ID, OUTREACH_SHEET_NAME)
+        ), unsafe_allow_html=True)
     
     # Main Content Area
     if page == "🏠 Dashboard":
@@ -1851,6 +1951,9 @@ def main():
     elif page == "🔗 Webhook Monitor":
         show_webhook_monitor()
     
+    elif page == "🩺 Diagnostics":
+        show_diagnostics()
+    
     elif page == "⚙️ Settings":
         show_settings()
 
@@ -0,0 +1,1237 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+import weakref
+from datetime import datetime
+from gspread.utils import rowcol_to_a1
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+# ------------------ CONFIGURATION ------------------ #
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sheet_snapshots')
+SNAPSHOT_FORMAT = 2
+FRAME_TTL_SECONDS = 60
+STREAM_CHUNK_ROWS = 5000
+
+# Sessions not seen for this long drop out of the memory report
+SESSION_MEMORY_TTL_SECONDS = 1800
+
+# Declared column types; anything not listed is numeric if every cell is, else text
+SHEET_SCHEMA = {
+    'timestamp': 'datetime',
+    'success': 'bool',
+    'status': 'category',
+    'search_city': 'category',
+    'search_term': 'category',
+    'connection_status': 'category'
+}
+TRUE_VALUES = ['true', 'yes', '1']
+
+# Timestamp layouts tried in bulk, in order; anything else falls back to per-value inference
+TIMESTAMP_FORMATS = [
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %I:%M %p',
+    '%m/%d/%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    'ISO8601'
+]
+TIMESTAMP_SAMPLE_SIZE = 200
+
+# Tracing allocations roughly doubles ingest time, so by default only the first
+# rows are traced (again, after the real ingest) and their peak is scaled up;
+# set TRACE_INGEST_MEMORY to trace every ingest in full
+TRACE_INGEST_MEMORY = False
+INGEST_TRACE_SAMPLE_ROWS = 1000
+
+# Sheets API read quota is 60 requests/minute per service account
+REQUESTS_PER_MINUTE = 60
+REQUEST_BURST = 10
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+# Loaded frames are shared, read-only snapshots. Copy-on-write (always on from
+# pandas 3) lets filters and derived frames share their memory without .copy()
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# ------------------ SYNC STORE ------------------ #
+@st.cache_resource
+def get_sync_store():
+    """Process-wide store of synced sheets keyed by (sheet_id, sheet_name)"""
+    return {
+        'lock': threading.Lock(),
+        'sheets': {},
+        'refreshing': set(),
+        'frames': {},
+        'change_stats': {'unchanged': 0, 'changed': 0},
+        'inflight': {},
+        'flight_stats': {'issued': 0, 'coalesced': 0},
+        'limiters': {},
+        'projections': {},
+        'timestamp_formats': {},
+        'timestamp_stats': {},
+        'sessions': {},
+        'generations': {}
+    }
+
+def _generation(store, sheet_id, sheet_name):
+    """Reset counters covering a sheet; call with the store lock held"""
+    return (store['generations'].get(None, 0), store['generations'].get((sheet_id, sheet_name), 0))
+
+def reset_sheet_sync(sheet_id=None, sheet_name=None):
+    """Forget sync state and snapshots so the next load does a full reload"""
+    store = get_sync_store()
+    with store['lock']:
+        # Syncs already in flight finish against the old generation and are discarded
+        key = None if sheet_id is None else (sheet_id, sheet_name)
+        store['generations'][key] = store['generations'].get(key, 0) + 1
+        if sheet_id is None:
+            store['sheets'].clear()
+            store['projections'].clear()
+        else:
+            store['sheets'].pop((sheet_id, sheet_name), None)
+            for key in [key for key in store['projections'] if key[:2] == (sheet_id, sheet_name)]:
+                del store['projections'][key]
+    delete_snapshot(sheet_id, sheet_name)
+
+# ------------------ ROW HELPERS ------------------ #
+def _column_letter(col):
+    """Convert a 1-based column number to its A1 letter"""
+    return rowcol_to_a1(1, col)[:-1]
+
+def _pad_row(row, width):
+    """Pad or trim a raw sheet row to the header width"""
+    row = list(row[:width])
+    return row + [''] * (width - len(row))
+
+def _trim_row(row):
+    """Drop trailing empty cells from a raw sheet row"""
+    row = list(row)
+    while row and row[-1] == '':
+        row.pop()
+    return row
+
+# ------------------ TYPED INGESTION ------------------ #
+def _to_datetime(values, fmt):
+    """Parse an array of strings with one format, as naive datetime64[ns] with NaT for misses"""
+    parsed = pd.to_datetime(values, format=fmt, errors='coerce', utc=True)
+    return parsed.tz_convert(None).to_numpy(dtype='datetime64[ns]')
+
+def _detect_formats(values, skip):
+    """Formats that parse part of a sample of the values, most common first"""
+    sample = pd.unique(values)[:TIMESTAMP_SAMPLE_SIZE]
+    hits = []
+    for fmt in TIMESTAMP_FORMATS:
+        if fmt in skip:
+            continue
+        count = int((~np.isnat(_to_datetime(sample, fmt))).sum())
+        if count:
+            hits.append((count, fmt))
+    return [fmt for count, fmt in sorted(hits, key=lambda hit: -hit[0])]
+
+def parse_timestamps(col, key=None):
+    """Parse a timestamp column in bulk, one format group at a time.
+
+    Formats found in a column are remembered under key, normally
+    (sheet_id, sheet_name, column), so later loads skip detection. Values no
+    known format accepts are inferred one by one, each distinct value once,
+    and whatever still fails is counted as unparseable.
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    values = col.fillna('').astype(str).str.strip().to_numpy(dtype=object)
+    result = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    pending = values != ''
+    blank = int((~pending).sum())
+
+    store = get_sync_store()
+    with store['lock']:
+        formats = list(store['timestamp_formats'].get(key, []))
+
+    def parse_with(fmts):
+        for fmt in fmts:
+            if not pending.any():
+                return
+            positions = np.flatnonzero(pending)
+            parsed = _to_datetime(values[positions], fmt)
+            hit = ~np.isnat(parsed)
+            result[positions[hit]] = parsed[hit]
+            pending[positions[hit]] = False
+
+    parse_with(formats)
+    if pending.any():
+        found = _detect_formats(values[pending], formats)
+        parse_with(found)
+        formats += found
+
+    inferred = 0
+    if pending.any():
+        positions = np.flatnonzero(pending)
+        leftovers = pd.Series(values[positions])
+        distinct = pd.unique(leftovers)
+        parsed = pd.Series(_to_datetime(distinct, 'mixed'), index=distinct)
+        parsed = leftovers.map(parsed).to_numpy(dtype='datetime64[ns]')
+        hit = ~np.isnat(parsed)
+        result[positions[hit]] = parsed[hit]
+        pending[positions[hit]] = False
+        inferred = int(hit.sum())
+
+    if key is not None:
+        with store['lock']:
+            store['timestamp_formats'][key] = formats
+            store['timestamp_stats'][key] = {
+                'formats': formats,
+                'rows': len(values),
+                'blank': blank,
+                'inferred': inferred,
+                'unparseable': int(pending.sum())
+            }
+    return pd.Series(result, index=col.index, name=col.name)
+
+def get_timestamp_stats():
+    """Return detected formats and unparseable row counts per (sheet_id, sheet_name, column)"""
+    store = get_sync_store()
+    with store['lock']:
+        return {key: dict(stats) for key, stats in store['timestamp_stats'].items()}
+
+def _intern_text(col):
+    """Point equal strings at one shared object so repeated text is stored once"""
+    codes, uniques = pd.factorize(col)
+    if not len(uniques):
+        return col
+    values = np.asarray(uniques, dtype=object)[codes]
+    values[codes < 0] = np.nan
+    return pd.Series(values, index=col.index, name=col.name, dtype=object)
+
+def _typed_column(name, col, sheet=None):
+    """Apply the declared schema to one raw text column"""
+    kind = SHEET_SCHEMA.get(name)
+    if kind == 'datetime':
+        parsed = parse_timestamps(col, key=sheet + (name,) if sheet else None)
+        # Keep the text when nothing in a non-blank column looks like a timestamp
+        if parsed.notna().any() or not (col != '').any():
+            return parsed
+        return _intern_text(col)
+    if kind == 'bool':
+        return col.str.strip().str.lower().isin(TRUE_VALUES)
+    if kind == 'category':
+        return col.astype('category')
+
+    numeric = pd.to_numeric(col, errors='coerce')
+    if len(col) and numeric.notna().all():
+        return numeric
+    return _intern_text(col)
+
+def _typed_frame(header, rows, sheet=None):
+    """Build a typed DataFrame column by column from a raw value grid"""
+    width = len(header)
+    grid = pd.DataFrame(rows, dtype=object)
+    grid = grid.reindex(columns=range(width)).fillna('')
+
+    columns = {}
+    for position, name in enumerate(header):
+        columns[position] = _typed_column(name, grid[position].astype(object), sheet)
+    df = pd.DataFrame(columns, index=grid.index)
+    df.columns = header
+    return df
+
+def _column_kind(col):
+    """Coarse type of a typed column: number, datetime, bool, category or text"""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return 'category'
+    return {'i': 'number', 'u': 'number', 'f': 'number', 'M': 'datetime', 'b': 'bool'}.get(col.dtype.kind, 'text')
+
+def _as_text(col):
+    """Turn a mixed column back into sheet text, blanks for missing values"""
+    return col.map(lambda value: '' if pd.isna(value) else str(value)).astype(object)
+
+def _concat_typed(frames, sheet=None):
+    """Append typed frames, re-typing columns the frames typed differently"""
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    # Undeclared columns are typed per chunk, so one chunk can be numeric and
+    # the next text; type such a column again from its combined values
+    for name in df.columns:
+        kinds = {_column_kind(frame[name]) for frame in frames if name in frame.columns}
+        if len(kinds) > 1:
+            df[name] = _typed_column(name, _as_text(df[name]), sheet)
+    for name, kind in SHEET_SCHEMA.items():
+        if kind == 'category' and name in df.columns and df[name].dtype != 'category':
+            df[name] = df[name].astype('category')
+    # Each chunk interned its own strings; share them across chunks too
+    for name in df.columns[df.dtypes == object]:
+        df[name] = _intern_text(df[name])
+    return df
+
+_TRACE_LOCK = threading.Lock()
+
+def _traced_peak(fn):
+    """Run fn under tracemalloc; returns (result, peak bytes), peak None if a trace is already running"""
+    if tracemalloc.is_tracing() or not _TRACE_LOCK.acquire(blocking=False):
+        return fn(), None
+    try:
+        tracemalloc.start()
+        try:
+            result = fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    finally:
+        _TRACE_LOCK.release()
+    return result, peak
+
+def _ingest(header, rows, sheet=None):
+    """Build a typed frame and measure rows/sec and peak memory while doing it"""
+    started = time.perf_counter()
+    if TRACE_INGEST_MEMORY:
+        df, peak_bytes = _traced_peak(lambda: _typed_frame(header, rows, sheet))
+    else:
+        df = _typed_frame(header, rows, sheet)
+    elapsed = time.perf_counter() - started
+
+    sampled = not TRACE_INGEST_MEMORY
+    if sampled:
+        # No sheet key, so the sample leaves the timestamp format cache and stats alone
+        sample = rows[:INGEST_TRACE_SAMPLE_ROWS]
+        _, sample_peak = _traced_peak(lambda: _typed_frame(header, sample))
+        peak_bytes = int(sample_peak * len(rows) / len(sample)) if sample_peak and sample else None
+
+    stats = {
+        'rows': len(rows),
+        'seconds': round(elapsed, 4),
+        'rows_per_sec': int(len(rows) / elapsed) if elapsed > 0 else None,
+        'peak_bytes': peak_bytes,
+        'peak_sampled': sampled,
+        'frame_bytes': sum(column_bytes(df[name]) for name in df.columns)
+    }
+    return df, stats
+
+def _state_version(sheet, df, base=None):
+    """Short etag for the cells a sync state holds: a digest of the ingested frame.
+
+    Appends pass the previous version as base and only hash the new rows, so
+    any edit or append gives a new version without rehashing the whole sheet.
+    """
+    digest = hashlib.md5(json.dumps([list(sheet or ()), base, list(df.columns)], default=str).encode())
+    if len(df.columns):
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+def _make_state(header, row_count, last_row, df, ingest_stats=None, version=None, sheet=None):
+    """Bundle sync state with its version and sync time"""
+    version = version or _state_version(sheet, df)
+    # Frames carry their data version so derived views can be cached against it
+    df.attrs['sheet_version'] = version
+    df.attrs['sheet_rows'] = len(df)
+    return {
+        'header': header,
+        'row_count': row_count,
+        'last_row': last_row,
+        'df': df,
+        'version': version,
+        'synced_at': datetime.utcnow(),
+        'from_snapshot': False,
+        'ingest_stats': ingest_stats,
+        'modified_time': None
+    }
+
+def frame_version(df):
+    """Data version a loaded frame was built from, or None for other frames"""
+    return df.attrs.get('sheet_version')
+
+# ------------------ SNAPSHOT STORE ------------------ #
+def _snapshot_paths(sheet_id, sheet_name):
+    """Return the (data, metadata) file paths for a sheet snapshot"""
+    digest = hashlib.md5(f"{sheet_id}:{sheet_name}".encode()).hexdigest()[:16]
+    base = os.path.join(SNAPSHOT_DIR, digest)
+    return f"{base}.parquet", f"{base}.json"
+
+def save_snapshot(sheet_id, sheet_name, state):
+    """Write a sync state to disk, best effort; the loaded data is served either way"""
+    try:
+        _write_snapshot(sheet_id, sheet_name, state)
+    except Exception:
+        logger.warning("Could not save snapshot for %s / %s", sheet_id, sheet_name, exc_info=True)
+        for path in _snapshot_paths(sheet_id, sheet_name):
+            _remove_file(path + '.tmp')
+
+def _write_snapshot(sheet_id, sheet_name, state):
+    """Write a sync state to disk as parquet plus a JSON sidecar"""
+    data_path, meta_path = _snapshot_paths(sheet_id, sheet_name)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+    # Typed columns are stored natively; mixed object columns fall back to text
+    df = state['df'].copy(deep=False)
+    for name in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[name], skipna=True) not in ('string', 'empty'):
+            df[name] = df[name].where(df[name].isna(), df[name].astype(str))
+    df.to_parquet(data_path + '.tmp', index=False)
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'sheet_id': sheet_id,
+        'sheet_name': sheet_name,
+        'header': state['header'],
+        'row_count': state['row_count'],
+        'last_row': state['last_row'],
+        'version': state['version'],
+        'synced_at': state['synced_at'].isoformat(),
+        'modified_time': state['modified_time']
+    }
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(data_path + '.tmp', data_path)
+    os.replace(meta_path + '.tmp', meta_path)
+
+def _remove_file(path):
+    """Delete a file if it exists, ignoring errors"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def delete_snapshot(sheet_id=None, sheet_name=None):
+    """Remove one sheet's snapshot from disk, or every snapshot when sheet_id is None"""
+    if sheet_id is not None:
+        paths = _snapshot_paths(sheet_id, sheet_name)
+    elif os.path.isdir(SNAPSHOT_DIR):
+        paths = [os.path.join(SNAPSHOT_DIR, name) for name in os.listdir(SNAPSHOT_DIR)]
+    else:
+        paths = []
+    for path in paths:
+        _remove_file(path)
+
+def load_snapshot(sheet_id, sheet_name):
+    """Read a sync state back from disk, or None if there is no usable snapshot"""
+    data_path, meta_path = _snapshot_paths(sheet_id, sheet_name)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('format') != SNAPSHOT_FORMAT:
+            return None
+        df = pd.read_parquet(data_path)
+    except Exception:
+        return None
+    # Parquet text comes back as a string dtype; live frames hold interned object text
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.StringDtype):
+            df[name] = _intern_text(df[name].astype(object))
+
+    state = _make_state(meta['header'], meta['row_count'], meta['last_row'], df, version=meta['version'])
+    state['synced_at'] = datetime.fromisoformat(meta['synced_at'])
+    state['from_snapshot'] = True
+    state['modified_time'] = meta.get('modified_time')
+    return state
+
+# ------------------ QUOTA-AWARE CLIENT ------------------ #
+class RequestBudget:
+    """Token bucket shared by every client of one service account"""
+
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE, burst=REQUEST_BURST):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.backoff_until = 0.0
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'throttled': 0,
+            'throttle_seconds': 0.0,
+            'retries': 0,
+            'rate_limited': 0,
+            'server_errors': 0,
+            'failures': 0,
+            'served_stale': 0
+        }
+
+    def _wait_time(self):
+        """Seconds until a request may be sent, taking a token if it can be sent now"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.backoff_until:
+            return self.backoff_until - now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until the budget allows one more request"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                wait = self._wait_time()
+                if wait <= 0:
+                    self.stats['requests'] += 1
+                    if waited:
+                        self.stats['throttled'] += 1
+                        self.stats['throttle_seconds'] += waited
+                    return
+            time.sleep(wait)
+            waited += wait
+
+    def back_off(self, seconds):
+        """Hold every request on this account for the given number of seconds"""
+        with self.lock:
+            self.backoff_until = max(self.backoff_until, time.monotonic() + seconds)
+
+    def in_backoff(self):
+        """True while a rate-limit backoff is in effect"""
+        with self.lock:
+            return time.monotonic() < self.backoff_until
+
+    def count(self, name, amount=1):
+        """Bump one of the budget's counters"""
+        with self.lock:
+            self.stats[name] += amount
+
+def get_request_budget(account):
+    """Return the shared request budget for a service account"""
+    store = get_sync_store()
+    with store['lock']:
+        budget = store['limiters'].get(account)
+        if budget is None:
+            budget = store['limiters'][account] = RequestBudget()
+    return budget
+
+def _error_status(error):
+    """HTTP status of a gspread APIError, or None for other exceptions"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+def _call_with_retry(budget, fn, *args, **kwargs):
+    """Call the API within the budget, retrying 429/5xx with jittered exponential backoff"""
+    for attempt in range(MAX_RETRIES + 1):
+        budget.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            status = _error_status(e)
+            if status not in RETRYABLE_STATUS or attempt == MAX_RETRIES:
+                if status in RETRYABLE_STATUS:
+                    budget.count('failures')
+                if status == 429:
+                    budget.back_off(BACKOFF_MAX_SECONDS)
+                raise
+            budget.count('rate_limited' if status == 429 else 'server_errors')
+            budget.count('retries')
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+            delay *= random.uniform(0.5, 1.0)
+            if status == 429:
+                # The quota is per account, so every caller waits out a 429
+                budget.back_off(delay)
+            else:
+                time.sleep(delay)
+
+class _QuotaProxy:
+    """Route every API call on a gspread object through a request budget"""
+
+    def __init__(self, target, budget):
+        self._target = target
+        self.budget = budget
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = _call_with_retry(self.budget, attr, *args, **kwargs)
+            # Spreadsheets and worksheets handed out keep going through the budget
+            if hasattr(result, 'worksheet') or hasattr(result, 'batch_get'):
+                return _QuotaProxy(result, self.budget)
+            return result
+        return call
+
+class QuotaAwareClient(_QuotaProxy):
+    """gspread client wrapper enforcing a per-service-account request budget"""
+
+    def __init__(self, client, account='default'):
+        super().__init__(client, get_request_budget(account))
+        self.account = account
+
+def get_quota_stats():
+    """Return retry and throttle counters per service account"""
+    store = get_sync_store()
+    with store['lock']:
+        budgets = dict(store['limiters'])
+    stats = {}
+    for account, budget in budgets.items():
+        with budget.lock:
+            stats[account] = dict(budget.stats, throttle_seconds=round(budget.stats['throttle_seconds'], 2))
+        stats[account]['backing_off'] = budget.in_backoff()
+    return stats
+
+# ------------------ CHANGE DETECTION ------------------ #
+# The loader only needs open_by_key, worksheet, batch_get, get_all_values and
+# (optionally) get_lastUpdateTime, so a local fake client can stand in for gspread.
+def _worksheet_handles(client):
+    """The client's own (sheet_id, sheet_name) -> handle cache, so handles live and die with it"""
+    handles = client.__dict__.get('_sheet_handles')
+    if handles is None:
+        with get_sync_store()['lock']:
+            handles = client.__dict__.setdefault('_sheet_handles', {})
+    return handles
+
+def _open_worksheet(client, sheet_id, sheet_name):
+    """Return a cached (spreadsheet, worksheet) pair, opening it on first use"""
+    store = get_sync_store()
+    handles = _worksheet_handles(client)
+    with store['lock']:
+        handle = handles.get((sheet_id, sheet_name))
+    if handle is None:
+        spreadsheet = client.open_by_key(sheet_id)
+        handle = (spreadsheet, spreadsheet.worksheet(sheet_name))
+        with store['lock']:
+            handles[(sheet_id, sheet_name)] = handle
+    return handle
+
+def _drop_worksheet(client, sheet_id, sheet_name):
+    """Forget a cached worksheet handle, e.g. after the sheet was renamed"""
+    store = get_sync_store()
+    handles = _worksheet_handles(client)
+    with store['lock']:
+        handles.pop((sheet_id, sheet_name), None)
+
+def _modified_time(spreadsheet):
+    """Drive modifiedTime of a spreadsheet, or None when the client cannot tell"""
+    getter = getattr(spreadsheet, 'get_lastUpdateTime', None)
+    if getter is None:
+        return None
+    try:
+        return getter()
+    except Exception:
+        return None
+
+def _count_change(changed):
+    """Record whether a probe found new data"""
+    store = get_sync_store()
+    with store['lock']:
+        store['change_stats']['changed' if changed else 'unchanged'] += 1
+
+def get_change_stats():
+    """Return how many syncs were skipped or performed after a change probe"""
+    store = get_sync_store()
+    with store['lock']:
+        return dict(store['change_stats'])
+
+# ------------------ INCREMENTAL SYNC ------------------ #
+def _full_reload(worksheet, sheet=None):
+    """Pull the whole worksheet and return fresh sync state"""
+    values = worksheet.get_all_values()
+    if not values or values == [[]]:
+        return _make_state([], 0, [], pd.DataFrame(), sheet=sheet)
+    header = values[0]
+    rows = values[1:]
+    last_row = _pad_row(rows[-1], len(header)) if rows else []
+    df, stats = _ingest(header, rows, sheet)
+    return _make_state(header, len(rows), last_row, df, stats, sheet=sheet)
+
+def _append_new_rows(worksheet, state, sheet=None, modified_changed=False):
+    """Fetch only rows past the last synced one, or None if a full reload is needed.
+
+    modified_changed says the spreadsheet's modifiedTime moved since the last
+    sync; if no rows were appended, something else was edited.
+    """
+    header = state['header']
+    last_col = _column_letter(len(header))
+    last_sheet_row = state['row_count'] + 1
+    header_range, last_range, new_range = worksheet.batch_get([
+        "1:1",
+        f"A{last_sheet_row}:{last_col}{last_sheet_row}",
+        f"A{last_sheet_row + 1}:{last_col}"
+    ])
+
+    # Header changes or an edited/deleted tail row mean rows shifted under us
+    current_header = header_range[0] if header_range else []
+    if _trim_row(current_header) != _trim_row(header):
+        return None
+    if state['row_count'] > 0:
+        current_last = _pad_row(last_range[0], len(header)) if last_range else []
+        if current_last != state['last_row']:
+            return None
+
+    # Row count plus last-row match and nothing after it: the sheet is unchanged,
+    # unless modifiedTime says an existing row was edited
+    new_rows = list(new_range)
+    if not new_rows and modified_changed:
+        return None
+    if not new_rows:
+        _count_change(False)
+        return dict(state, synced_at=datetime.utcnow(), from_snapshot=False)
+    _count_change(True)
+
+    new_df, stats = _ingest(header, new_rows, sheet)
+    return _make_state(
+        header,
+        state['row_count'] + len(new_rows),
+        _pad_row(new_rows[-1], len(header)),
+        _concat_typed([state['df'], new_df], sheet),
+        stats,
+        version=_state_version(sheet, new_df, base=state['version'])
+    )
+
+def _sync_live(client, sheet_id, sheet_name, state, incremental):
+    """Bring a sheet up to date from Google Sheets and persist the result.
+
+    The spreadsheet's modifiedTime is checked first; when it matches the last
+    sync no cell values are downloaded at all. When it moved but no rows were
+    appended, an existing row was edited and the sheet is reloaded in full.
+    """
+    store = get_sync_store()
+    with store['lock']:
+        generation = _generation(store, sheet_id, sheet_name)
+    try:
+        spreadsheet, worksheet = _open_worksheet(client, sheet_id, sheet_name)
+        modified = _modified_time(spreadsheet) if incremental else None
+
+        new_state = None
+        if state and modified and state['modified_time'] == modified:
+            _count_change(False)
+            new_state = dict(state, synced_at=datetime.utcnow(), from_snapshot=False)
+        if new_state is None and incremental and state and state['header']:
+            modified_changed = bool(modified) and state['modified_time'] != modified
+            new_state = _append_new_rows(worksheet, state, (sheet_id, sheet_name), modified_changed)
+        if new_state is None:
+            _count_change(True)
+            new_state = _full_reload(worksheet, (sheet_id, sheet_name))
+    except Exception:
+        _drop_worksheet(client, sheet_id, sheet_name)
+        raise
+    new_state['modified_time'] = modified
+
+    with store['lock']:
+        if _generation(store, sheet_id, sheet_name) != generation:
+            return new_state
+        store['sheets'][(sheet_id, sheet_name)] = new_state
+    if not state or (new_state['version'], modified) != (state['version'], state['modified_time']):
+        save_snapshot(sheet_id, sheet_name, new_state)
+    return new_state
+
+# ------------------ REQUEST COALESCING ------------------ #
+def _join_flight(key):
+    """Join the in-flight call for key, becoming its leader if there is none; returns (call, leader)"""
+    store = get_sync_store()
+    with store['lock']:
+        call = store['inflight'].get(key)
+        leader = call is None
+        if leader:
+            call = {'done': threading.Event(), 'result': None, 'error': None, 'completed': False}
+            store['inflight'][key] = call
+            store['flight_stats']['issued'] += 1
+        else:
+            store['flight_stats']['coalesced'] += 1
+    return call, leader
+
+def _finish_flight(key, call, result=None, error=None, completed=False):
+    """Publish a leader's outcome and release the callers waiting on it"""
+    store = get_sync_store()
+    call.update(result=result, error=error, completed=completed)
+    with store['lock']:
+        store['inflight'].pop(key, None)
+    call['done'].set()
+
+def _single_flight(key, fn):
+    """Run fn once per key at a time; concurrent callers wait for the same result"""
+    while True:
+        call, leader = _join_flight(key)
+        if leader:
+            result, error, completed = None, None, False
+            try:
+                result = fn()
+                completed = True
+                return result
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                _finish_flight(key, call, result, error, completed)
+
+        call['done'].wait()
+        if call['error'] is not None:
+            raise call['error']
+        # A leader that gave up without a result (an abandoned stream) leaves the work to us
+        if call['completed']:
+            return call['result']
+
+def _sync_flight_key(sheet_id, sheet_name, incremental):
+    """In-flight key for syncing a sheet; streams share it, and a reset starts a new one"""
+    store = get_sync_store()
+    with store['lock']:
+        return (sheet_id, sheet_name, incremental, _generation(store, sheet_id, sheet_name))
+
+def _coalesced_sync(client, sheet_id, sheet_name, state, incremental):
+    """Sync a sheet, sharing one in-flight fetch between all concurrent callers"""
+    return _single_flight(
+        _sync_flight_key(sheet_id, sheet_name, incremental),
+        lambda: _sync_live(client, sheet_id, sheet_name, state, incremental)
+    )
+
+def get_flight_stats():
+    """Return counts of fetches issued and callers coalesced onto one"""
+    store = get_sync_store()
+    with store['lock']:
+        return dict(store['flight_stats'])
+
+def _refresh_in_background(client, sheet_id, sheet_name, state):
+    """Revalidate a snapshot-served sheet without blocking the caller"""
+    store = get_sync_store()
+    key = (sheet_id, sheet_name)
+    with store['lock']:
+        if key in store['refreshing']:
+            return
+        store['refreshing'].add(key)
+
+    def run():
+        try:
+            _coalesced_sync(client, sheet_id, sheet_name, state, incremental=True)
+        except Exception:
+            # Keep serving the snapshot; the next load will retry
+            pass
+        finally:
+            with store['lock']:
+                store['refreshing'].discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+def sync_sheet(client, sheet_id, sheet_name, incremental=True, serve_stale=True):
+    """Load a worksheet, appending only new rows when the sheet is append-only.
+
+    On a cold start the on-disk snapshot is returned straight away and
+    refreshed from Google Sheets in the background. When the quota is
+    exhausted the last good data is served instead of an error.
+    """
+    store = get_sync_store()
+    key = (sheet_id, sheet_name)
+    with store['lock']:
+        state = store['sheets'].get(key)
+
+    if state is None and serve_stale:
+        state = load_snapshot(sheet_id, sheet_name)
+        if state is not None:
+            with store['lock']:
+                store['sheets'][key] = state
+            _refresh_in_background(client, sheet_id, sheet_name, state)
+            return state['df']
+
+    # While the account is backing off from a 429, keep serving the last good data
+    budget = getattr(client, 'budget', None)
+    if state is not None and budget is not None and budget.in_backoff():
+        budget.count('served_stale')
+        return state['df']
+
+    try:
+        return _coalesced_sync(client, sheet_id, sheet_name, state, incremental)['df']
+    except Exception as e:
+        if state is None or _error_status(e) not in RETRYABLE_STATUS:
+            raise
+        if budget is not None:
+            budget.count('served_stale')
+        return state['df']
+
+# ------------------ STREAMING LOAD ------------------ #
+def _merge_ingest_stats(parts, df):
+    """Combine per-chunk ingest stats into one record for the whole frame"""
+    rows = sum(stats['rows'] for stats in parts)
+    seconds = sum(stats['seconds'] for stats in parts)
+    peaks = [stats['peak_bytes'] for stats in parts if stats['peak_bytes']]
+    return {
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_sec': int(rows / seconds) if seconds > 0 else None,
+        'peak_bytes': max(peaks) if peaks else None,
+        'peak_sampled': any(stats.get('peak_sampled') for stats in parts),
+        'frame_bytes': sum(column_bytes(df[name]) for name in df.columns)
+    }
+
+def has_sheet_state(sheet_id, sheet_name):
+    """True when a sheet is synced in memory or has a snapshot on disk"""
+    store = get_sync_store()
+    with store['lock']:
+        if (sheet_id, sheet_name) in store['sheets']:
+            return True
+    return os.path.exists(_snapshot_paths(sheet_id, sheet_name)[1])
+
+def _stream_live(client, sheet_id, sheet_name, chunk_rows):
+    """Yield typed chunks of a worksheet range by range, then return its sync state"""
+    store = get_sync_store()
+    sheet = (sheet_id, sheet_name)
+    with store['lock']:
+        generation = _generation(store, sheet_id, sheet_name)
+    try:
+        spreadsheet, worksheet = _open_worksheet(client, sheet_id, sheet_name)
+        modified = _modified_time(spreadsheet)
+        header_range = worksheet.batch_get(["1:1"])[0]
+    except Exception:
+        _drop_worksheet(client, sheet_id, sheet_name)
+        raise
+    header = _trim_row(header_range[0]) if header_range else []
+    if not header:
+        state = _sync_live(client, sheet_id, sheet_name, None, incremental=False)
+        yield state['df']
+        return state
+
+    last_col = _column_letter(len(header))
+    frames, stats, last_row = [], [], []
+    loaded, blank = 0, 0
+    start = 2
+    while True:
+        end = start + chunk_rows - 1
+        pieces = [list(worksheet.batch_get([f"A{start}:{last_col}{end}"])[0])]
+        gap = not pieces[0]
+        if gap:
+            # A fully blank range; a full reload keeps the rows after it, so
+            # fetch whatever follows in one request and stop there
+            rest = list(worksheet.batch_get([f"A{end + 1}:{last_col}"])[0])
+            if not rest:
+                break
+            blank += chunk_rows
+            pieces = [rest[i:i + chunk_rows] for i in range(0, len(rest), chunk_rows)]
+
+        for rows in pieces:
+            # The API drops trailing blank rows of a range; restore any that sat
+            # between two chunks so row positions match the sheet
+            rows = [[]] * blank + rows
+            blank = 0 if gap else chunk_rows - (len(rows) - blank)
+
+            chunk, chunk_stats = _ingest(header, rows, sheet)
+            chunk.index = pd.RangeIndex(loaded, loaded + len(rows))
+            frames.append(chunk)
+            stats.append(chunk_stats)
+            loaded += len(rows)
+            last_row = _pad_row(rows[-1], len(header))
+            yield chunk
+        if gap:
+            break
+        start = end + 1
+
+    df = _concat_typed(frames, sheet)
+    state = _make_state(header, loaded, last_row, df, _merge_ingest_stats(stats, df) if stats else None, sheet=sheet)
+    state['modified_time'] = modified
+    with store['lock']:
+        if _generation(store, sheet_id, sheet_name) != generation:
+            return state
+        store['sheets'][sheet] = state
+    save_snapshot(sheet_id, sheet_name, state)
+    return state
+
+def stream_sheet(client, sheet_id, sheet_name, tenant='default', chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield a worksheet as typed DataFrame chunks read in fixed-size row ranges.
+
+    Sheets that are already synced or snapshotted come back as one chunk from
+    the normal loader. Otherwise rows are fetched range by range, and once the
+    last chunk arrives the full frame is cached exactly as get_sheet_frame
+    would have cached it. The stream holds the same in-flight slot as a sync
+    of the sheet, so concurrent cold loads wait for it and get its result as
+    one chunk instead of streaming the sheet again.
+    """
+    if has_sheet_state(sheet_id, sheet_name):
+        yield get_sheet_frame(client, sheet_id, sheet_name, tenant=tenant)
+        return
+
+    key = _sync_flight_key(sheet_id, sheet_name, True)
+    call, leader = _join_flight(key)
+    if not leader:
+        call['done'].wait()
+        if call['error'] is not None:
+            raise call['error']
+        yield get_sheet_frame(client, sheet_id, sheet_name, tenant=tenant)
+        return
+
+    state, error, completed = None, None, False
+    try:
+        state = yield from _stream_live(client, sheet_id, sheet_name, chunk_rows)
+        completed = True
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        # Also runs when the caller stops reading early; waiters then load the sheet themselves
+        _finish_flight(key, call, state, error, completed)
+
+    store = get_sync_store()
+    with store['lock']:
+        store['frames'][(tenant, sheet_id, sheet_name, None)] = {'df': state['df'], 'loaded_at': time.monotonic()}
+
+# ------------------ COLUMN PROJECTION ------------------ #
+def _column_runs(positions):
+    """Group sorted 1-based column positions into contiguous (first, last) runs"""
+    runs = []
+    for position in sorted(positions):
+        if runs and runs[-1][1] == position - 1:
+            runs[-1][1] = position
+        else:
+            runs.append([position, position])
+    return runs
+
+def _fetch_columns(worksheet, header, columns, sheet=None):
+    """Download only the named columns, one range per contiguous run of them"""
+    positions = {header.index(name) + 1: name for name in columns if name in header}
+    if not positions:
+        return pd.DataFrame()
+    runs = _column_runs(positions)
+    ranges = worksheet.batch_get([
+        f"{_column_letter(first)}2:{_column_letter(last)}" for first, last in runs
+    ])
+
+    height = max((len(values) for values in ranges), default=0)
+    cells = {}
+    for (first, last), values in zip(runs, ranges):
+        values = list(values) + [[]] * (height - len(values))
+        for offset in range(last - first + 1):
+            cells[first + offset] = [row[offset] if offset < len(row) else '' for row in values]
+
+    names = [positions[position] for position in sorted(positions)]
+    rows = list(zip(*[cells[position] for position in sorted(positions)]))
+    return _typed_frame(names, rows, sheet)
+
+def _project(df, columns):
+    """Select the projected columns that exist in a frame"""
+    return df[[name for name in columns if name in df.columns]]
+
+def _sync_projection(client, sheet_id, sheet_name, columns):
+    """Load a column projection of a sheet, re-downloading it only after the sheet changes.
+
+    When the full sheet is already synced in memory the projection is cut from
+    it directly. Rows past the last one with a value in any projected column
+    are not counted.
+    """
+    store = get_sync_store()
+    key = (sheet_id, sheet_name, columns)
+    with store['lock']:
+        state = store['sheets'].get((sheet_id, sheet_name))
+        cached = store['projections'].get(key)
+    if state is not None:
+        return _project(state['df'], columns)
+
+    try:
+        spreadsheet, worksheet = _open_worksheet(client, sheet_id, sheet_name)
+        modified = _modified_time(spreadsheet)
+        if cached and modified and cached['modified_time'] == modified:
+            _count_change(False)
+            return cached['df']
+        _count_change(True)
+        header_range = worksheet.batch_get(["1:1"])[0]
+        header = _trim_row(header_range[0]) if header_range else []
+        df = _fetch_columns(worksheet, header, columns, (sheet_id, sheet_name))
+    except Exception:
+        _drop_worksheet(client, sheet_id, sheet_name)
+        raise
+
+    with store['lock']:
+        store['projections'][key] = {'df': df, 'modified_time': modified}
+    return df
+
+def _coalesced_projection(client, sheet_id, sheet_name, columns):
+    """Load a projection, sharing one in-flight fetch between concurrent callers"""
+    return _single_flight(
+        (sheet_id, sheet_name, columns),
+        lambda: _sync_projection(client, sheet_id, sheet_name, columns)
+    )
+
+# ------------------ FRAME CACHE ------------------ #
+def _cached_frame(tenant, sheet_id, sheet_name, ttl, columns=None):
+    """Return a tenant's cached frame if it is younger than ttl seconds"""
+    store = get_sync_store()
+    with store['lock']:
+        entry = store['frames'].get((tenant, sheet_id, sheet_name, columns))
+    if entry and time.monotonic() - entry['loaded_at'] < ttl:
+        return entry['df']
+    return None
+
+def _fetch_frame(client, tenant, sheet_id, sheet_name, columns=None):
+    """Sync a sheet (or one column projection of it) and cache the result for one tenant"""
+    if columns is None:
+        df = sync_sheet(client, sheet_id, sheet_name)
+    else:
+        df = _coalesced_projection(client, sheet_id, sheet_name, columns)
+    store = get_sync_store()
+    with store['lock']:
+        store['frames'][(tenant, sheet_id, sheet_name, columns)] = {'df': df, 'loaded_at': time.monotonic()}
+    return df
+
+def get_sheet_frame(client, sheet_id, sheet_name, tenant='default', ttl=FRAME_TTL_SECONDS, columns=None):
+    """Load a sheet through the per-tenant frame cache.
+
+    Pass columns to fetch and cache only that projection of the sheet.
+    """
+    if columns is not None:
+        columns = tuple(columns)
+    df = _cached_frame(tenant, sheet_id, sheet_name, ttl, columns)
+    if df is None:
+        df = _fetch_frame(client, tenant, sheet_id, sheet_name, columns)
+    # Shallow copy so callers adding columns do not touch the shared frame
+    return df.copy(deep=False)
+
+def invalidate_sheet(sheet_id, sheet_name, tenant='default', full=False):
+    """Drop one tenant's cached frames so the next load refetches that sheet only.
+
+    With full=True the sync state and the on-disk snapshot are dropped too,
+    forcing a complete re-download instead of an incremental top-up.
+    """
+    store = get_sync_store()
+    with store['lock']:
+        for key in [key for key in store['frames'] if key[:3] == (tenant, sheet_id, sheet_name)]:
+            del store['frames'][key]
+    if full:
+        reset_sheet_sync(sheet_id, sheet_name)
+
+def load_sheets(client, sheets, tenant='default', ttl=FRAME_TTL_SECONDS, max_workers=4):
+    """Load several worksheets concurrently through the frame cache.
+
+    sheets maps a name to a (sheet_id, sheet_name) pair. Returns a bundle of
+    frames and a dict of per-sheet errors; a failed sheet gets an empty frame.
+    """
+    frames, errors = {}, {}
+    stale = {}
+    for name, (sheet_id, sheet_name) in sheets.items():
+        df = _cached_frame(tenant, sheet_id, sheet_name, ttl)
+        if df is None:
+            stale[name] = (sheet_id, sheet_name)
+        else:
+            frames[name] = df.copy(deep=False)
+    if not stale:
+        return frames, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as pool:
+        futures = {
+            name: pool.submit(_fetch_frame, client, tenant, sheet_id, sheet_name)
+            for name, (sheet_id, sheet_name) in stale.items()
+        }
+        for name, future in futures.items():
+            try:
+                frames[name] = future.result().copy(deep=False)
+            except Exception as e:
+                frames[name] = pd.DataFrame()
+                errors[name] = e
+    return frames, errors
+
+def get_snapshot_info(sheet_id, sheet_name):
+    """Return version, age and row count of the data currently served for a sheet"""
+    store = get_sync_store()
+    key = (sheet_id, sheet_name)
+    with store['lock']:
+        state = store['sheets'].get(key)
+        refreshing = key in store['refreshing']
+    if state is None:
+        return None
+    return {
+        'version': state['version'],
+        'synced_at': state['synced_at'],
+        'age_seconds': (datetime.utcnow() - state['synced_at']).total_seconds(),
+        'row_count': state['row_count'],
+        'from_snapshot': state['from_snapshot'],
+        'refreshing': refreshing,
+        'ingest_stats': state['ingest_stats']
+    }
+
+def describe_snapshot(sheet_id, sheet_name):
+    """Human readable snapshot version and age for the UI"""
+    info = get_snapshot_info(sheet_id, sheet_name)
+    if info is None:
+        return "not loaded"
+    age = int(info['age_seconds'])
+    if age < 60:
+        age_text = f"{age}s ago"
+    elif age < 3600:
+        age_text = f"{age // 60}m ago"
+    else:
+        age_text = f"{age // 3600}h ago"
+    suffix = " · refreshing" if info['refreshing'] else ""
+    return f"v{info['version']} · {age_text}{suffix}"
+
+# ------------------ MEMORY REPORT ------------------ #
+def column_bytes(col):
+    """Bytes a column holds, counting each shared string object once"""
+    if col.dtype != object:
+        return int(col.memory_usage(index=False, deep=True))
+    distinct = {id(value): value for value in col.to_numpy()}
+    return int(col.memory_usage(index=False, deep=False) + sum(sys.getsizeof(value) for value in distinct.values()))
+
+def frame_memory(df):
+    """Per-column dtype, actual bytes and naive deep bytes for one frame"""
+    return pd.DataFrame({
+        'column': list(df.columns),
+        'dtype': [str(dtype) for dtype in df.dtypes],
+        'bytes': [column_bytes(df[name]) for name in df.columns],
+        'deep_bytes': [int(df[name].memory_usage(index=False, deep=True)) for name in df.columns]
+    })
+
+def track_session_frames(frames):
+    """Remember which frames the current session holds, for the memory report.
+
+    Only weak references are kept, so the report never keeps a frame alive.
+    """
+    ctx = get_script_run_ctx()
+    session_id = ctx.session_id if ctx else 'local'
+    now = time.time()
+    store = get_sync_store()
+    with store['lock']:
+        store['sessions'][session_id] = {
+            'frames': {name: weakref.ref(df) for name, df in frames.items()},
+            'seen': now
+        }
+        for key in [key for key, entry in store['sessions'].items() if now - entry['seen'] > SESSION_MEMORY_TTL_SECONDS]:
+            del store['sessions'][key]
+
+def get_session_memory():
+    """Bytes referenced per session, plus what the process holds once shared columns are counted once.
+
+    Sessions get shallow copies of the same loaded frames, so a column is
+    identified by (data version, column name) rather than by frame.
+    """
+    store = get_sync_store()
+    with store['lock']:
+        sessions = {key: dict(entry) for key, entry in store['sessions'].items()}
+
+    sizes = {}
+    report = []
+    for session_id, entry in sessions.items():
+        session_bytes = 0
+        frame_names = []
+        for name, ref in entry['frames'].items():
+            df = ref()
+            if df is None:
+                continue
+            frame_names.append(name)
+            owner = frame_version(df) or id(df)
+            for column in df.columns:
+                key = (owner, column)
+                if key not in sizes:
+                    sizes[key] = column_bytes(df[column])
+                session_bytes += sizes[key]
+        report.append({
+            'session': session_id[:8],
+            'frames': ", ".join(frame_names),
+            'bytes': session_bytes,
+            'seen': datetime.fromtimestamp(entry['seen'])
+        })
+    return {
+        'sessions': pd.DataFrame(report, columns=['session', 'frames', 'bytes', 'seen']),
+        'referenced_bytes': sum(row['bytes'] for row in report),
+        'unique_bytes': sum(sizes.values())
+    }
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+import streamlit as st
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lead_data
+import lead_search
+import sheet_loader
+
+
+@pytest.fixture(autouse=True)
+def isolated_loader(tmp_path, monkeypatch):
+    """Fresh stores, session and a private snapshot directory for every test"""
+    monkeypatch.setattr(sheet_loader, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    stores = [sheet_loader.get_sync_store, lead_data.get_normalized_store, lead_search.get_search_store]
+    for store in stores:
+        store.clear()
+    st.session_state.clear()
+    yield
+    for store in stores:
+        store.clear()
+    st.session_state.clear()
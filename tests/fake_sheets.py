@@ -0,0 +1,104 @@
+import re
+from datetime import datetime, timedelta
+
+# ------------------ A1 RANGES ------------------ #
+A1_PART = re.compile(r'^([A-Z]*)(\d*)$')
+
+def _column_number(letters):
+    """Convert A1 column letters to a 1-based column number"""
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord('A') + 1
+    return number
+
+def _parse_range(a1):
+    """(first_row, last_row, first_col, last_col) of an A1 range; None means open-ended"""
+    start, _, end = a1.partition(':')
+    end = end or start
+    start_col, start_row = A1_PART.match(start).groups()
+    end_col, end_row = A1_PART.match(end).groups()
+    return (
+        int(start_row) if start_row else 1,
+        int(end_row) if end_row else None,
+        _column_number(start_col) if start_col else 1,
+        _column_number(end_col) if end_col else None
+    )
+
+def _trim(row):
+    """Drop trailing empty cells, as the Sheets API does"""
+    row = list(row)
+    while row and row[-1] == '':
+        row.pop()
+    return row
+
+# ------------------ FAKE CLIENT ------------------ #
+class FakeWorksheet:
+    """In-memory worksheet answering the calls sheet_loader makes"""
+
+    def __init__(self, values):
+        self.values = [list(row) for row in values]
+        self.calls = []
+
+    @property
+    def row_count(self):
+        return len(self.values)
+
+    def get_all_values(self):
+        self.calls.append(('get_all_values',))
+        width = max((len(row) for row in self.values), default=0)
+        rows = [row + [''] * (width - len(row)) for row in self.values]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    def batch_get(self, ranges):
+        self.calls.append(('batch_get', tuple(ranges)))
+        return [self._get_range(a1) for a1 in ranges]
+
+    def _get_range(self, a1):
+        first_row, last_row, first_col, last_col = _parse_range(a1)
+        rows = self.values[first_row - 1:last_row]
+        rows = [_trim(row[first_col - 1:last_col]) for row in rows]
+        # Trailing empty rows are left out of the response
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def count(self, name):
+        """How many times an API method was called"""
+        return sum(1 for call in self.calls if call[0] == name)
+
+
+class FakeSpreadsheet:
+    """Spreadsheet holding named worksheets and a Drive modifiedTime"""
+
+    def __init__(self, worksheets):
+        self.worksheets = worksheets
+        self.modified = datetime(2024, 1, 1)
+
+    def worksheet(self, name):
+        return self.worksheets[name]
+
+    def get_lastUpdateTime(self):
+        return self.modified.isoformat() + 'Z'
+
+    def touch(self):
+        """Move modifiedTime forward, as any edit in the Sheets UI would"""
+        self.modified += timedelta(seconds=1)
+
+
+class FakeClient:
+    """Stand-in for a gspread client, keyed by spreadsheet ID"""
+
+    def __init__(self, spreadsheets):
+        self.spreadsheets = spreadsheets
+
+    def open_by_key(self, key):
+        return self.spreadsheets[key]
+
+
+def fake_client(values, sheet_id='sheet', sheet_name='Sheet1'):
+    """A client with one spreadsheet holding one worksheet of values"""
+    worksheet = FakeWorksheet(values)
+    spreadsheet = FakeSpreadsheet({sheet_name: worksheet})
+    return FakeClient({sheet_id: spreadsheet}), spreadsheet, worksheet
@@ -0,0 +1,86 @@
+import pandas as pd
+
+from lead_data import mine_mask, mine_column, contact_table, contact_messages, thread_index, thread_messages
+
+PROFILE = {'name': 'Ana Lee', 'url': 'linkedin.com/in/analee'}
+
+
+def chat():
+    df = pd.DataFrame({
+        'sender_name': ['Ana Lee', 'Ben Stone', '', 'ANA LEE (she/her)', 'Ben Stone', None],
+        'sender_linkedin_url': ['', 'https://linkedin.com/in/ben', 'https://LinkedIn.com/in/AnaLee', '', 'https://www.linkedin.com/in/analee/', ''],
+        'message': ['hi', 'hello', 'ping', 'thanks', 'forwarded', 'blank']
+    })
+    df.attrs['sheet_version'] = 'v1'
+    df.attrs['sheet_rows'] = len(df)
+    return df
+
+
+# ------------------ IS MINE ------------------ #
+def test_mine_matches_name_or_url_and_needs_a_sender_name():
+    assert list(mine_mask(chat(), PROFILE)) == [True, False, False, True, True, False]
+
+
+def test_mine_column_follows_a_filtered_frame():
+    df = chat()
+    full = mine_column(df, PROFILE)
+    subset = df.iloc[[4, 0, 1]]
+
+    assert mine_column(subset, PROFILE).equals(full.loc[[4, 0, 1]])
+
+
+# ------------------ CONTACTS ------------------ #
+ME = {'name': 'Ana Lee', 'url': 'linkedin.com/in/analee'}
+BEN, CID, DEE = 'https://linkedin.com/in/ben', 'https://linkedin.com/in/cid', 'https://linkedin.com/in/dee'
+
+
+def conversation():
+    df = pd.DataFrame([
+        ('Ben Stone', BEN, '', '2024-01-01', '09:00', 'hi Ana'),
+        ('Ana Lee', '', BEN, '2024-01-01', '10:00', 'hi Ben'),
+        ('Ana Lee', '', CID, '2024-01-01', '11:00', 'hello Cid'),
+        ('Dee Roy', DEE, DEE, '2024-01-02', '08:00', 'hey'),
+        ('Ben Stone', BEN, BEN, '2024-01-03', '12:00', 'thanks')
+    ], columns=['sender_name', 'sender_linkedin_url', 'lead_linkedin_url', 'date', 'time', 'message'])
+    df.attrs['sheet_version'] = 'v1'
+    df.attrs['sheet_rows'] = len(df)
+    return df
+
+
+def test_contacts_are_everyone_who_wrote_back():
+    table = contact_table(conversation(), ME)
+
+    assert list(table['url']) == [BEN, DEE]
+    assert list(table['name']) == ['Ben Stone', 'Dee Roy']
+    assert list(table['message_count']) == [3, 1]
+    assert list(table['sent_count']) == [1, 0]
+    assert list(table['received_count']) == [2, 1]
+    assert list(table['last_contact']) == ['2024-01-03 12:00', '2024-01-02 08:00']
+
+
+def test_contact_messages_are_one_contact_oldest_first():
+    df = conversation().iloc[[4, 3, 2, 1, 0]].reset_index(drop=True)
+    df.attrs['sheet_rows'] = len(df)
+
+    assert list(contact_messages(df, ME, BEN)['message']) == ['hi Ana', 'hi Ben', 'thanks']
+    assert contact_messages(df, ME, CID).empty
+
+
+# ------------------ CONVERSATION THREADS ------------------ #
+def test_threads_are_listed_newest_first_with_their_messages_in_order():
+    df = pd.DataFrame({
+        'conversation_id': ['t1', 't2', 't1', None, 't2'],
+        'recipient_name': ['Ben', 'Cid', 'Ben', 'Dee', 'Cid'],
+        'parsed_time': pd.to_datetime(['2024-01-03', '2024-01-02', '2024-01-01', '2024-01-05', '2024-01-04']),
+        'message': ['b2', 'c1', 'b1', 'd1', 'c2']
+    })
+    df.attrs['sheet_version'] = 'v1'
+    df.attrs['sheet_rows'] = len(df)
+    index = thread_index(df)
+    summary = index['summary']
+
+    assert list(summary['thread']) == ['unknown', 't2', 't1']
+    assert list(summary['participant']) == ['Dee', 'Cid', 'Ben']
+    assert list(summary['message_count']) == [1, 2, 2]
+    assert summary['first_time'].iloc[2] == pd.Timestamp('2024-01-01')
+    assert [list(thread_messages(index, row)['message']) for _, row in summary.iterrows()] == [['d1'], ['c1', 'c2'], ['b1', 'b2']]
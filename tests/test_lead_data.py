@@ -0,0 +1,106 @@
+import pandas as pd
+
+import lead_data
+from lead_data import cached_view, get_view_stats, lead_widget_keys, normalize_outreach, normalize_chat, lead_identity, lead_id_column
+
+
+def versioned(version):
+    df = pd.DataFrame({'status': ['sent', 'pending']})
+    df.attrs['sheet_version'] = version
+    df.attrs['sheet_rows'] = len(df)
+    return df
+
+
+def test_view_cache_evicts_least_recently_used(monkeypatch):
+    lead_data.get_normalized_store.clear()
+    monkeypatch.setattr(lead_data, 'VIEW_CACHE_SIZE', 2)
+    popular, second, third = versioned('a'), versioned('b'), versioned('c')
+    count = lambda df: len(df)
+
+    cached_view('rows', popular, count)
+    cached_view('rows', second, count)
+    cached_view('rows', popular, count)
+    cached_view('rows', third, count)
+    cached_view('rows', popular, count)
+
+    assert get_view_stats()['rows'] == {'hits': 2, 'misses': 3, 'uncached': 0}
+    lead_data.get_normalized_store.clear()
+
+
+def test_widget_keys_follow_the_lead_and_split_duplicates():
+    keys = lead_widget_keys(pd.Series(['b', 'a', 'b'], index=[7, 3, 5]))
+
+    assert keys.to_dict() == {7: 'b', 3: 'a', 5: 'b_1'}
+
+
+def test_sorted_frame_does_not_share_positional_views():
+    lead_data.get_normalized_store.clear()
+    df = versioned('a')
+    first_row = lambda df: df['status'].iloc[0]
+
+    assert cached_view('first', df, first_row) == 'sent'
+    assert cached_view('first', df.sort_values('status'), first_row) == 'pending'
+    assert cached_view('first', df, first_row) == 'sent'
+
+    assert get_view_stats()['first'] == {'hits': 1, 'misses': 2, 'uncached': 0}
+    lead_data.get_normalized_store.clear()
+
+
+# ------------------ CANONICAL FRAMES ------------------ #
+def outreach():
+    df = pd.DataFrame({
+        'profile_name': ['Ana', 'Ben', 'Cid'],
+        'linkedin_url': ['https://linkedin.com/in/ana', '', 'https://linkedin.com/in/cid'],
+        'success': ['TRUE', 'yes', 'false'],
+        'email_subject': ['', 'Hello', ''],
+        'timestamp': pd.to_datetime(['2024-01-02 10:00', '2024-01-03 11:00', None])
+    })
+    df.attrs['sheet_version'] = 'v1'
+    df.attrs['sheet_rows'] = len(df)
+    return df
+
+
+def test_outreach_is_normalized_once_per_version():
+    raw = outreach()
+    df = normalize_outreach(raw)
+
+    assert list(df['is_success']) == [True, True, False]
+    assert list(df['has_email']) == [False, True, False]
+    assert list(df['is_sent']) == [True, False, False]
+    assert str(df['date'].iloc[0]) == '2024-01-02'
+    assert df['lead_id'].str.len().eq(12).all()
+    assert 'is_sent' not in raw.columns
+    assert normalize_outreach(outreach()) is df
+
+
+def test_chat_is_normalized_per_profile():
+    raw = pd.DataFrame({'sender_name': ['Ana Lee', 'Ben'], 'timestamp': ['01/02/2024 10:00', '01/02/2024 10:05']})
+    raw.attrs['sheet_version'] = 'v1'
+    raw.attrs['sheet_rows'] = len(raw)
+    ana = normalize_chat(raw, {'name': 'Ana Lee', 'url': 'linkedin.com/in/ana'})
+    ben = normalize_chat(raw, {'name': 'Ben', 'url': 'linkedin.com/in/ben'})
+
+    assert list(ana['is_mine']) == [True, False]
+    assert list(ben['is_mine']) == [False, True]
+    assert ana['parsed_time'].iloc[1] == pd.Timestamp('2024-01-02 10:05')
+
+
+# ------------------ LEAD IDENTITY ------------------ #
+def test_lead_identity_ignores_url_formatting():
+    same = [
+        lead_identity('https://www.linkedin.com/in/ana-lee/', 'Ana'),
+        lead_identity('http://de.linkedin.com/in/Ana-Lee?trk=abc', 'Ana Lee'),
+        lead_identity('linkedin.com/in/ana-lee#about', '')
+    ]
+
+    assert len(set(same)) == 1
+    assert lead_identity('', '  Ana   LEE ') == lead_identity(None, 'ana lee') != same[0]
+
+
+def test_lead_ids_follow_the_lead_when_rows_move():
+    df = outreach()
+    ids = lead_id_column(df)
+    moved = df.iloc[[2, 0, 1]]
+
+    assert lead_id_column(moved).equals(ids.loc[[2, 0, 1]])
+    assert ids[0] == lead_identity('https://linkedin.com/in/ana', 'Ana')
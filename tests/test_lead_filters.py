@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import lead_filters
+from lead_filters import facet_mask, facet_bits, facet_index, not_bits, bits_mask, plan_rows, select_rows, since_rows, time_order
+
+LEADS = pd.DataFrame({
+    'status': ['sent', 'pending', None, 'sent', 'failed', 'pending', 'sent', 'pending', 'sent'],
+    'search_city': ['Berlin', 'Austin', 'Berlin', 'London', 'Berlin', 'Austin', 'Austin', None, 'Berlin'],
+    'is_success': [True, False, False, True, False, False, True, False, False],
+    'profile_name': ['Ana Lee', 'Ben Lee', 'Cid Roy', 'Dee Roy', 'Eve Lee', 'Fay Roy', 'Gus Lee', 'Hal Roy', 'Ida Lee'],
+    'parsed_time': pd.to_datetime([
+        '2024-01-05', '2024-01-01', None, '2024-01-09', '2024-01-03', '2024-01-07', '2024-01-02', '2024-01-08', '2024-01-06'
+    ])
+})
+
+
+def leads(df=LEADS):
+    df = df.copy()
+    df.attrs['sheet_version'] = 'v1'
+    df.attrs['sheet_rows'] = len(df)
+    return df
+
+
+# ------------------ FACET INDEX ------------------ #
+def test_facet_mask_matches_isin():
+    df = leads()
+    for filters in [
+        {'status': 'sent'},
+        {'status': ['sent', 'failed']},
+        {'status': 'sent', 'search_city': 'Berlin'},
+        {'status': ['pending', None], 'search_city': ['Austin', None]},
+        {'is_success': True},
+        {'status': 'unknown'}
+    ]:
+        expected = pd.Series(True, index=df.index)
+        for column, values in filters.items():
+            values = values if isinstance(values, list) else [values]
+            expected &= df[column].isin(values)
+        assert facet_mask(df, filters).equals(expected), filters
+
+
+def test_complement_keeps_padding_clear():
+    df = leads()
+    index = facet_index(df)
+    bits = not_bits(index, facet_bits(index, 'status', 'sent'))
+
+    assert bits_mask(df, bits).equals(df['status'] != 'sent')
+    assert np.unpackbits(bits)[len(df):].sum() == 0
+
+
+def test_high_cardinality_column_keeps_codes(monkeypatch):
+    monkeypatch.setattr(lead_filters, 'FACET_MAX_VALUES', 2)
+    df = leads()
+
+    assert facet_index(df)['facets']['status']['bitmaps'] is None
+    assert facet_mask(df, {'status': ['sent', 'failed']}).equals(df['status'].isin(['sent', 'failed']))
+
+
+# ------------------ TIME ORDER ------------------ #
+def test_since_rows_matches_a_comparison():
+    df = leads()
+    rows = since_rows(time_order(df), datetime(2024, 1, 5))
+
+    assert list(rows) == list(np.flatnonzero(df['parsed_time'] >= datetime(2024, 1, 5)))
+
+
+# ------------------ QUERY PLANNER ------------------ #
+def test_planner_matches_plain_filtering():
+    df = leads()
+    for status, since, query in [
+        ('sent', None, None),
+        (None, datetime(2024, 1, 4), None),
+        ('pending', datetime(2024, 1, 2), None),
+        (['sent', 'failed'], datetime(2024, 1, 3), 'lee'),
+        (None, None, 'roy'),
+        ('failed', datetime(2024, 1, 9), None),
+        ('sent', datetime(2030, 1, 1), 'lee')
+    ]:
+        expected = pd.Series(True, index=df.index)
+        if status is not None:
+            expected &= df['status'].isin(status if isinstance(status, list) else [status])
+        if since is not None:
+            expected &= df['parsed_time'] >= since
+        if query is not None:
+            expected &= df['profile_name'].str.lower().str.contains(query)
+        assert select_rows(df, status=status, since=since, query=query).equals(df[expected]), (status, since, query)
+
+
+def test_nothing_to_filter_returns_the_frame():
+    df = leads()
+
+    assert plan_rows(df) is None
+    assert select_rows(df, query='  ') is df
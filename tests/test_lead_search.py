@@ -0,0 +1,92 @@
+import re
+
+import pandas as pd
+
+from lead_search import search_mask, lead_search_rows, get_search_stats
+
+LEADS = pd.DataFrame({
+    'profile_name': ['Ana García', 'Ben Stone', 'Cid Moreau', 'Dee García', 'Eve Stone'],
+    'profile_tagline': ['Head of Sales at Acme', 'CTO at Globex', 'Founder, Initech', 'VP Sales', None],
+    'profile_location': ['Berlin', 'Austin', 'Berlin', 'London', 'Austin'],
+    'search_term': ['sales', 'cto', 'founder', 'sales', 'cto'],
+    'notes': ['acme', 'acme', 'acme', 'acme', 'acme']
+})
+
+
+def leads(df=LEADS, version='v1'):
+    df = df.copy()
+    df.attrs['sheet_version'] = version
+    df.attrs['sheet_rows'] = len(df)
+    return df
+
+
+def scan(df, query):
+    """Every query word starts a word in one of the searched columns"""
+    text = df.drop(columns='notes').fillna('').astype(str).agg(' '.join, axis=1).str.lower()
+    mask = pd.Series(True, index=df.index)
+    for word in re.findall(r'\w+', query.lower()):
+        mask &= text.str.contains(r'(?<!\w)' + re.escape(word))
+    return mask
+
+
+# ------------------ INVERTED INDEX ------------------ #
+def test_search_matches_a_word_prefix_scan():
+    df = leads()
+    for query in ['garc', 'sales berlin', 'STONE', 'cto aus', 'head of', 'ales', 'zz', 'garcía dee']:
+        assert search_mask(df, query).equals(scan(df, query)), query
+
+
+def test_unsearched_columns_do_not_match():
+    assert not search_mask(leads(), 'acme').iloc[1]
+
+
+def test_query_without_words_keeps_every_row():
+    df = leads()
+
+    assert lead_search_rows(df, ' -- ') is None
+    assert search_mask(df, ' -- ').all()
+
+
+def test_mask_follows_the_frame_index():
+    df = leads().set_axis([10, 20, 30, 40, 50])
+
+    assert list(df.index[search_mask(df, 'berlin')]) == [10, 30]
+
+
+def test_index_is_built_once_per_version():
+    df = leads()
+    search_mask(df, 'ana')
+    search_mask(df, 'ben')
+    search_mask(leads(version='v2'), 'ana')
+
+    stats = get_search_stats()['lead_search']
+    assert stats['builds'] == 2
+    assert stats['queries'] == 3
+
+
+# ------------------ NARROWING ------------------ #
+def test_typing_narrows_from_the_previous_result():
+    df = leads()
+    search_mask(df, 'sa', session_key='box')
+    mask = search_mask(df, 'sales berl', session_key='box')
+
+    assert mask.equals(scan(df, 'sales berl'))
+    assert get_search_stats()['lead_search']['narrowed'] == 1
+
+
+def test_equal_length_subsets_are_not_narrowed_from_each_other():
+    df = leads()
+    first, second = df[df['profile_location'] != 'London'], df.iloc[1:]
+    assert len(first) == len(second)
+    search_mask(first, 'st', session_key='box')
+    mask = search_mask(second, 'stone', session_key='box')
+
+    assert mask.equals(scan(second, 'stone'))
+    assert get_search_stats()['lead_search']['narrowed'] == 0
+
+
+def test_a_new_query_searches_the_whole_index():
+    df = leads()
+    search_mask(df, 'ben', session_key='box')
+
+    assert search_mask(df, 'ana', session_key='box').equals(scan(df, 'ana'))
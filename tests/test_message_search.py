@@ -0,0 +1,45 @@
+import pandas as pd
+
+from lead_search import message_search_mask, substring_candidates, message_search_index
+
+CHAT = pd.DataFrame({
+    'message': ['Hello there, thanks!', 'Pricing deck attached', None, 'See you in İstanbul 😀', 'café at noon'],
+    'sender_name': ['Peter Müller', 'Jane Doe', 'Jane Doe', 'Li Wei', 'Peter Müller'],
+    'shared_content': ['', 'Q3 Pricing.xlsx', 'https://example.com/deck.pdf', None, ''],
+    'date': ['2024-01-01'] * 5
+})
+
+
+def chat(version='v1'):
+    df = CHAT.copy()
+    df.attrs['sheet_version'] = version
+    df.attrs['sheet_rows'] = len(df)
+    return df
+
+
+def scan(df, query):
+    """Case-insensitive substring match in any searched column"""
+    columns = df[['message', 'sender_name', 'shared_content']].fillna('').astype(str)
+    return columns.apply(lambda x: x.str.lower().str.contains(query.lower(), regex=False)).any(axis=1)
+
+
+# ------------------ TRIGRAM INDEX ------------------ #
+def test_substring_search_matches_a_scan():
+    df = chat()
+    for query in ['llo th', 'MÜLLER', 'pricing', 'deck', 'e', 'ee', 'caf', '😀', 'istanbul', 'zzz', '2024']:
+        assert message_search_mask(df, query).equals(scan(df, query)), query
+
+
+def test_trigram_candidates_cover_every_match():
+    df = chat()
+    index = message_search_index(df)
+    candidates = set(substring_candidates(index, 'pricing'))
+
+    assert {i for i, value in enumerate(index['values']) if 'pricing' in value} <= candidates
+    assert len(substring_candidates(index, 'qqq')) == 0
+
+
+def test_mask_follows_the_frame_index():
+    df = chat().set_axis(list('abcde'))
+
+    assert list(df.index[message_search_mask(df, 'jane')]) == ['b', 'c']
@@ -0,0 +1,101 @@
+import pytest
+
+import sheet_loader
+from fake_sheets import fake_client
+from sheet_loader import QuotaAwareClient, RequestBudget, sync_sheet, get_quota_stats
+
+HEADER = ['profile_name', 'status']
+ROWS = [['Ana', 'pending'], ['Ben', 'sent']]
+
+
+class APIError(Exception):
+    """Stand-in for gspread.exceptions.APIError, which carries the HTTP response"""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = type('Response', (), {'status_code': status})()
+
+
+class Flaky:
+    """Callable failing with the given statuses before it succeeds"""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.statuses:
+            raise APIError(self.statuses.pop(0))
+        return 'ok'
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(sheet_loader, 'BACKOFF_BASE_SECONDS', 0.001)
+    monkeypatch.setattr(sheet_loader, 'BACKOFF_MAX_SECONDS', 0.01)
+
+
+# ------------------ TOKEN BUCKET ------------------ #
+def test_budget_throttles_past_the_burst():
+    budget = RequestBudget(per_minute=600, burst=2)
+    for _ in range(3):
+        budget.acquire()
+
+    assert budget.stats['requests'] == 3
+    assert budget.stats['throttled'] == 1
+    assert budget.stats['throttle_seconds'] > 0
+
+
+# ------------------ RETRIES ------------------ #
+def test_rate_limits_and_server_errors_are_retried():
+    budget = RequestBudget()
+    call = Flaky(429, 503)
+
+    assert sheet_loader._call_with_retry(budget, call) == 'ok'
+    assert call.calls == 3
+    assert (budget.stats['rate_limited'], budget.stats['server_errors'], budget.stats['retries']) == (1, 1, 2)
+
+
+def test_other_errors_are_raised_at_once():
+    budget = RequestBudget()
+    call = Flaky(404)
+
+    with pytest.raises(APIError):
+        sheet_loader._call_with_retry(budget, call)
+    assert call.calls == 1
+
+
+def test_exhausted_retries_back_off_the_account():
+    budget = RequestBudget()
+    call = Flaky(*[429] * (sheet_loader.MAX_RETRIES + 1))
+
+    with pytest.raises(APIError):
+        sheet_loader._call_with_retry(budget, call)
+    assert budget.stats['failures'] == 1
+    assert budget.in_backoff()
+
+
+# ------------------ QUOTA-AWARE CLIENT ------------------ #
+def test_clients_of_one_account_share_a_budget():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    first, second = QuotaAwareClient(client, 'svc'), QuotaAwareClient(client, 'svc')
+    sync_sheet(first, 'sheet', 'Sheet1', serve_stale=False)
+
+    assert second.budget is first.budget
+    assert get_quota_stats()['svc']['requests'] >= 3
+
+
+def test_stale_frame_is_served_while_backing_off():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    quota_client = QuotaAwareClient(client, 'svc')
+    sync_sheet(quota_client, 'sheet', 'Sheet1', serve_stale=False)
+    calls = len(worksheet.calls)
+    worksheet.values.append(['Cid', 'pending'])
+    spreadsheet.touch()
+    quota_client.budget.back_off(60)
+    df = sync_sheet(quota_client, 'sheet', 'Sheet1', serve_stale=False)
+
+    assert len(df) == 2
+    assert len(worksheet.calls) == calls
+    assert quota_client.budget.stats['served_stale'] == 1
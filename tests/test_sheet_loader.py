@@ -0,0 +1,373 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+import sheet_loader
+from fake_sheets import fake_client, FakeClient, FakeSpreadsheet, FakeWorksheet
+from sheet_loader import sync_sheet, stream_sheet, get_sheet_frame, load_sheets, invalidate_sheet, get_change_stats, get_flight_stats, get_snapshot_info, load_snapshot, frame_version, parse_timestamps, get_timestamp_stats, column_bytes, frame_memory, track_session_frames, get_session_memory
+
+HEADER = ['profile_name', 'status', 'search_city']
+ROWS = [
+    ['Ana', 'pending', 'Berlin'],
+    ['Ben', 'pending', 'Austin'],
+    ['Cid', 'pending', 'Berlin'],
+    ['Dee', 'sent', 'London']
+]
+
+
+def load(client):
+    return sync_sheet(client, 'sheet', 'Sheet1', serve_stale=False)
+
+
+# ------------------ CHANGE DETECTION ------------------ #
+def test_unchanged_modified_time_downloads_nothing():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    load(client)
+
+    assert worksheet.count('get_all_values') == 1
+    assert worksheet.count('batch_get') == 0
+    assert get_change_stats()['unchanged'] == 1
+
+
+def test_appended_rows_are_fetched_incrementally():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    worksheet.values.append(['Eve', 'pending', 'Austin'])
+    spreadsheet.touch()
+    df = load(client)
+
+    assert list(df['profile_name']) == ['Ana', 'Ben', 'Cid', 'Dee', 'Eve']
+    assert worksheet.count('get_all_values') == 1
+
+
+def test_edited_middle_row_triggers_full_reload():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    worksheet.values[2][1] = 'sent'
+    spreadsheet.touch()
+    df = load(client)
+
+    assert df['status'].iloc[1] == 'sent'
+    assert worksheet.count('get_all_values') == 2
+
+
+def test_edit_gives_the_reloaded_frame_a_new_version():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    before = frame_version(load(client))
+    worksheet.values[2][1] = 'sent'
+    spreadsheet.touch()
+
+    assert frame_version(load(client)) != before
+
+
+def test_version_is_specific_to_the_sheet():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    other, _, _ = fake_client([HEADER] + ROWS, sheet_id='other')
+
+    assert frame_version(load(client)) != frame_version(sync_sheet(other, 'other', 'Sheet1', serve_stale=False))
+
+
+# ------------------ INCREMENTAL SYNC ------------------ #
+def test_append_downloads_only_the_new_range():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    worksheet.values += [['Eve', 'pending', 'Austin'], ['Fay', 'sent', 'Berlin']]
+    spreadsheet.touch()
+    load(client)
+
+    assert worksheet.calls[-1] == ('batch_get', ('1:1', 'A5:C5', 'A6:C'))
+    assert get_snapshot_info('sheet', 'Sheet1')['row_count'] == 6
+
+
+def test_deleted_tail_row_triggers_full_reload():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    worksheet.values.pop()
+    spreadsheet.touch()
+    df = load(client)
+
+    assert list(df['profile_name']) == ['Ana', 'Ben', 'Cid']
+    assert worksheet.count('get_all_values') == 2
+
+
+def test_header_change_triggers_full_reload():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    worksheet.values[0] = ['profile_name', 'state', 'search_city']
+    worksheet.values.append(['Eve', 'pending', 'Austin'])
+    spreadsheet.touch()
+    df = load(client)
+
+    assert 'state' in df.columns and len(df) == 5
+    assert worksheet.count('get_all_values') == 2
+
+
+def test_non_incremental_sync_always_reloads():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    sync_sheet(client, 'sheet', 'Sheet1', incremental=False, serve_stale=False)
+
+    assert worksheet.count('get_all_values') == 2
+
+
+# ------------------ TYPED INGESTION ------------------ #
+def test_column_typed_differently_by_an_append_is_retyped():
+    client, spreadsheet, worksheet = fake_client([HEADER + ['score']] + [row + ['1'] for row in ROWS])
+    assert load(client)['score'].dtype.kind == 'i'
+    worksheet.values.append(['Eve', 'pending', 'Austin', 'n/a'])
+    spreadsheet.touch()
+    df = load(client)
+
+    assert list(df['score']) == ['1', '1', '1', '1', 'n/a']
+
+
+def test_peak_memory_is_reported_by_default():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    stats = get_snapshot_info('sheet', 'Sheet1')['ingest_stats']
+
+    assert stats['peak_bytes'] > 0
+    assert stats['peak_sampled']
+
+
+# ------------------ COLUMN PROJECTION ------------------ #
+def test_projection_downloads_only_its_columns():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    df = get_sheet_frame(client, 'sheet', 'Sheet1', columns=['status', 'profile_name'])
+
+    assert list(df.columns) == ['profile_name', 'status']
+    assert list(df['status']) == ['pending', 'pending', 'pending', 'sent']
+    assert worksheet.count('get_all_values') == 0
+    assert worksheet.calls[-1] == ('batch_get', ('A2:B',))
+
+
+def test_projection_is_cut_from_a_synced_sheet():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    calls = len(worksheet.calls)
+    df = get_sheet_frame(client, 'sheet', 'Sheet1', columns=['search_city'])
+
+    assert list(df['search_city']) == ['Berlin', 'Austin', 'Berlin', 'London']
+    assert len(worksheet.calls) == calls
+
+
+# ------------------ SNAPSHOTS ------------------ #
+def test_snapshot_round_trip_keeps_live_dtypes():
+    client, spreadsheet, worksheet = fake_client([HEADER + ['timestamp', 'success']] + [
+        row + ['01/02/2024 10:00', 'yes'] for row in ROWS
+    ])
+    live = load(client)
+    restored = load_snapshot('sheet', 'Sheet1')['df']
+
+    assert restored.dtypes.to_dict() == live.dtypes.to_dict()
+    assert restored.equals(live)
+
+
+def test_full_invalidation_skips_the_snapshot():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    load(client)
+    worksheet.values[1][1] = 'sent'
+    invalidate_sheet('sheet', 'Sheet1', full=True)
+    df = sync_sheet(client, 'sheet', 'Sheet1')
+
+    assert df['status'].iloc[0] == 'sent'
+    assert worksheet.count('get_all_values') == 2
+
+
+def test_unwritable_snapshot_dir_still_serves_the_frame(tmp_path, monkeypatch):
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('')
+    monkeypatch.setattr(sheet_loader, 'SNAPSHOT_DIR', str(blocker / 'snapshots'))
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    df = load(client)
+
+    assert len(df) == len(ROWS)
+    assert not os.path.exists(blocker / 'snapshots')
+
+
+# ------------------ STREAMING LOAD ------------------ #
+def test_stream_keeps_rows_after_a_blank_range():
+    values = [HEADER] + ROWS[:2] + [[''] * 3] * 4 + ROWS[2:]
+    client, spreadsheet, worksheet = fake_client(values)
+    streamed = sheet_loader._concat_typed(list(stream_sheet(client, 'sheet', 'Sheet1', chunk_rows=2)))
+    invalidate_sheet('sheet', 'Sheet1', full=True)
+    reloaded = load(client)
+
+    assert list(streamed['profile_name']) == list(reloaded['profile_name'])
+    assert list(streamed['profile_name'])[-2:] == ['Cid', 'Dee']
+
+
+def test_sync_during_a_stream_waits_for_its_result():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    chunks = stream_sheet(client, 'sheet', 'Sheet1', chunk_rows=2)
+    next(chunks)
+    result = {}
+    follower = threading.Thread(target=lambda: result.update(df=load(client)))
+    follower.start()
+    time.sleep(0.1)
+    assert follower.is_alive()
+
+    list(chunks)
+    follower.join(5)
+    assert list(result['df']['profile_name']) == ['Ana', 'Ben', 'Cid', 'Dee']
+    assert worksheet.count('get_all_values') == 0
+
+
+def test_abandoned_stream_leaves_the_load_to_the_next_caller():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    chunks = stream_sheet(client, 'sheet', 'Sheet1', chunk_rows=2)
+    next(chunks)
+    chunks.close()
+
+    assert len(load(client)) == len(ROWS)
+
+
+# ------------------ WORKSHEET HANDLES ------------------ #
+def test_worksheet_handles_belong_to_their_client():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    other, _, other_worksheet = fake_client([HEADER] + ROWS[:1])
+
+    assert sheet_loader._open_worksheet(client, 'sheet', 'Sheet1')[1] is worksheet
+    assert sheet_loader._open_worksheet(other, 'sheet', 'Sheet1')[1] is other_worksheet
+    sheet_loader._drop_worksheet(client, 'sheet', 'Sheet1')
+    assert client._sheet_handles == {}
+    assert other._sheet_handles
+
+
+def test_quota_client_keeps_its_own_handles():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    quota_client = sheet_loader.QuotaAwareClient(client, 'svc@example.com')
+    load(quota_client)
+    load(quota_client)
+
+    assert ('sheet', 'Sheet1') in quota_client._sheet_handles
+    assert not hasattr(client, '_sheet_handles')
+
+
+# ------------------ CONCURRENT LOADING ------------------ #
+def test_load_sheets_returns_every_frame_and_per_sheet_errors():
+    chat = FakeWorksheet([['sender_name', 'message'], ['Ana', 'hi']])
+    client = FakeClient({
+        'chat': FakeSpreadsheet({'Sheet1': chat}),
+        'leads': FakeSpreadsheet({'Sheet1': FakeWorksheet([HEADER] + ROWS)})
+    })
+    frames, errors = load_sheets(client, {
+        'chat': ('chat', 'Sheet1'),
+        'outreach': ('leads', 'Sheet1'),
+        'missing': ('leads', 'Renamed')
+    })
+
+    assert list(frames['chat']['message']) == ['hi']
+    assert len(frames['outreach']) == len(ROWS)
+    assert frames['missing'].empty
+    assert list(errors) == ['missing']
+
+
+# ------------------ FRAME CACHE ------------------ #
+def test_frame_cache_skips_the_sheet_within_its_ttl():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    get_sheet_frame(client, 'sheet', 'Sheet1', tenant='a')
+    spreadsheet.touch()
+    get_sheet_frame(client, 'sheet', 'Sheet1', tenant='a')
+
+    assert len(worksheet.calls) == 1
+
+
+def test_invalidation_is_per_tenant():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    get_sheet_frame(client, 'sheet', 'Sheet1', tenant='a')
+    get_sheet_frame(client, 'sheet', 'Sheet1', tenant='b')
+    worksheet.values.append(['Eve', 'pending', 'Austin'])
+    spreadsheet.touch()
+    invalidate_sheet('sheet', 'Sheet1', tenant='a')
+
+    assert len(get_sheet_frame(client, 'sheet', 'Sheet1', tenant='a')) == 5
+    assert len(get_sheet_frame(client, 'sheet', 'Sheet1', tenant='b')) == 4
+    assert worksheet.count('get_all_values') == 1
+
+
+# ------------------ REQUEST COALESCING ------------------ #
+class SlowWorksheet(FakeWorksheet):
+    def get_all_values(self):
+        time.sleep(0.2)
+        return super().get_all_values()
+
+
+def test_concurrent_cold_loads_share_one_download():
+    worksheet = SlowWorksheet([HEADER] + ROWS)
+    client = FakeClient({'sheet': FakeSpreadsheet({'Sheet1': worksheet})})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(load(client))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert worksheet.count('get_all_values') == 1
+    assert len(results) == 4 and all(df is results[0] for df in results)
+    assert get_flight_stats() == {'issued': 1, 'coalesced': 3}
+
+
+# ------------------ TIMESTAMPS ------------------ #
+def test_mixed_timestamp_formats_parse_like_one_by_one():
+    values = pd.Series(['01/02/2024 10:00', '2024-01-03 09:30:15', '', '01/04/2024 1:05 PM', 'soon', '2024-01-05T08:00:00Z', None])
+    parsed = parse_timestamps(values, key=('sheet', 'Sheet1', 'timestamp'))
+    expected = [pd.Timestamp('2024-01-02 10:00'), pd.Timestamp('2024-01-03 09:30:15'), pd.NaT,
+                pd.Timestamp('2024-01-04 13:05'), pd.NaT, pd.Timestamp('2024-01-05 08:00'), pd.NaT]
+
+    assert parsed.equals(pd.Series(expected, dtype='datetime64[ns]'))
+    stats = get_timestamp_stats()[('sheet', 'Sheet1', 'timestamp')]
+    assert (stats['rows'], stats['blank'], stats['unparseable']) == (7, 2, 1)
+
+
+def test_detected_formats_are_reused_on_the_next_load():
+    key = ('sheet', 'Sheet1', 'timestamp')
+    parse_timestamps(pd.Series(['01/02/2024 10:00', '01/03/2024 11:00']), key=key)
+    formats = get_timestamp_stats()[key]['formats']
+    parse_timestamps(pd.Series(['01/04/2024 12:00']), key=key)
+
+    assert get_timestamp_stats()[key]['formats'] == formats == ['%m/%d/%Y %H:%M']
+
+
+def test_already_parsed_column_is_returned_as_is():
+    col = pd.Series(pd.to_datetime(['2024-01-01']))
+
+    assert parse_timestamps(col) is col
+
+
+# ------------------ SHARED FRAMES ------------------ #
+def test_callers_cannot_change_the_shared_frame():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    mine = get_sheet_frame(client, 'sheet', 'Sheet1')
+    mine['date'] = 'today'
+    mine.loc[0, 'status'] = 'sent'
+    theirs = get_sheet_frame(client, 'sheet', 'Sheet1')
+
+    assert 'date' not in theirs.columns
+    assert theirs['status'].iloc[0] == 'pending'
+    assert len(worksheet.calls) == 1
+
+
+# ------------------ MEMORY ------------------ #
+def test_repeated_text_is_stored_once():
+    client, spreadsheet, worksheet = fake_client([HEADER + ['company_name']] + [
+        [f'Lead {i}', 'pending', 'Berlin', 'Acme Corp'] for i in range(200)
+    ])
+    df = load(client)
+    companies = df['company_name']
+
+    assert len({id(value) for value in companies}) == 1
+    report = frame_memory(df).set_index('column')
+    assert report.loc['company_name', 'bytes'] == column_bytes(companies) < report.loc['company_name', 'deep_bytes']
+
+
+def test_session_report_counts_shared_columns_once():
+    client, spreadsheet, worksheet = fake_client([HEADER] + ROWS)
+    first, second = get_sheet_frame(client, 'sheet', 'Sheet1'), get_sheet_frame(client, 'sheet', 'Sheet1')
+    track_session_frames({'outreach': first, 'again': second})
+    report = get_session_memory()
+
+    assert report['referenced_bytes'] == 2 * report['unique_bytes'] > 0